@@ -0,0 +1,82 @@
+"""
+Rechenintensive Analysen als Jobs für den JobScheduler
+Die Funktionen laufen in Worker-Prozessen; Analyzer, Simulator und Solver werden pro Prozess
+beim ersten Job erstellt und danach wiederverwendet (inklusive ihrer Caches).
+"""
+
+from breakability import EQUIPMENT_FILE, BreakabilitySolver
+from composition_simulator import CompositionSimulator
+from job_scheduler import report_progress
+from price_table import PRICE_FILE, PriceTable
+from rock_analyzer import ROCKS_FILE, RockAnalyzer
+from value_engine import ValueEngine
+
+# Dateien und Objekte pro Worker-Prozess
+_files = (ROCKS_FILE, PRICE_FILE, EQUIPMENT_FILE)
+_context = None
+
+
+def init_analysis_worker(rocks_file=ROCKS_FILE, price_file=PRICE_FILE, equipment_file=EQUIPMENT_FILE):
+    """Initializer: Dateien merken, geladen wird erst beim ersten Job"""
+    global _files, _context
+    _files = (rocks_file, price_file, equipment_file)
+    _context = None
+
+
+def _get_context():
+    global _context
+    if _context is None:
+        rocks_file, price_file, equipment_file = _files
+        analyzer = RockAnalyzer(ValueEngine(PriceTable(price_file)), rocks_file=rocks_file)
+        _context = {
+            'rocks_data': analyzer.rocks_data,
+            'simulator': CompositionSimulator(analyzer.rocks_data, analyzer.value_engine),
+            'breakability': BreakabilitySolver(equipment_file)
+        }
+    return _context
+
+
+def simulate_composition_job(system, rock_type, factor=1):
+    """
+    Perzentil-Bänder eines Rock-Typs (siehe CompositionSimulator.simulate)
+    Die Simulation ist ein unteilbarer Schritt: ein Abbruch greift davor oder danach (das Ergebnis
+    wird verworfen), nicht mitten in den Ziehungen
+    """
+    report_progress(0.0, rock_type)
+    result = _get_context()['simulator'].simulate(system, rock_type, factor)
+    if result is None:
+        raise ValueError(f'Rock-Typ {rock_type} nicht in {system} gefunden')
+    report_progress(1.0, rock_type)
+    return result
+
+
+def system_simulation_job(system, factor=1):
+    """Alle Rock-Typen eines Systems simulieren, sortiert nach mittlerem Wert (p50)"""
+    context = _get_context()
+    rock_types = list(context['rocks_data'].get(system, {}))
+    ranking = []
+    for index, rock_type in enumerate(rock_types):
+        report_progress(index / max(1, len(rock_types)), rock_type)
+        result = context['simulator'].simulate(system, rock_type, factor)
+        if result is not None:
+            ranking.append({'rock_type': rock_type, 'value': result['value'], 'scu': result['scu']})
+    ranking.sort(key=lambda rock: rock['value']['p50'], reverse=True)
+    report_progress(1.0, system)
+    return {'system': system, 'factor': factor, 'rocks': ranking}
+
+
+def loadout_job(system, rock_type, ships=None):
+    """Beste Ausrüstung eines Rock-Typs für mehrere Schiffe (siehe BreakabilitySolver.solve)"""
+    context = _get_context()
+    rock_data = context['rocks_data'].get(system, {}).get(rock_type)
+    if rock_data is None:
+        raise ValueError(f'Rock-Typ {rock_type} nicht in {system} gefunden')
+
+    solver = context['breakability']
+    ships = ships or solver.ships()
+    loadouts = {}
+    for index, ship in enumerate(ships):
+        report_progress(index / len(ships), ship)
+        loadouts[ship] = solver.solve(system, rock_type, rock_data, ship)
+    report_progress(1.0, rock_type)
+    return {'system': system, 'rock_type': rock_type, 'loadouts': loadouts}
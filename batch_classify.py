@@ -0,0 +1,212 @@
+"""
+Headless Batch-Klassifizierung von Signalwerten (ohne webview und pynput)
+Liest Signale zeilenweise aus Dateien oder stdin, klassifiziert sie in Blöcken über einen
+Prozess-Pool und schreibt CSV oder JSONL mit begrenztem Speicherbedarf.
+
+    python batch_classify.py scans.log other.log -o result.csv
+    type scans.log | python batch_classify.py - --format jsonl --workers 4
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import contextlib
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+from rock_analyzer import ROCKS_FILE, RockAnalyzer
+
+# Signale pro Block, der an einen Worker geht
+CHUNK_SIZE = 2000
+
+# Maximale Anzahl Blöcke in Bearbeitung pro Worker (begrenzt den Speicher)
+MAX_IN_FLIGHT_PER_WORKER = 2
+
+# Obergrenze des Ergebnis-Caches pro Worker
+WORKER_CACHE_SIZE = 100000
+
+# Ausgabespalten
+FIELDS = ['signal', 'match', 'rock_type', 'multima_factor', 'accuracy', 'expected_value', 'matches']
+
+# Ganze Zahlen in einer Zeile (die letzte gilt als Signalwert)
+_NUMBER = re.compile(r'\d+')
+
+# Analyzer pro Worker-Prozess (wird im Initializer erstellt)
+_worker_analyzer = None
+_worker_cache = {}
+
+
+def parse_signal(line):
+    """Signalwert aus einer Zeile (letzte ganze Zahl, None wenn keine vorhanden)"""
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return None
+    numbers = _NUMBER.findall(line)
+    return int(numbers[-1]) if numbers else None
+
+
+def read_signals(paths):
+    """Lies Signale zeilenweise aus Dateien ('-' = stdin)"""
+    for path in paths:
+        if path == '-':
+            for line in sys.stdin:
+                signal = parse_signal(line)
+                if signal is not None:
+                    yield signal
+            continue
+
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                signal = parse_signal(line)
+                if signal is not None:
+                    yield signal
+
+
+def chunked(iterable, size):
+    """Teile einen Iterator in Listen der Länge size"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def init_worker(system, rocks_file):
+    """Initializer: einen RockAnalyzer pro Prozess erstellen (Log-Ausgaben nach stderr)"""
+    global _worker_analyzer
+    with contextlib.redirect_stdout(sys.stderr):
+        _worker_analyzer = RockAnalyzer(rocks_file=rocks_file)
+        _worker_analyzer.build_rock_database(system)
+    _worker_cache.clear()
+
+
+def classify_signal(analyzer, signal_value):
+    """Klassifiziere ein Signal - bester Treffer als Ausgabezeile"""
+    matches = analyzer.find_matching_rocks(signal_value)
+    if not matches:
+        return [signal_value, '', '', '', 0, 0, 0]
+
+    best = matches[0]
+    return [
+        signal_value,
+        best['name'],
+        best.get('rock_type', ''),
+        best.get('multima_factor', 1),
+        best.get('accuracy', 0),
+        best.get('expected_value', 0),
+        len(matches)
+    ]
+
+
+def classify_chunk(signals):
+    """Klassifiziere einen Block (im Worker), gleiche Signale werden nur einmal berechnet"""
+    rows = []
+    for signal_value in signals:
+        row = _worker_cache.get(signal_value)
+        if row is None:
+            row = classify_signal(_worker_analyzer, signal_value)
+            if len(_worker_cache) >= WORKER_CACHE_SIZE:
+                _worker_cache.clear()
+            _worker_cache[signal_value] = row
+        rows.append(row)
+    return rows
+
+
+class OutputWriter:
+    """Schreibt Zeilen als CSV oder JSONL"""
+
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        if output_format == 'csv':
+            self.csv_writer = csv.writer(stream, lineterminator='\n')
+            self.csv_writer.writerow(FIELDS)
+
+    def write_rows(self, rows):
+        if self.output_format == 'csv':
+            self.csv_writer.writerows(rows)
+        else:
+            self.stream.write(''.join(json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + '\n' for row in rows))
+
+
+def run(paths, writer, system='STANTON', workers=None, chunk_size=CHUNK_SIZE, rocks_file=ROCKS_FILE):
+    """Klassifiziere alle Signale, Ergebnisse in Eingabereihenfolge - liefert Anzahl Signale"""
+    chunks = chunked(read_signals(paths), chunk_size)
+    total = 0
+
+    if workers == 0:
+        # Ohne Prozess-Pool (z.B. für kleine Dateien)
+        init_worker(system, rocks_file)
+        for chunk in chunks:
+            writer.write_rows(classify_chunk(chunk))
+            total += len(chunk)
+        return total
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * MAX_IN_FLIGHT_PER_WORKER
+    in_flight = collections.deque()
+
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(system, rocks_file)) as pool:
+        for chunk in chunks:
+            if len(in_flight) >= max_in_flight:
+                rows = in_flight.popleft().result()
+                writer.write_rows(rows)
+                total += len(rows)
+            in_flight.append(pool.submit(classify_chunk, chunk))
+
+        while in_flight:
+            rows = in_flight.popleft().result()
+            writer.write_rows(rows)
+            total += len(rows)
+
+    return total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Signalwerte headless klassifizieren')
+    parser.add_argument('inputs', nargs='*', default=['-'], help="Dateien mit Signalwerten ('-' = stdin)")
+    parser.add_argument('-o', '--output', help='Ausgabedatei (Standard: stdout)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='Ausgabeformat (Standard: aus Dateiendung, sonst csv)')
+    parser.add_argument('--system', default='STANTON', choices=['STANTON', 'PYRO'])
+    parser.add_argument('--workers', type=int, help='Anzahl Prozesse (0 = ohne Pool, Standard: CPU-Anzahl)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--rocks', default=ROCKS_FILE, help='Pfad zu rocks.json')
+    args = parser.parse_args(argv)
+
+    output_format = args.format
+    if output_format is None:
+        output_format = 'jsonl' if args.output and args.output.endswith(('.jsonl', '.json')) else 'csv'
+
+    if args.output:
+        stream = open(args.output, 'w', encoding='utf-8', newline='')
+    else:
+        stream = sys.stdout
+
+    start = time.perf_counter()
+    try:
+        # Log-Ausgaben dürfen die Ergebnisse auf stdout nicht vermischen
+        with contextlib.redirect_stdout(sys.stderr):
+            total = run(args.inputs, OutputWriter(stream, output_format), args.system,
+                        args.workers, args.chunk_size, args.rocks)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        else:
+            stream.flush()
+    elapsed = time.perf_counter() - start
+
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"[INFO] {total} Signale in {elapsed:.2f}s klassifiziert ({rate:,.0f} Signale/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
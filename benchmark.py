@@ -0,0 +1,374 @@
+"""
+Benchmarks für den Mining Analyzer
+Laufen headless ohne webview und pynput:
+
+    python benchmark.py                 # alle Benchmarks
+    python benchmark.py key_dispatch    # einzelne Benchmarks
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import ui_backend
+
+# Benchmarks laufen immer gegen das headless UI-Backend
+os.environ.setdefault(ui_backend.UI_BACKEND_ENV, 'fake')
+
+import fake_webview
+from gaming_mode import GamingMode
+from ui_dispatcher import UIDispatcher
+from key_replay import ReplayHarness, ReplayKey, events_from_signals, print_report
+
+
+def _percentile(sorted_values, pct):
+    """Perzentil aus einer sortierten Liste"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def report(title, samples, unit='µs', scale=1e6):
+    """Gib Mittelwert und Perzentile einer Messreihe (in Sekunden) aus"""
+    values = sorted(samples)
+    if not values:
+        print(f"{title:<40} keine Messwerte")
+        return
+    mean = sum(values) / len(values)
+    print(f"{title:<40} n={len(values):<7} "
+          f"mean={mean * scale:9.2f}{unit}  "
+          f"p50={_percentile(values, 50) * scale:9.2f}{unit}  "
+          f"p95={_percentile(values, 95) * scale:9.2f}{unit}  "
+          f"max={values[-1] * scale:9.2f}{unit}")
+
+
+def bench_listener_resume(iterations=20000):
+    """Kosten von pause_listener/resume_listener (Fokuswechsel im UI)"""
+    gaming = GamingMode(lambda js_code, kind=None: None)
+    gaming.gaming_mode = True
+
+    pause_samples = []
+    resume_samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        gaming.pause_listener()
+        pause_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        gaming.resume_listener()
+        resume_samples.append(time.perf_counter() - start)
+
+    report('listener pause', pause_samples)
+    report('listener resume', resume_samples)
+    gaming.cleanup()
+
+
+def bench_key_dispatch(iterations=50000):
+    """Kosten pro Tastendruck in on_global_key_press"""
+    gaming = GamingMode(lambda js_code, kind=None: None, lambda signal_value: None)
+    gaming.gaming_mode = True
+    gaming.resume_listener()
+
+    keys = [
+        ReplayKey(vk=97, char='1'),
+        ReplayKey(vk=104, char='8'),
+        ReplayKey(char='0'),
+        ReplayKey(char='0'),
+        ReplayKey(name='backspace'),
+        ReplayKey(char='x'),
+        ReplayKey(name='esc')
+    ]
+
+    samples = []
+    for i in range(iterations):
+        key = keys[i % len(keys)]
+        start = time.perf_counter()
+        gaming.on_global_key_press(key)
+        samples.append(time.perf_counter() - start)
+
+    report('key dispatch (gate open)', samples)
+
+    gaming.pause_listener()
+    samples = []
+    for i in range(iterations):
+        key = keys[i % len(keys)]
+        start = time.perf_counter()
+        gaming.on_global_key_press(key)
+        samples.append(time.perf_counter() - start)
+
+    report('key dispatch (gate closed)', samples)
+    gaming.cleanup()
+
+
+def bench_key_replay(repeat=50):
+    """Wiedergabe getippter Signale mit maximaler Geschwindigkeit bis zur fertigen Suche"""
+    harness = ReplayHarness()
+    try:
+        events = events_from_signals([1800, 3600, 7200, 11520, 1920], repeat=repeat)
+        print_report(harness.replay(events, speed=None))
+    finally:
+        harness.close()
+
+
+def bench_search_pipeline(iterations=20, threads=1):
+    """Suche -> Historie -> Speichern -> Overlay gegen das Fake-Webview"""
+    from main_app import StarCitizenMiningAnalyzer
+
+    fake_webview.reset_stats()
+    signals = [1800, 3600, 7200, 11520, 1920, 1850]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app = StarCitizenMiningAnalyzer(ui=fake_webview, config_file=os.path.join(tmp_dir, 'config.json'))
+        api = app.api
+
+        samples = []
+        samples_lock = threading.Lock()
+
+        def worker(offset):
+            for i in range(iterations):
+                signal = signals[(offset + i) % len(signals)]
+                start = time.perf_counter()
+                api.search_signal(signal)
+                elapsed = time.perf_counter() - start
+                with samples_lock:
+                    samples.append(elapsed)
+
+        start = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        total = time.perf_counter() - start
+
+        report(f'search pipeline ({threads} Thread(s))', samples, unit='ms', scale=1e3)
+        print(f"{'Durchsatz':<40} {len(samples) / total:.1f} Suchen/s")
+        print(f"{'Webview-Operationen':<40} {dict(sorted(fake_webview.call_counts.items()))}")
+
+        api.shutdown()
+        fake_webview.shutdown()
+
+
+def bench_ui_dispatcher(updates=5000, evaluate_seconds=0.02):
+    """Kosten von post() bei langsamem Webview und Anzahl tatsächlicher Auswertungen"""
+    evaluations = []
+
+    def slow_evaluate(script):
+        evaluations.append(script)
+        time.sleep(evaluate_seconds)
+
+    dispatcher = UIDispatcher(slow_evaluate)
+    dispatcher.start()
+
+    samples = []
+    for i in range(updates):
+        start = time.perf_counter()
+        dispatcher.post(f"updateGamingInput('{i % 1000}');", 'gaming_input')
+        if i % 10 == 0:
+            dispatcher.post(f"console.log({i});")
+        samples.append(time.perf_counter() - start)
+
+    dispatcher.stop(timeout=5.0)
+
+    report('post() bei langsamem Webview', samples)
+    print(f"{'Eingereicht / ersetzt / verworfen':<40} "
+          f"{dispatcher.posted} / {dispatcher.superseded} / {dispatcher.dropped}")
+    print(f"{'Auswertungen im Webview':<40} {len(evaluations)}")
+
+
+def bench_overlay_show(iterations=20):
+    """Scan-bis-sichtbar Latenz: Fenster neu erstellen vs. im Fenster aktualisieren"""
+    from config_manager import ConfigManager
+    from overlay_manager import OverlayManager
+    from rock_analyzer import RockAnalyzer
+
+    analyzer = RockAnalyzer()
+    analyzer.build_rock_database('STANTON')
+    scans = [(signal, analyzer.analyze_signal(signal)[0]) for signal in (1800, 3600, 7200, 1920)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        overlay = OverlayManager(ConfigManager(os.path.join(tmp_dir, 'config.json')), ui=fake_webview)
+
+        # Vorher: jeder Scan zerstörte das Fenster und erstellte ein neues
+        recreate = []
+        for i in range(iterations):
+            signal, rock = scans[i % len(scans)]
+            start = time.perf_counter()
+            overlay.destroy_overlay()
+            overlay.show_overlay(signal, rock, rock['minerals'])
+            recreate.append(time.perf_counter() - start)
+
+        in_place = []
+        for i in range(iterations):
+            signal, rock = scans[i % len(scans)]
+            overlay.hide_overlay()
+            start = time.perf_counter()
+            overlay.show_overlay(signal, rock, rock['minerals'])
+            in_place.append(time.perf_counter() - start)
+
+        report('overlay neu erstellen (vorher)', recreate, unit='ms', scale=1e3)
+        report('overlay aktualisieren (nachher)', in_place, unit='ms', scale=1e3)
+        overlay.shutdown()
+
+
+def bench_overlay_render(iterations=2000):
+    """Renderzeit und Größe des Overlay-HTML (ohne und mit Fragment-Cache)"""
+    from config_manager import ConfigManager
+    from overlay_manager import OverlayManager
+    from rock_analyzer import RockAnalyzer
+
+    analyzer = RockAnalyzer()
+    analyzer.build_rock_database('STANTON')
+    scans = [(signal, analyzer.analyze_signal(signal)[0]) for signal in (1800, 3600, 7200, 1920, 1700, 1850)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        overlay = OverlayManager(ConfigManager(os.path.join(tmp_dir, 'config.json')), ui=fake_webview)
+
+        cold = []
+        warm = []
+        for i in range(iterations):
+            signal, rock = scans[i % len(scans)]
+
+            overlay._mineral_table_cache.clear()
+            start = time.perf_counter()
+            overlay.create_overlay_body_html(signal, rock, rock['minerals'], 10, 380)
+            cold.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            overlay.create_overlay_body_html(signal, rock, rock['minerals'], 10, 380)
+            warm.append(time.perf_counter() - start)
+
+        report('body render (ohne Cache)', cold)
+        report('body render (Fragment-Cache)', warm)
+
+        signal, rock = scans[1]
+        body = overlay.create_overlay_body_html(signal, rock, rock['minerals'], 10, 380)
+        full = overlay.create_overlay_html(signal, rock, rock['minerals'], 10, 380)
+        print(f"{'HTML-Größe komplettes Dokument':<40} {len(full.encode('utf-8'))} Bytes")
+        print(f"{'HTML-Größe pro Scan (updateOverlay)':<40} {len(body.encode('utf-8'))} Bytes")
+        overlay.shutdown()
+
+
+def bench_price_overlay(iterations=20):
+    """Preis-Overlay umschalten: Fenster neu erstellen vs. ein-/ausblenden"""
+    from config_manager import ConfigManager
+    from overlay_manager import OverlayManager
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        overlay = OverlayManager(ConfigManager(os.path.join(tmp_dir, 'config.json')), ui=fake_webview)
+
+        # Vorher: jedes Öffnen erzeugte Markup und Fenster neu
+        recreate = []
+        for _ in range(iterations):
+            overlay._price_overlay_cache_key = None
+            start = time.perf_counter()
+            overlay.toggle_price_overlay()
+            recreate.append(time.perf_counter() - start)
+            overlay.price_overlay_window.destroy()
+            overlay.price_overlay_window = None
+            overlay.price_overlay_visible = False
+
+        toggle = []
+        overlay.toggle_price_overlay()
+        for _ in range(iterations):
+            start = time.perf_counter()
+            overlay.toggle_price_overlay()
+            toggle.append(time.perf_counter() - start)
+
+        render = []
+        for _ in range(iterations * 50):
+            start = time.perf_counter()
+            overlay.create_price_overlay_html()
+            render.append(time.perf_counter() - start)
+
+        report('preis-overlay neu erstellen (vorher)', recreate, unit='ms', scale=1e3)
+        report('preis-overlay umschalten (nachher)', toggle, unit='ms', scale=1e3)
+        report('preis-overlay html (gecacht)', render)
+        overlay.shutdown()
+
+
+def bench_value_ranking(iterations=5000):
+    """Suche mit Erwartungswert-Ranking und einmalige Vorberechnung pro System"""
+    from rock_analyzer import RockAnalyzer
+
+    analyzer = RockAnalyzer()
+    analyzer.build_rock_database('STANTON')
+    system_data = analyzer.rocks_data['STANTON']
+    signals = (1800, 3600, 34200, 1810, 7400, 1925)
+
+    precompute = []
+    for _ in range(50):
+        analyzer.value_engine._system_values.clear()
+        start = time.perf_counter()
+        analyzer.value_engine.expected_values('STANTON', system_data)
+        precompute.append(time.perf_counter() - start)
+
+    search = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        analyzer.find_matching_rocks(signals[i % len(signals)])
+        search.append(time.perf_counter() - start)
+
+    report('erwartungswerte vorberechnen', precompute)
+    report('suche inkl. wert-ranking', search)
+
+
+def bench_composition_sim():
+    """Monte-Carlo-Simulation pro Rock-Typ (kalt) und gecachte Abfrage"""
+    from composition_simulator import CompositionSimulator, NUMPY_AVAILABLE
+    from rock_analyzer import RockAnalyzer
+
+    analyzer = RockAnalyzer()
+    simulator = CompositionSimulator(analyzer.rocks_data, analyzer.value_engine)
+    rock_types = list(analyzer.rocks_data.get('STANTON', {}))
+
+    cold = []
+    for rock_type in rock_types:
+        start = time.perf_counter()
+        simulator.simulate('STANTON', rock_type, 1)
+        cold.append(time.perf_counter() - start)
+
+    warm = []
+    for i in range(2000):
+        start = time.perf_counter()
+        simulator.simulate('STANTON', rock_types[i % len(rock_types)], 1)
+        warm.append(time.perf_counter() - start)
+
+    print(f"{'Ziehungen pro Simulation':<40} {simulator.draws} (numpy: {NUMPY_AVAILABLE})")
+    report('simulation (kalt)', cold, unit='ms', scale=1e3)
+    report('simulation (gecacht)', warm)
+
+
+BENCHMARKS = {
+    'listener_resume': bench_listener_resume,
+    'key_dispatch': bench_key_dispatch,
+    'key_replay': bench_key_replay,
+    'search_pipeline': bench_search_pipeline,
+    'ui_dispatcher': bench_ui_dispatcher,
+    'overlay_show': bench_overlay_show,
+    'overlay_render': bench_overlay_render,
+    'price_overlay': bench_price_overlay,
+    'value_ranking': bench_value_ranking,
+    'composition_sim': bench_composition_sim
+}
+
+
+def main(argv=None):
+    """Starte die ausgewählten Benchmarks"""
+    names = (argv if argv is not None else sys.argv[1:]) or list(BENCHMARKS)
+
+    for name in names:
+        bench = BENCHMARKS.get(name)
+        if bench is None:
+            print(f"[ERROR] Unbekannter Benchmark: {name} (verfügbar: {', '.join(BENCHMARKS)})")
+            return 1
+        print(f"--- {name} ---")
+        bench()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import itertools
+import json
+import os
+
+# Lokale Ausrüstungstabelle (Schiffe, Laserköpfe, Module, Gadgets)
+EQUIPMENT_FILE = 'mining_equipment.json'
+
+# Benötigte Laserleistung (MW) pro kg Gesteinsmasse bei 0% Widerstand
+POWER_PER_MASS = 0.25
+
+# Effektiver Widerstand wird hier gekappt (100% wäre unknackbar)
+MAX_RESISTANCE = 0.99
+
+
+class Loadout:
+    """Modifikatoren einer Ausrüstungskombination (multiplikativ gestapelt)"""
+
+    __slots__ = ('names', 'power', 'resistance', 'instability')
+
+    def __init__(self, names=(), power=1.0, resistance=1.0, instability=1.0):
+        self.names = names
+        self.power = power
+        self.resistance = resistance
+        self.instability = instability
+
+    @classmethod
+    def from_items(cls, items):
+        """items: [(Name, {'power', 'resistance', 'instability'})]"""
+        loadout = cls(tuple(name for name, _ in items))
+        for _, modifiers in items:
+            loadout.power *= 1 + modifiers.get('power', 0)
+            loadout.resistance *= 1 + modifiers.get('resistance', 0)
+            loadout.instability *= 1 + modifiers.get('instability', 0)
+        return loadout
+
+
+class BreakabilitySolver:
+    """Sucht die beste Laser-/Modul-/Gadget-Kombination, mit der ein Gestein knackbar ist"""
+
+    def __init__(self, equipment_file=EQUIPMENT_FILE):
+        self.equipment = self.load_equipment(equipment_file)
+
+        # Modul-Kombinationen je Slot-Anzahl, sortiert nach Instabilität
+        self._module_combos = {}
+
+        # Gadgets (inklusive ohne Gadget), sortiert nach Instabilität
+        self._gadgets = [Loadout()] + [
+            Loadout.from_items([(name, data)]) for name, data in self.equipment.get('gadgets', {}).items()
+        ]
+        self._gadgets.sort(key=lambda gadget: gadget.instability)
+        self._min_gadget_instability = self._gadgets[0].instability
+
+        # (System, Rock-Typ, Schiff) -> Ergebnis
+        self._cache = {}
+
+    def load_equipment(self, equipment_file):
+        """Lade Ausrüstungstabelle"""
+        try:
+            if os.path.exists(equipment_file):
+                with open(equipment_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            else:
+                print(f"[ERROR] {equipment_file} nicht gefunden!")
+                return {}
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"[ERROR] Fehler beim Laden von {equipment_file}: {e}")
+            return {}
+
+    def ships(self):
+        return list(self.equipment.get('ships', {}))
+
+    def module_combos(self, slots):
+        """Alle Modul-Kombinationen für slots Plätze (mit Wiederholung, auch leer) - memoisiert"""
+        combos = self._module_combos.get(slots)
+        if combos is None:
+            modules = list(self.equipment.get('modules', {}).items())
+            combos = [Loadout()]
+            for count in range(1, slots + 1):
+                for items in itertools.combinations_with_replacement(modules, count):
+                    combos.append(Loadout.from_items(items))
+            combos.sort(key=lambda combo: combo.instability)
+            self._module_combos[slots] = combos
+        return combos
+
+    def solve(self, system, rock_type, rock_data, ship):
+        """Beste Ausrüstung für typisches und schwerstes Gestein eines Rock-Typs (gecacht)"""
+        cache_key = (system, rock_type, ship)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        mass = rock_data.get('mass', {})
+        resistance = rock_data.get('res', {})
+        instability = rock_data.get('inst', {})
+
+        result = {
+            'ship': ship,
+            'typical': self.best_loadout(ship, mass.get('med', 0), resistance.get('med', 0), instability.get('med', 0)),
+            'worst': self.best_loadout(ship, mass.get('max', 0), resistance.get('max', 0), instability.get('max', 0))
+        }
+        self._cache[cache_key] = result
+        return result
+
+    def best_loadout(self, ship, mass, resistance, instability):
+        """
+        Branch-and-Bound über Laserköpfe, Module und Gadgets
+        Ziel: knackbar mit möglichst geringer Instabilität, danach ohne Gadget, danach größte Reserve
+        """
+        ship_data = self.equipment.get('ships', {}).get(ship)
+        if ship_data is None:
+            return {'breakable': False, 'error': f'Unbekanntes Schiff: {ship}'}
+
+        lasers = ship_data.get('lasers', 1)
+        required_power = mass * POWER_PER_MASS
+        heads = [
+            (name, head) for name, head in self.equipment.get('laser_heads', {}).items()
+            if head.get('size') == ship_data.get('laser_size')
+        ]
+
+        best = None
+        best_score = None
+
+        # Köpfe mit der niedrigsten erreichbaren Instabilität zuerst (bessere Schranke früh)
+        candidates = []
+        for name, head in heads:
+            combos = self.module_combos(head.get('module_slots', 0))
+            head_loadout = Loadout.from_items([(name, head)])
+            bound = self._optimistic_power(head, head_loadout, combos, lasers, resistance)
+            if bound < required_power:
+                continue
+            min_instability = head_loadout.instability * combos[0].instability * self._min_gadget_instability
+            candidates.append((min_instability, name, head, head_loadout, combos))
+        candidates.sort(key=lambda candidate: candidate[0])
+
+        for min_instability, name, head, head_loadout, combos in candidates:
+            if best_score is not None and min_instability * instability > best_score[0]:
+                break
+
+            for combo in combos:
+                if best_score is not None and \
+                        head_loadout.instability * combo.instability * self._min_gadget_instability * instability > best_score[0]:
+                    break
+
+                for gadget in self._gadgets:
+                    effective_instability = instability * head_loadout.instability * combo.instability * gadget.instability
+                    if best_score is not None and effective_instability > best_score[0]:
+                        break
+
+                    effective_resistance = min(MAX_RESISTANCE, resistance * head_loadout.resistance * combo.resistance * gadget.resistance)
+                    power = lasers * head['power'] * combo.power * (1 - effective_resistance)
+                    if power < required_power:
+                        continue
+
+                    margin = power / required_power if required_power > 0 else float('inf')
+                    score = (effective_instability, bool(gadget.names), -margin)
+                    if best_score is None or score < best_score:
+                        best_score = score
+                        best = {
+                            'breakable': True,
+                            'laser': name,
+                            'modules': list(combo.names),
+                            'gadget': gadget.names[0] if gadget.names else None,
+                            'power': int(round(power)),
+                            'required_power': int(round(required_power)),
+                            'instability': round(effective_instability, 1),
+                            'margin': round(margin, 2) if required_power > 0 else None
+                        }
+
+        if best is None:
+            return {'breakable': False, 'required_power': int(round(required_power))}
+        return best
+
+    def _optimistic_power(self, head, head_loadout, combos, lasers, resistance):
+        """Obere Schranke der effektiven Leistung eines Kopfes (Module/Gadget unabhängig optimiert)"""
+        power_mult = max(combo.power for combo in combos)
+        resistance_mult = min(combo.resistance for combo in combos) * min(gadget.resistance for gadget in self._gadgets)
+        effective_resistance = min(MAX_RESISTANCE, resistance * head_loadout.resistance * resistance_mult)
+        return lasers * head['power'] * power_mult * (1 - effective_resistance)
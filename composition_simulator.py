@@ -0,0 +1,222 @@
+import math
+import random
+import zlib
+
+from value_engine import MASS_PER_SCU
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+    print("[INFO] numpy nicht installiert - Zusammensetzungs-Simulation läuft ohne Vektorisierung")
+
+# Anzahl Ziehungen pro Simulation (ohne numpy deutlich weniger)
+SIMULATION_DRAWS = 20000
+FALLBACK_DRAWS = 2000
+
+# Fester Seed, damit gecachte Ergebnisse reproduzierbar sind
+SIMULATION_SEED = 1337
+
+# Ausgegebene Perzentile
+PERCENTILES = (10, 50, 90)
+
+
+def _triangular_inverse(u, low, high, mode):
+    """Inverse Verteilungsfunktion der Dreiecksverteilung (auch für low == high)"""
+    span = high - low
+    if span <= 0:
+        return low
+    split = (mode - low) / span
+    if u < split:
+        return low + math.sqrt(u * span * (mode - low))
+    return high - math.sqrt((1 - u) * span * (high - mode))
+
+
+def _percentiles(values):
+    """Perzentile (PERCENTILES) einer Liste"""
+    if not values:
+        return [0.0] * len(PERCENTILES)
+    values = sorted(values)
+    last = len(values) - 1
+    return [values[int(round(pct / 100.0 * last))] for pct in PERCENTILES]
+
+
+class CompositionSimulator:
+    """Monte-Carlo-Simulation von Zusammensetzung und Wert pro Rock-Typ"""
+
+    def __init__(self, rocks_data, value_engine, draws=None, seed=SIMULATION_SEED):
+        """
+        rocks_data: Inhalt von rocks.json
+        value_engine: ValueEngine für die Erzpreise je System
+        draws: Anzahl Ziehungen (Standard abhängig von numpy)
+        """
+        self.rocks_data = rocks_data
+        self.value_engine = value_engine
+        self.draws = draws or (SIMULATION_DRAWS if NUMPY_AVAILABLE else FALLBACK_DRAWS)
+        self.seed = seed
+
+        # (System, Rock-Typ, Faktor) -> (Preis-Version, Ergebnis)
+        self._cache = {}
+
+    def simulate(self, system, rock_type, factor=1):
+        """Perzentil-Bänder für Erzanteile, Masse, SCU und Wert (gecacht)"""
+        factor = max(1, int(factor))
+        system_data = self.rocks_data.get(system, {})
+        rock_data = system_data.get(rock_type)
+        if rock_data is None:
+            return None
+
+        prices = self.value_engine.ore_prices(system, system_data)
+        version = self.value_engine.price_table.version
+
+        cache_key = (system, rock_type, factor)
+        cached = self._cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        ore_names = [name for name in rock_data.get('ores', {}) if name != 'INERTMATERIAL']
+        ores = [rock_data['ores'][name] for name in ore_names]
+
+        # Seed pro Rock-Typ/Faktor, damit Ergebnisse unabhängig von der Aufrufreihenfolge sind
+        seed = zlib.crc32(f'{self.seed}:{system}:{rock_type}:{factor}'.encode('utf-8'))
+        if NUMPY_AVAILABLE:
+            result = self._simulate_numpy(rock_data, ore_names, ores, prices, factor, seed)
+        else:
+            result = self._simulate_python(rock_data, ore_names, ores, prices, factor, seed)
+
+        result.update({'system': system, 'rock_type': rock_type, 'factor': factor, 'draws': self.draws})
+        self._cache[cache_key] = (version, result)
+        return result
+
+    def _ore_parameters(self, ores):
+        """Wahrscheinlichkeit und Dreiecksparameter (min, max, med) je Erz"""
+        params = []
+        for ore in ores:
+            low = ore.get('minPct', 0)
+            high = max(low, ore.get('maxPct', 0))
+            mode = min(max(ore.get('medPct', 0), low), high)
+            params.append((min(1.0, ore.get('prob', 0)), low, high, mode))
+        return params
+
+    def _mass_parameters(self, rock_data):
+        mass = rock_data.get('mass', {})
+        low = mass.get('min', 0)
+        high = max(low, mass.get('max', 0))
+        mode = min(max(mass.get('med', 0), low), high)
+        return low, high, mode
+
+    def _simulate_numpy(self, rock_data, ore_names, ores, prices, factor, seed):
+        """Vektorisierte Simulation: alle Ziehungen und Erze als Matrix"""
+        rng = np.random.default_rng(seed)
+        draws = self.draws
+
+        params = np.array(self._ore_parameters(ores), dtype=float).reshape(-1, 4)
+        prob, low, high, mode = params.T
+        span = high - low
+        split = np.divide(mode - low, span, out=np.zeros_like(span), where=span > 0)
+
+        # Anteile per inverser Dreiecksverteilung, Vorkommen per Bernoulli
+        u = rng.random((draws, len(ores)))
+        lower = low + np.sqrt(u * span * (mode - low))
+        upper = high - np.sqrt((1 - u) * span * (high - mode))
+        shares = np.where(u < split, lower, upper)
+        shares *= rng.random((draws, len(ores))) < prob
+
+        # Mehr als 100% auf 100% skalieren, Rest ist inertes Material
+        totals = shares.sum(axis=1)
+        shares /= np.maximum(totals, 1.0)[:, None]
+
+        mass_low, mass_high, mass_mode = self._mass_parameters(rock_data)
+        mass = rng.triangular(mass_low, mass_mode, mass_high, draws) if mass_high > mass_low \
+            else np.full(draws, float(mass_low))
+        mass *= factor
+
+        price_vector = np.array([prices.get(name, 0.0) for name in ore_names])
+        scu = shares * (mass / MASS_PER_SCU)[:, None]
+        values = scu @ price_vector
+
+        pct = list(PERCENTILES)
+        ore_bands = []
+        for index, name in enumerate(ore_names):
+            present = shares[:, index] > 0
+            presence = float(present.mean())
+            band = np.percentile(shares[present, index], pct) if present.any() else np.zeros(len(pct))
+            ore_bands.append(self._ore_band(name, presence, band))
+
+        return self._result(
+            ore_bands,
+            np.percentile(values, pct), float(values.mean()),
+            np.percentile(scu.sum(axis=1), pct),
+            np.percentile(mass, pct)
+        )
+
+    def _simulate_python(self, rock_data, ore_names, ores, prices, factor, seed):
+        """Fallback ohne numpy mit random.Random"""
+        rng = random.Random(seed)
+        params = self._ore_parameters(ores)
+        mass_low, mass_high, mass_mode = self._mass_parameters(rock_data)
+        price_vector = [prices.get(name, 0.0) for name in ore_names]
+
+        ore_samples = [[] for _ in ore_names]
+        values = []
+        scus = []
+        masses = []
+
+        for _ in range(self.draws):
+            shares = []
+            for prob, low, high, mode in params:
+                share = _triangular_inverse(rng.random(), low, high, mode)
+                shares.append(share if rng.random() < prob else 0.0)
+
+            total = sum(shares)
+            if total > 1.0:
+                shares = [share / total for share in shares]
+
+            mass = _triangular_inverse(rng.random(), mass_low, mass_high, mass_mode) * factor
+            scu_total = mass / MASS_PER_SCU
+
+            value = 0.0
+            for index, share in enumerate(shares):
+                if share > 0:
+                    ore_samples[index].append(share)
+                    value += share * scu_total * price_vector[index]
+
+            values.append(value)
+            scus.append(sum(shares) * scu_total)
+            masses.append(mass)
+
+        ore_bands = [
+            self._ore_band(name, len(samples) / self.draws, _percentiles(samples))
+            for name, samples in zip(ore_names, ore_samples)
+        ]
+
+        return self._result(
+            ore_bands,
+            _percentiles(values), sum(values) / len(values),
+            _percentiles(scus),
+            _percentiles(masses)
+        )
+
+    def _ore_band(self, name, presence, band):
+        entry = {'name': name, 'presence': round(presence, 3)}
+        for pct, value in zip(PERCENTILES, band):
+            entry[f'p{pct}'] = round(float(value), 3)
+        return entry
+
+    def _result(self, ore_bands, value_band, value_mean, scu_band, mass_band):
+        """Ergebnis im API-Format (Erze sortiert nach erwartetem Anteil)"""
+        def band(values, digits=0):
+            return {f'p{pct}': round(float(value), digits) for pct, value in zip(PERCENTILES, values)}
+
+        ore_bands.sort(key=lambda entry: entry['presence'] * entry['p50'], reverse=True)
+        value = band(value_band)
+        value['mean'] = round(value_mean)
+        return {
+            'ores': ore_bands,
+            'value': value,
+            'scu': band(scu_band, 1),
+            'mass': band(mass_band)
+        }
@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 
 
 class ConfigManager:
@@ -7,6 +8,7 @@ class ConfigManager:
 
     def __init__(self, config_file="mining_analyzer_config.json"):
         self.config_file = config_file
+        self.file_lock = threading.Lock()
         self.config = self.load_config()
 
         # Historien für beide Systeme
@@ -33,6 +35,21 @@ class ConfigManager:
             'price_overlay_position': {'x': 850, 'y': 250},
             'overlay_auto_hide_seconds': 10,
             'gaming_mode_enabled': False,
+            'gaming_hotkeys': {},
+            'mining_ship': 'PROSPECTOR',
+            'follow_path': None,
+            'query_server_enabled': False,
+            'query_server_host': '127.0.0.1',
+            'query_server_port': 8765,
+            'crew_sync_enabled': False,
+            'crew_peers': [],
+            'crew_name': '',
+            'crew_sync_interval': 5.0,
+            # Adresse des Query-Servers während des Crew-Syncs (None = alle Schnittstellen, nur solange der Sync läuft)
+            'crew_sync_host': None,
+            # Gemeinsamer Schlüssel der Crew - ohne ihn wird kein Crew-Sync gestartet
+            'crew_token': '',
+            'instance_id': None,
             'selected_system': 'STANTON'
         }
 
@@ -58,12 +75,37 @@ class ConfigManager:
             self.config['overlay_auto_hide_seconds'] = self.config.get('overlay_auto_hide_seconds', 10)
             self.config['selected_system'] = current_system
 
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            with self.file_lock:
+                with open(self.config_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.config, f, indent=2, ensure_ascii=False)
             print(f"[INFO] Config gespeichert: Gaming={gaming_mode}, System={current_system}")
         except (IOError, TypeError) as e:
             print(f"[WARNING] Konfiguration konnte nicht gespeichert werden: {e}")
 
+    def update_setting(self, key, value):
+        """Setze eine einzelne Einstellung und schreibe nur diesen Schlüssel in die Datei"""
+        self.config[key] = value
+        try:
+            with self.file_lock:
+                data = {}
+                if os.path.exists(self.config_file):
+                    try:
+                        with open(self.config_file, 'r', encoding='utf-8') as f:
+                            data = json.load(f)
+                    except json.JSONDecodeError:
+                        # Defekte Datei: mit dem kompletten Stand im Speicher überschreiben
+                        data = dict(self.config)
+                data[key] = value
+
+                tmp_file = self.config_file + '.tmp'
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_file, self.config_file)
+            return True
+        except (IOError, OSError, TypeError) as e:
+            print(f"[WARNING] Einstellung {key} konnte nicht gespeichert werden: {e}")
+            return False
+
     def get_current_history(self, system):
         """Hole die Historie für ein System"""
         if system == 'STANTON':
@@ -0,0 +1,242 @@
+"""
+Headless Ersatz für pywebview
+Implementiert create_window, evaluate_js, resize, destroy, windows und screens in reinem Python
+mit simulierten Latenzen, damit die komplette Pipeline ohne Display/GPU getestet werden kann.
+
+    MINING_ANALYZER_UI=fake python mining_analyzer.py
+"""
+
+import json
+import threading
+import time
+
+# Simulierte Latenzen in Sekunden (grob an pywebview/EdgeChromium unter Windows angelehnt)
+LATENCY = {
+    'create_window': 0.150,
+    'load_html': 0.040,
+    'evaluate_js': 0.002,
+    'layout': 0.016,
+    'resize': 0.004,
+    'move': 0.004,
+    'show': 0.010,
+    'hide': 0.005,
+    'destroy': 0.030
+}
+
+# Skalierung aller Latenzen (0 = keine Wartezeiten)
+latency_scale = 1.0
+
+# Zähler pro Operation für Benchmarks
+call_counts = {}
+
+windows = []
+_windows_lock = threading.Lock()
+_all_closed = threading.Event()
+_all_closed.set()
+
+
+class Screen:
+    """Ersatz für webview.Screen"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def __repr__(self):
+        return f"Screen({self.width}x{self.height})"
+
+
+screens = [Screen(1920, 1080)]
+
+
+def set_latency_scale(scale):
+    """Setze die Skalierung aller simulierten Latenzen"""
+    global latency_scale
+    latency_scale = max(0.0, float(scale))
+
+
+def reset_stats():
+    """Setze die Operations-Zähler zurück"""
+    call_counts.clear()
+
+
+def _simulate(operation):
+    """Zähle eine Operation und warte die simulierte Latenz ab"""
+    call_counts[operation] = call_counts.get(operation, 0) + 1
+    delay = LATENCY.get(operation, 0.0) * latency_scale
+    if delay > 0:
+        time.sleep(delay)
+
+
+class Event:
+    """Ersatz für webview.event.Event (Handler per += / -=)"""
+
+    def __init__(self):
+        self._handlers = []
+
+    def __iadd__(self, handler):
+        self._handlers.append(handler)
+        return self
+
+    def __isub__(self, handler):
+        if handler in self._handlers:
+            self._handlers.remove(handler)
+        return self
+
+    def set(self, *args):
+        for handler in list(self._handlers):
+            handler(*args)
+
+
+class WindowEvents:
+    """Ersatz für window.events"""
+
+    def __init__(self):
+        self.loaded = Event()
+        self.shown = Event()
+        self.moved = Event()
+        self.resized = Event()
+        self.closed = Event()
+
+
+class Window:
+    """Ersatz für webview.Window"""
+
+    def __init__(self, title, html='', js_api=None, width=800, height=600, x=None, y=None,
+                 hidden=False, on_top=False, **kwargs):
+        self.title = title
+        self.html = html or ''
+        self.js_api = js_api
+        self.width = width
+        self.height = height
+        self.x = x if x is not None else 0
+        self.y = y if y is not None else 0
+        self.hidden = hidden
+        self.on_top = on_top
+        self.options = kwargs
+        self.destroyed = False
+        self.events = WindowEvents()
+
+        # Alle ausgewerteten Skripte (für Tests/Benchmarks)
+        self.evaluated = []
+
+        # Optionaler Handler für evaluate_js: fn(window, script) -> Ergebnis
+        self.evaluate_handler = None
+
+    def evaluate_js(self, script):
+        """Führe 'JavaScript' aus - liefert simulierte Ergebnisse"""
+        self._check_alive()
+        _simulate('evaluate_js')
+        self.evaluated.append(script)
+
+        if self.evaluate_handler:
+            return self.evaluate_handler(self, script)
+        if script.startswith('updateOverlay('):
+            self._simulate_overlay_update(script)
+            return None
+        if 'scrollHeight' in script:
+            return self.content_height()
+        return None
+
+    def content_height(self):
+        """Geschätzte Dokumenthöhe aus der Anzahl der Tabellenzeilen"""
+        return 200 + self.html.count('<tr') * 19
+
+    def _simulate_overlay_update(self, script):
+        """Simuliere updateOverlay() der Overlay-Seite inklusive Größenmeldung"""
+        try:
+            data = json.loads(script[len('updateOverlay('):script.rindex(')')])
+        except ValueError:
+            return
+        self.html = data.get('html', '')
+        if data.get('measure'):
+            self.report_layout()
+
+    def report_layout(self):
+        """Melde die Höhe nach simuliertem Layout an die JS-API (wie die echte Seite)"""
+        callback = getattr(self.js_api, 'report_overlay_size', None)
+        if callback is None:
+            return
+        timer = threading.Timer(LATENCY['layout'] * latency_scale, callback, args=(self.content_height(),))
+        timer.daemon = True
+        timer.start()
+
+    def load_html(self, html):
+        self._check_alive()
+        _simulate('load_html')
+        self.html = html
+
+    def resize(self, width, height):
+        self._check_alive()
+        _simulate('resize')
+        self.width = width
+        self.height = height
+        self.events.resized.set(width, height)
+
+    def move(self, x, y):
+        self._check_alive()
+        _simulate('move')
+        self.x = x
+        self.y = y
+        self.events.moved.set(x, y)
+
+    def show(self):
+        self._check_alive()
+        _simulate('show')
+        self.hidden = False
+
+    def hide(self):
+        self._check_alive()
+        _simulate('hide')
+        self.hidden = True
+
+    def destroy(self):
+        if self.destroyed:
+            return
+        _simulate('destroy')
+        self.destroyed = True
+        self.events.closed.set()
+        with _windows_lock:
+            if self in windows:
+                windows.remove(self)
+            if not windows:
+                _all_closed.set()
+
+    def _check_alive(self):
+        if self.destroyed:
+            raise RuntimeError(f"Fenster '{self.title}' wurde bereits zerstört")
+
+    def __repr__(self):
+        state = 'hidden' if self.hidden else 'visible'
+        return f"Window({self.title!r}, {self.width}x{self.height} @ {self.x},{self.y}, {state})"
+
+
+def create_window(title, url=None, html=None, js_api=None, width=800, height=600, x=None, y=None, **kwargs):
+    """Erstelle ein simuliertes Fenster"""
+    _simulate('create_window')
+    window = Window(title, html=html, js_api=js_api, width=width, height=height, x=x, y=y, **kwargs)
+    window.url = url
+    with _windows_lock:
+        windows.append(window)
+        _all_closed.clear()
+    window.report_layout()
+    return window
+
+
+def start(func=None, args=None, debug=False, **kwargs):
+    """Starte die 'GUI' - blockiert bis alle Fenster zerstört wurden"""
+    if func:
+        if args is None:
+            args = ()
+        elif not isinstance(args, (list, tuple)):
+            args = (args,)
+        threading.Thread(target=func, args=tuple(args), daemon=True).start()
+    _all_closed.wait()
+
+
+def shutdown():
+    """Zerstöre alle Fenster (beendet start())"""
+    with _windows_lock:
+        open_windows = list(windows)
+    for window in open_windows:
+        window.destroy()
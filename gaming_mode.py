@@ -1,3 +1,9 @@
+import json
+import threading
+import time
+
+from ui_scheduler import UIScheduler
+
 try:
     from pynput import keyboard
 
@@ -7,144 +13,249 @@ except ImportError:
     print("[INFO] pynput nicht installiert - Gaming-Modus nicht verfügbar")
 
 
+# Maximale UI-Update-Rate für den Eingabepuffer (Updates pro Sekunde)
+UI_UPDATE_RATE = 30
+
+# Standard-Tastenbelegung: Aktion -> Tasten
+# Tasten: Name einer Sondertaste ('f11', 'esc'), 'vk:<Code>' oder ein Zeichen
+DEFAULT_HOTKEYS = {
+    'toggle_gaming': ['f11'],
+    'search': ['vk:107', '+'],
+    'price_list': ['vk:109', '-'],
+    'reset': ['esc'],
+    'backspace': ['backspace']
+}
+
+# Maximale Anzahl Ziffern (entspricht maxlength des Eingabefelds)
+MAX_SIGNAL_DIGITS = 6
+
+
 class GamingMode:
     """Verwaltet Gaming-Modus mit globalen Hotkeys"""
 
-    def __init__(self, js_callback):
+    def __init__(self, js_callback, search_callback=None, hotkeys=None, scheduler=None):
         """
-        js_callback: Funktion die JavaScript-Code ausführt
+        js_callback: Funktion die JavaScript-Code ausführt - fn(js_code, kind=None)
+        search_callback: Funktion die eine Signal-Suche im Backend ausführt
+        hotkeys: Optionale Tastenbelegung {Aktion: [Tasten]} aus der Konfiguration
+        scheduler: Gemeinsamer UIScheduler für gebündelte UI-Updates
         """
         self.js_callback = js_callback
+        self.search_callback = search_callback
         self.gaming_mode = False
         self.global_listener = None
 
+        # Der Listener läuft dauerhaft, Tastendrücke werden nur bei offenem Gate verarbeitet
+        self.listener_gate = threading.Event()
+        self.key_table = self._build_key_table(hotkeys)
+
+        # Eingabepuffer gehört Python - die UI bekommt nur den Zustand gemeldet
+        self.input_buffer = ''
+        self.buffer_lock = threading.Lock()
+        self.ui_update_interval = 1.0 / UI_UPDATE_RATE
+        self._owns_scheduler = scheduler is None
+        self.scheduler = scheduler or UIScheduler('GamingScheduler').start()
+        self._last_ui_update = 0.0
+        self._entry_started = None
+
+        # Optionaler Hook für Latenzmessungen: fn(signal_value, entry_started, result)
+        self.on_search_done = None
+
     def toggle(self):
         """Gaming-Modus ein/ausschalten"""
         if not GLOBAL_HOTKEYS_AVAILABLE:
             return {'success': False, 'error': 'pynput nicht installiert'}
 
         if self.gaming_mode:
-            # Ausschalten
+            # Ausschalten - der Listener bleibt bestehen, nur das Gate schließt
             self.gaming_mode = False
-            if self.global_listener:
-                try:
-                    self.global_listener.stop()
-                except Exception as e:
-                    print(f"[WARNING] Listener konnte nicht gestoppt werden: {e}")
-                finally:
-                    self.global_listener = None
+            self.listener_gate.clear()
             return {'success': True, 'active': False, 'message': 'Gaming-Modus deaktiviert'}
         else:
             # Einschalten
             try:
+                self._ensure_listener()
                 self.gaming_mode = True
-                self.global_listener = keyboard.Listener(
-                    on_press=self.on_global_key_press,
-                    suppress=False
-                )
-                self.global_listener.start()
+                self.listener_gate.set()
                 return {'success': True, 'active': True, 'message': 'Gaming-Modus aktiviert'}
             except Exception as e:
                 self.gaming_mode = False
+                self.listener_gate.clear()
                 return {'success': False, 'error': str(e)}
 
+    def _ensure_listener(self):
+        """Starte den langlebigen Tastatur-Listener (nur einmal pro Sitzung)"""
+        if self.global_listener is None:
+            self.global_listener = keyboard.Listener(
+                on_press=self.on_global_key_press,
+                suppress=False
+            )
+            self.global_listener.start()
+
     def pause_listener(self):
         """Pausiere Gaming-Listener temporär"""
-        if self.gaming_mode and self.global_listener:
-            try:
-                self.global_listener.stop()
-                self.global_listener = None
-                print("[DEBUG] Gaming-Listener pausiert")
-                return {'success': True}
-            except Exception as e:
-                print(f"[WARNING] Listener konnte nicht pausiert werden: {e}")
-                return {'success': False, 'error': str(e)}
+        self.listener_gate.clear()
         return {'success': True}
 
     def resume_listener(self):
         """Setze Gaming-Listener fort"""
-        if self.gaming_mode and not self.global_listener:
-            try:
-                self.global_listener = keyboard.Listener(
-                    on_press=self.on_global_key_press,
-                    suppress=False
-                )
-                self.global_listener.start()
-                print("[DEBUG] Gaming-Listener fortgesetzt")
-                return {'success': True}
-            except Exception as e:
-                print(f"[WARNING] Listener konnte nicht fortgesetzt werden: {e}")
-                return {'success': False, 'error': str(e)}
+        if self.gaming_mode:
+            self.listener_gate.set()
         return {'success': True}
 
+    def _build_key_table(self, hotkeys):
+        """Erstelle die Dispatch-Tabelle Taste -> (Funktion, Argumente)"""
+        actions = {
+            'toggle_gaming': self._toggle_from_hotkey,
+            'search': self.submit,
+            'price_list': self._toggle_price_list,
+            'reset': self.reset_input,
+            'backspace': self.backspace
+        }
+
+        table = {}
+
+        # Ziffern: Numpad (vk 96-105), Hauptfeld (vk 48-57) und als Zeichen
+        for digit in range(10):
+            entry = (self.add_digit, (str(digit),))
+            table[f'vk:{96 + digit}'] = entry
+            table[f'vk:{48 + digit}'] = entry
+            table[str(digit)] = entry
+
+        bindings = dict(DEFAULT_HOTKEYS)
+        if hotkeys:
+            bindings.update(hotkeys)
+
+        for action, keys in bindings.items():
+            handler = actions.get(action)
+            if handler is None:
+                print(f"[WARNING] Unbekannte Hotkey-Aktion in Konfiguration: {action}")
+                continue
+            if isinstance(keys, str):
+                keys = [keys]
+            for key_name in keys:
+                table[str(key_name)] = (handler, ())
+
+        return table
+
+    def _toggle_from_hotkey(self):
+        """F11: Gaming-Modus über die UI umschalten"""
+        self.js_callback("toggleGamingModeFromPython()")
+
+    def _toggle_price_list(self):
+        """Numpad Minus: Preisliste umschalten"""
+        self.js_callback("togglePriceListFromGaming();")
+
     def on_global_key_press(self, key):
         """Globale Tastatur-Eingaben für Gaming-Modus"""
-        if not self.gaming_mode:
+        if not self.listener_gate.is_set():
             return
 
         try:
-            # F11 = Gaming-Modus Toggle
-            if key == keyboard.Key.f11:
-                self.js_callback("toggleGamingModeFromPython()")
-                return
-
-            # Numpad-Zahlen
-            if hasattr(key, 'vk'):
-                vk = key.vk
+            key_table = self.key_table
 
-                # Numpad 0-9
-                if 96 <= vk <= 105:
-                    number = str(vk - 96)
-                    js_code = f"addNumberFromGaming('{number}');"
-                    self.js_callback(js_code)
+            # Sondertasten (pynput Key) haben einen Namen, z.B. 'f11' oder 'esc'
+            name = getattr(key, 'name', None)
+            if name:
+                entry = key_table.get(name)
+                if entry:
+                    entry[0](*entry[1])
                     return
 
-                # Normale Zahlen 0-9
-                elif 48 <= vk <= 57:
-                    number = str(vk - 48)
-                    js_code = f"addNumberFromGaming('{number}');"
-                    self.js_callback(js_code)
+            # Virtual-Key-Code vor Zeichen prüfen (Numpad liefert beides)
+            vk = getattr(key, 'vk', None)
+            if vk is not None:
+                entry = key_table.get(f'vk:{vk}')
+                if entry:
+                    entry[0](*entry[1])
                     return
 
-                # Numpad Plus = Suchen
-                elif vk == 107:
-                    self.js_callback("searchFromGaming();")
+            char = getattr(key, 'char', None)
+            if char:
+                entry = key_table.get(char)
+                if entry:
+                    entry[0](*entry[1])
                     return
 
-                # Numpad Minus = Preisliste
-                elif vk == 109:
-                    self.js_callback("togglePriceListFromGaming();")
-                    return
+        except Exception as e:
+            print(f"[ERROR] Gaming-Modus Tastaturverarbeitung fehlgeschlagen: {e}")
 
-            # Normale Zahlen als Zeichen
-            if hasattr(key, 'char') and key.char and key.char.isdigit():
-                number = key.char
-                js_code = f"addNumberFromGaming('{number}');"
-                self.js_callback(js_code)
-                return
+    # ==================== Eingabepuffer ====================
 
-            # Plus = Suchen
-            if hasattr(key, 'char') and key.char == '+':
-                self.js_callback("searchFromGaming();")
+    def add_digit(self, digit):
+        """Hänge eine Ziffer an den Eingabepuffer an"""
+        with self.buffer_lock:
+            if len(self.input_buffer) >= MAX_SIGNAL_DIGITS:
                 return
+            if not self.input_buffer:
+                self._entry_started = time.perf_counter()
+            self.input_buffer += digit
+        self._schedule_ui_update()
 
-            # Minus = Preisliste
-            if hasattr(key, 'char') and key.char == '-':
-                self.js_callback("togglePriceListFromGaming();")
+    def backspace(self):
+        """Lösche die letzte Ziffer im Eingabepuffer"""
+        with self.buffer_lock:
+            if not self.input_buffer:
                 return
+            self.input_buffer = self.input_buffer[:-1]
+        self._schedule_ui_update()
 
-            # ESC = Reset
-            if key == keyboard.Key.esc:
-                self.js_callback("resetFromGaming();")
-                return
+    def reset_input(self):
+        """Setze den Eingabepuffer zurück"""
+        with self.buffer_lock:
+            self.input_buffer = ''
+            self._entry_started = None
+        self._schedule_ui_update()
 
-            # Backspace = Letzte Ziffer löschen
-            if key == keyboard.Key.backspace:
-                self.js_callback("backspaceFromGaming();")
-                return
+    def get_input(self):
+        """Hole den aktuellen Eingabepuffer"""
+        with self.buffer_lock:
+            return self.input_buffer
 
+    def submit(self):
+        """Starte die Suche mit dem aktuellen Puffer direkt im Backend"""
+        with self.buffer_lock:
+            signal_value = self.input_buffer
+            entry_started = self._entry_started
+            self.input_buffer = ''
+            self._entry_started = None
+        self.scheduler.cancel('gaming_input')
+
+        if not signal_value:
+            return
+
+        if self.search_callback is None:
+            self.js_callback(f"searchFromGaming({json.dumps(signal_value)});")
+            return
+
+        # Suche nicht im Tastatur-Hook-Thread ausführen
+        threading.Thread(target=self._run_search, args=(signal_value, entry_started), daemon=True).start()
+
+    def _run_search(self, signal_value, entry_started=None):
+        """Führe die Suche aus und melde nur das Endergebnis an die UI"""
+        try:
+            result = self.search_callback(signal_value)
         except Exception as e:
-            print(f"[ERROR] Gaming-Modus Tastaturverarbeitung fehlgeschlagen: {e}")
+            print(f"[ERROR] Gaming-Suche fehlgeschlagen: {e}")
+            result = {'success': False, 'error': str(e)}
+        self.js_callback(f"showGamingSearchResult({json.dumps(result)});", 'gaming_result')
+
+        if self.on_search_done:
+            self.on_search_done(signal_value, entry_started, result)
+
+    def _schedule_ui_update(self):
+        """Plane ein gebündeltes UI-Update (höchstens UI_UPDATE_RATE pro Sekunde)"""
+        elapsed = time.perf_counter() - self._last_ui_update
+        delay = max(0.0, self.ui_update_interval - elapsed)
+        # Ein bereits geplantes Update überträgt ohnehin den neuesten Stand
+        self.scheduler.call_later(delay, self._flush_ui_update, key='gaming_input', coalesce=True)
+
+    def _flush_ui_update(self):
+        """Übertrage den aktuellen Pufferstand an die UI"""
+        with self.buffer_lock:
+            self._last_ui_update = time.perf_counter()
+            buffer = self.input_buffer
+        self.js_callback(f"updateGamingInput({json.dumps(buffer)});", 'gaming_input')
 
     def is_active(self):
         """Prüfe ob Gaming-Modus aktiv ist"""
@@ -152,8 +263,13 @@ class GamingMode:
 
     def cleanup(self):
         """Cleanup beim Beenden"""
+        self.listener_gate.clear()
+        self.scheduler.cancel('gaming_input')
+        if self._owns_scheduler:
+            self.scheduler.shutdown()
         if self.global_listener:
             try:
                 self.global_listener.stop()
             except:
-                pass
\ No newline at end of file
+                pass
+            self.global_listener = None
\ No newline at end of file
@@ -0,0 +1,480 @@
+"""
+Geteilte Scan-Historie einer Crew mit Delta-Sync zwischen Instanzen im LAN (ohne externen Dienst)
+
+Jede Instanz nummeriert ihre eigenen Scans fortlaufend (instance, seq). Die geteilte Historie ist
+die Vereinigung aller Scans, ein Versionsvektor {instance: höchste seq} beschreibt den Stand.
+Beim Sync werden nur Scans übertragen, die im Vektor der Gegenseite fehlen - das Zusammenführen
+ist konfliktfrei und in beliebiger Reihenfolge wiederholbar. Übertragen wird per POST /sync
+über den Query-Server. Jede Anfrage trägt den gemeinsamen Crew-Schlüssel, Anfragen ohne
+passenden Schlüssel werden abgelehnt; von Gegenstellen werden nur geprüfte Felder übernommen.
+
+    python history_sync.py demo --nodes 3 --scans 20     # mehrere lokale Prozesse, prüft Konvergenz
+"""
+
+import argparse
+import bisect
+import contextlib
+import hmac
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from datetime import datetime
+
+# Lokales Protokoll aller Scans (eine JSON-Zeile pro Scan, wird nur angehängt)
+HISTORY_FILE = 'crew_history.jsonl'
+
+# Länge der Liste der letzten Scans pro System
+RECENT_SIZE = 10
+
+# Abstand zwischen zwei Sync-Runden und Timeout pro Gegenstelle (Sekunden)
+SYNC_INTERVAL = 5.0
+SYNC_TIMEOUT = 3.0
+
+# Maximale Anzahl Scans pro Sync-Nachricht (der Rest folgt in der nächsten Runde)
+MAX_SYNC_EVENTS = 5000
+
+# Mindestlänge des gemeinsamen Crew-Schlüssels
+MIN_TOKEN_LENGTH = 8
+
+# Systeme, deren Scans übernommen werden
+SYSTEMS = ('STANTON', 'PYRO')
+
+# Obergrenzen für Texte und Signalwerte aus Scans der Gegenstellen
+MAX_INSTANCE_LENGTH = 64
+MAX_FINDER_LENGTH = 32
+MAX_TIME_LENGTH = 32
+MAX_SIGNAL_VALUE = 1000000
+
+
+def new_instance_id():
+    """Zufällige, kurze Instanz-ID"""
+    return uuid.uuid4().hex[:12]
+
+
+def check_token(token):
+    """Fehlertext, falls der Crew-Schlüssel fehlt oder zu kurz ist, sonst None"""
+    if not isinstance(token, str) or len(token) < MIN_TOKEN_LENGTH:
+        return f'crew_token fehlt oder ist kürzer als {MIN_TOKEN_LENGTH} Zeichen'
+    return None
+
+
+def _text(value, limit):
+    if not isinstance(value, str) or len(value) > limit:
+        raise ValueError('Text fehlt oder ist zu lang')
+    return value
+
+
+def sanitize_event(event):
+    """Nur bekannte, geprüfte Felder eines Scans übernehmen - liefert None bei ungültigen Scans"""
+    try:
+        seq = int(event['seq'])
+        signal_value = int(event['signal'])
+        ts = float(event['ts'])
+        clean = {
+            'instance': _text(event['instance'], MAX_INSTANCE_LENGTH),
+            'seq': seq,
+            'system': event['system'],
+            'signal': signal_value,
+            'time': _text(event.get('time', ''), MAX_TIME_LENGTH),
+            'ts': ts,
+            'finder': _text(event.get('finder') or '', MAX_FINDER_LENGTH)
+        }
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    if (not clean['instance'] or seq < 1 or clean['system'] not in SYSTEMS
+            or not 0 < signal_value <= MAX_SIGNAL_VALUE or not math.isfinite(ts)):
+        return None
+    return clean
+
+
+def _event_order(event):
+    """Sortierschlüssel (instance, seq) - ungültige Scans ans Ende, _apply verwirft sie"""
+    try:
+        return (0, str(event['instance']), int(event['seq']))
+    except (KeyError, TypeError, ValueError):
+        return (1, '', 0)
+
+
+class SharedHistory:
+    """Scan-Protokolle aller Instanzen und die daraus abgeleitete Ansicht der letzten Scans"""
+
+    def __init__(self, instance_id, history_file=HISTORY_FILE, recent_size=RECENT_SIZE, finder=''):
+        """
+        instance_id: Eindeutige ID dieser Instanz
+        history_file: JSONL-Datei für das lokale Protokoll (None = nur im Speicher)
+        finder: Anzeigename für eigene Scans (z.B. Spielername)
+        """
+        self.instance_id = instance_id
+        self.history_file = history_file
+        self.recent_size = recent_size
+        self.finder = finder
+        self._lock = threading.Lock()
+
+        # Instanz -> Scans in seq-Reihenfolge (Index = seq - 1, immer lückenlos)
+        self._logs = {}
+        # System -> {'entries': {Signal: Eintrag}, 'recent': [Eintrag], 'stamps': {Signal: [(ts, Zeit)]}}
+        self._views = {}
+
+        self.load()
+
+    def load(self):
+        """Lade das lokale Protokoll"""
+        if not self.history_file or not os.path.exists(self.history_file):
+            return
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                events = [json.loads(line) for line in f if line.strip()]
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"[ERROR] Fehler beim Laden von {self.history_file}: {e}")
+            return
+
+        # Ältere Dateien können Zeilen außerhalb der seq-Reihenfolge enthalten
+        events = sorted(filter(None, map(sanitize_event, events)), key=_event_order)
+        with self._lock:
+            applied = [event for event in events if self._apply(event)]
+        print(f"[INFO] Crew-Historie geladen: {len(applied)} Scans von {len(self._logs)} Instanzen")
+
+    def _append_to_file(self, events):
+        """Scans ans Protokoll anhängen (Lock muss gehalten werden, sonst geraten die seq durcheinander)"""
+        if not self.history_file or not events:
+            return
+        try:
+            with open(self.history_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in events))
+        except IOError as e:
+            print(f"[WARNING] Crew-Historie konnte nicht gespeichert werden: {e}")
+
+    # ==================== Protokoll ====================
+
+    def vector(self):
+        """Versionsvektor {instance: höchste lückenlose seq}"""
+        with self._lock:
+            return {instance: len(log) for instance, log in self._logs.items()}
+
+    def record(self, system, signal_value, timestamp=None):
+        """Eigenen Scan aufnehmen (None, wenn die Gegenstellen ihn ablehnen würden)"""
+        now = time.time()
+        with self._lock:
+            event = sanitize_event({
+                'instance': self.instance_id,
+                'seq': len(self._logs.get(self.instance_id, ())) + 1,
+                'system': system,
+                'signal': signal_value,
+                'time': timestamp or datetime.fromtimestamp(now).strftime("%d.%m.%Y %H:%M:%S"),
+                'ts': now,
+                'finder': (self.finder or '')[:MAX_FINDER_LENGTH]
+            })
+            if event is None:
+                # Sonst entstünde eine Lücke, hinter der die Gegenstellen keine Scans mehr übernehmen
+                print(f"[WARNING] Scan {signal_value} ({system}) nicht in die Crew-Historie übernommen")
+                return None
+            self._apply(event)
+            self._append_to_file([event])
+        return event
+
+    def delta(self, vector, limit=MAX_SYNC_EVENTS):
+        """Alle Scans, die im Vektor der Gegenseite fehlen - liefert (Scans, weitere vorhanden)"""
+        events = []
+        with self._lock:
+            for instance, log in self._logs.items():
+                known = vector.get(instance, 0)
+                if known < len(log):
+                    events.extend(log[known:known + limit - len(events)])
+                    if len(events) >= limit:
+                        return events, True
+        return events, False
+
+    def merge(self, events):
+        """Scans der Gegenseite übernehmen (Duplikate, Lücken und ungültige Scans werden ignoriert) - liefert Anzahl neuer Scans"""
+        events = [sanitize_event(event) for event in events]
+        with self._lock:
+            applied = [event for event in events if event is not None and self._apply(event)]
+            self._append_to_file(applied)
+        return len(applied)
+
+    def _apply(self, event):
+        """Scan ins Protokoll und in die Ansicht übernehmen (Lock muss gehalten werden)"""
+        try:
+            instance = event['instance']
+            seq = int(event['seq'])
+            system = event['system']
+            signal_value = int(event['signal'])
+            ts = float(event['ts'])
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        log = self._logs.setdefault(instance, [])
+        if seq != len(log) + 1:
+            # Bereits bekannt oder Lücke (fehlende Scans kommen mit dem nächsten Sync)
+            return False
+        log.append(event)
+
+        view = self._views.setdefault(system, {'entries': {}, 'recent': [], 'stamps': {}})
+        entry = view['entries'].get(signal_value)
+        stamps = view['stamps'].setdefault(signal_value, [])
+        bisect.insort(stamps, (ts, event.get('time', '')))
+
+        if entry is None:
+            entry = {'signal': signal_value, 'count': 0, 'finders': []}
+            view['entries'][signal_value] = entry
+        entry['count'] = len(stamps)
+        entry['timestamps'] = [stamp for _, stamp in stamps]
+        entry['ts'], entry['time'] = stamps[-1]
+        finder = event.get('finder') or instance
+        if finder not in entry['finders']:
+            entry['finders'].append(finder)
+
+        self._update_recent(view['recent'], entry)
+        return True
+
+    def _update_recent(self, recent, entry):
+        """Liste der letzten Scans nachführen (Länge ist konstant, also O(1) pro Scan)"""
+        key = (-entry['ts'], entry['signal'])
+        if any(item is entry for item in recent):
+            recent.remove(entry)
+        elif len(recent) >= self.recent_size and key > (-recent[-1]['ts'], recent[-1]['signal']):
+            return
+        keys = [(-item['ts'], item['signal']) for item in recent]
+        recent.insert(bisect.bisect_left(keys, key), entry)
+        del recent[self.recent_size:]
+
+    # ==================== Abfragen ====================
+
+    def recent(self, system):
+        """Letzte Scans eines Systems (neueste zuerst), Format wie die lokale Historie"""
+        with self._lock:
+            view = self._views.get(system)
+            return [dict(entry, timestamps=list(entry['timestamps'])) for entry in view['recent']] if view else []
+
+    def stats(self):
+        with self._lock:
+            return {
+                'instance': self.instance_id,
+                'instances': len(self._logs),
+                'scans': sum(len(log) for log in self._logs.values())
+            }
+
+
+class HistorySyncer:
+    """Synchronisiert eine SharedHistory regelmäßig mit den Gegenstellen (eigener Thread)"""
+
+    def __init__(self, history, peers, token, interval=SYNC_INTERVAL, timeout=SYNC_TIMEOUT):
+        """
+        peers: Liste von 'host:port' anderer Instanzen (deren Query-Server)
+        token: Gemeinsamer Crew-Schlüssel (muss bei allen Instanzen gleich sein)
+        """
+        self.history = history
+        self.peers = list(peers)
+        self.token = token
+        self.interval = interval
+        self.timeout = timeout
+
+        self._stop = threading.Event()
+        self._thread = None
+
+        # Statistik
+        self.rounds = 0
+        self.sent = 0
+        self.received = 0
+        self.errors = 0
+
+    def start(self):
+        """Starte den Sync-Thread"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='HistorySyncer', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stoppe den Sync-Thread"""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync_all()
+            self._stop.wait(self.interval)
+
+    def sync_all(self):
+        """Eine Sync-Runde mit allen Gegenstellen - liefert Anzahl neu empfangener Scans"""
+        self.rounds += 1
+        received = 0
+        for peer in self.peers:
+            try:
+                received += self.sync_peer(peer)
+            except (OSError, ValueError) as e:
+                # Gegenstelle nicht erreichbar: nächste Runde erneut versuchen
+                self.errors += 1
+                print(f"[DEBUG] Crew-Sync mit {peer} fehlgeschlagen: {e}")
+        return received
+
+    def sync_peer(self, peer):
+        """Erst das Delta der Gegenseite holen, dann genau das fehlende eigene Delta senden"""
+        received = 0
+        while True:
+            data = self._post(peer, [])
+            received += self.history.merge(data.get('events', []))
+
+            # Der gerade gemeldete Vektor der Gegenseite bestimmt, was ihr fehlt
+            events, more = self.history.delta(data.get('vector', {}))
+            if events:
+                data = self._post(peer, events)
+                received += self.history.merge(data.get('events', []))
+                self.sent += len(events)
+
+            if not more and not data.get('more'):
+                break
+        self.received += received
+        return received
+
+    def _post(self, peer, events):
+        request = json.dumps({
+            'token': self.token,
+            'instance': self.history.instance_id,
+            'vector': self.history.vector(),
+            'events': events
+        }).encode('utf-8')
+
+        with urllib.request.urlopen(urllib.request.Request(
+                f'http://{peer}/sync', data=request, headers={'Content-Type': 'application/json'}),
+                timeout=self.timeout) as response:
+            data = json.loads(response.read())
+        if not data.get('success'):
+            raise ValueError(data.get('error', 'Sync abgelehnt'))
+        return data
+
+
+def handle_sync_request(history, data, token):
+    """
+    Serverseite von /sync: Scans übernehmen und das Delta für die Gegenseite liefern
+    token: Eigener Crew-Schlüssel - ohne gültigen Schlüssel wird jede Anfrage abgelehnt (PermissionError)
+    """
+    sent_token = data.get('token')
+    if check_token(token) or not isinstance(sent_token, str) or \
+            not hmac.compare_digest(sent_token.encode('utf-8'), token.encode('utf-8')):
+        raise PermissionError('Crew-Schlüssel fehlt oder ist falsch')
+
+    events = data.get('events', [])
+    vector = data.get('vector', {})
+    if not isinstance(events, list) or not isinstance(vector, dict):
+        raise ValueError('events muss eine Liste und vector ein Objekt sein')
+
+    history.merge(events)
+    delta, more = history.delta(vector)
+    return {
+        'success': True,
+        'instance': history.instance_id,
+        'vector': history.vector(),
+        'events': delta,
+        'more': more
+    }
+
+
+# ==================== Lokaler Test mit mehreren Prozessen ====================
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def run_node(args):
+    """Eine Instanz: Query-Server mit /sync, zufällige Scans, danach Stand als JSON auf stdout"""
+    from query_server import QueryServer
+
+    rng = random.Random(args.seed)
+    with contextlib.redirect_stdout(sys.stderr):
+        history = SharedHistory(args.instance or new_instance_id(), args.history, finder=f'node{args.seed}')
+        server = QueryServer('127.0.0.1', args.port, history=history, sync_token=args.token).start()
+        syncer = HistorySyncer(history, args.peers, args.token, interval=args.interval, timeout=1.0).start()
+        try:
+            for _ in range(args.scans):
+                history.record(rng.choice(SYSTEMS), rng.choice((1700, 1850, 3600, 3700, 5550, 7200)))
+                time.sleep(rng.uniform(0, args.interval))
+            # Nachlauf, damit alle Gegenstellen die letzten Scans abholen
+            time.sleep(args.settle)
+        finally:
+            syncer.stop()
+            server.stop()
+
+    print(json.dumps({
+        'vector': history.vector(),
+        'recent': {system: [(e['signal'], e['count'], e['time']) for e in history.recent(system)]
+                   for system in SYSTEMS},
+        'sent': syncer.sent,
+        'received': syncer.received
+    }, sort_keys=True))
+    return 0
+
+
+def run_demo(args):
+    """Startet mehrere Instanzen als Prozesse und prüft, ob alle am Ende den gleichen Stand haben"""
+    ports = [_free_port() for _ in range(args.nodes)]
+    workdir = tempfile.mkdtemp(prefix='crew_sync_')
+    token = uuid.uuid4().hex
+    processes = []
+    for index, port in enumerate(ports):
+        peers = [f'127.0.0.1:{p}' for p in ports if p != port]
+        command = [
+            sys.executable, os.path.abspath(__file__), 'node',
+            '--port', str(port), '--seed', str(index), '--scans', str(args.scans),
+            '--interval', str(args.interval), '--settle', str(args.settle),
+            '--history', os.path.join(workdir, f'node{index}.jsonl'), '--token', token, '--peers', *peers
+        ]
+        processes.append(subprocess.Popen(command, stdout=subprocess.PIPE, text=True))
+
+    results = [json.loads(process.communicate()[0]) for process in processes]
+    for index, result in enumerate(results):
+        print(f"Instanz {index}: {sum(result['vector'].values())} Scans, "
+              f"gesendet={result['sent']}, empfangen={result['received']}")
+
+    converged = all(
+        result['vector'] == results[0]['vector'] and result['recent'] == results[0]['recent']
+        for result in results
+    )
+    print(f"Konvergiert: {'ja' if converged else 'NEIN'} (Protokolle in {workdir})")
+    return 0 if converged else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Crew-Historie: Delta-Sync zwischen lokalen Instanzen testen')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    demo = commands.add_parser('demo', help='Mehrere Instanzen als Prozesse starten und Konvergenz prüfen')
+    demo.add_argument('--nodes', type=int, default=3)
+
+    node = commands.add_parser('node', help='Eine Instanz (wird von demo gestartet)')
+    node.add_argument('--port', type=int, required=True)
+    node.add_argument('--peers', nargs='*', default=[])
+    node.add_argument('--seed', type=int, default=0)
+    node.add_argument('--instance')
+    node.add_argument('--history', help='JSONL-Datei des lokalen Protokolls')
+    node.add_argument('--token', required=True, help='Gemeinsamer Crew-Schlüssel')
+
+    for command in (demo, node):
+        command.add_argument('--scans', type=int, default=20, help='Scans pro Instanz')
+        command.add_argument('--interval', type=float, default=0.2, help='Sync-Intervall (Sekunden)')
+        command.add_argument('--settle', type=float, default=2.0, help='Nachlauf nach dem letzten Scan (Sekunden)')
+
+    args = parser.parse_args(argv)
+    return run_demo(args) if args.command == 'demo' else run_node(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Prozess-Pool für rechenintensive Analysen mit Prioritäten und Abbruch veralteter Jobs
+
+Im Pool liegt höchstens ein Job pro Worker, alle weiteren warten in einer Prioritäts-Warteschlange
+(kleinere Zahl = früher). Jobs melden Fortschritt über report_progress(); Start, Fortschritt,
+Ergebnis und Dauer gehen als Events an einen Callback, der nie im Aufrufer-Thread wartet.
+"""
+
+import concurrent.futures
+import functools
+import heapq
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+# Prioritäten (kleiner = früher)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+# Plätze im Ring der abgebrochenen Job-IDs, den laufende Jobs bei report_progress() prüfen
+CANCEL_SLOTS = 64
+
+# Worker-Zustand (wird im Initializer gesetzt)
+_progress_queue = None
+_cancelled_ids = None
+_current_job_id = None
+
+
+class JobCancelled(Exception):
+    """Wird in einem laufenden Job ausgelöst, wenn er abgebrochen wurde"""
+
+
+def init_worker(progress_queue, cancelled_ids, initializer=None, initargs=()):
+    """Initializer der Worker-Prozesse"""
+    global _progress_queue, _cancelled_ids
+    _progress_queue = progress_queue
+    _cancelled_ids = cancelled_ids
+    if initializer:
+        initializer(*initargs)
+
+
+def is_cancelled():
+    """Im Job aufrufen: wurde der laufende Job abgebrochen?"""
+    return _current_job_id is not None and _current_job_id in _cancelled_ids[:]
+
+
+def report_progress(fraction, message=''):
+    """Im Job aufrufen: Fortschritt (0..1) melden, wirft JobCancelled wenn der Job abgebrochen wurde"""
+    if _current_job_id is None:
+        return
+    if is_cancelled():
+        raise JobCancelled()
+    _progress_queue.put((_current_job_id, float(fraction), message))
+
+
+def _run_job(job_id, function, args, kwargs):
+    """Läuft im Worker - liefert (Ergebnis, Sekunden)"""
+    global _current_job_id
+    _current_job_id = job_id
+    start = time.perf_counter()
+    try:
+        if is_cancelled():
+            raise JobCancelled()
+        result = function(*args, **kwargs)
+    finally:
+        _current_job_id = None
+    return result, time.perf_counter() - start
+
+
+class Job:
+    """Ein eingereichter Job"""
+
+    __slots__ = ('job_id', 'name', 'group', 'priority', 'function', 'args', 'kwargs',
+                 'state', 'future', 'pool', 'submitted')
+
+    def __init__(self, job_id, name, group, priority, function, args, kwargs):
+        self.job_id = job_id
+        self.name = name
+        self.group = group
+        self.priority = priority
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.state = 'queued'
+        self.future = None
+        self.pool = None
+        self.submitted = time.perf_counter()
+
+
+class JobScheduler:
+    """Verteilt Jobs nach Priorität auf einen Prozess-Pool (wird beim ersten Job gestartet)"""
+
+    def __init__(self, on_event, workers=None, initializer=None, initargs=()):
+        """
+        on_event: Callback mit einem Event-Dict (state: started, progress, done, failed, cancelled)
+        workers: Anzahl Prozesse (Standard: CPU-Anzahl - 1, mindestens 1)
+        initializer/initargs: Zusätzlicher Initializer pro Worker (z.B. Daten laden)
+        """
+        self.on_event = on_event
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.initializer = initializer
+        self.initargs = initargs
+
+        self._lock = threading.Lock()
+        self._heap = []
+        self._jobs = {}
+        self._running = 0
+        self._ids = itertools.count(1)
+        self._pool = None
+
+        # Abgebrochene Job-IDs für laufende Jobs (Ring im Shared Memory)
+        self._cancelled_ids = multiprocessing.Array('q', CANCEL_SLOTS, lock=False)
+        self._cancel_position = 0
+
+        # Fortschritt der Worker -> Listener-Thread
+        self._progress_queue = None
+        self._listener = None
+
+        # Statistik
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    # ==================== Einreichen und Abbrechen ====================
+
+    def submit(self, function, *args, name=None, group=None, priority=PRIORITY_NORMAL, **kwargs):
+        """Job einreichen (function muss auf Modulebene liegen) - liefert die Job-ID"""
+        job = Job(next(self._ids), name or function.__name__, group, priority, function, args, kwargs)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            heapq.heappush(self._heap, (priority, job.job_id, job))
+        self._dispatch()
+        return job.job_id
+
+    def cancel(self, job_id):
+        """Einen Job abbrechen - liefert True, wenn er noch wartete oder lief"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.state == 'cancelled':
+                return False
+            self._cancel_locked(job)
+        self._emit(job, 'cancelled')
+        return True
+
+    def cancel_group(self, group):
+        """Alle wartenden und laufenden Jobs einer Gruppe abbrechen - liefert die Anzahl"""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job.group == group and job.state != 'cancelled']
+            for job in jobs:
+                self._cancel_locked(job)
+        for job in jobs:
+            self._emit(job, 'cancelled')
+        return len(jobs)
+
+    def _cancel_locked(self, job):
+        if job.state == 'running':
+            # Laufende Jobs brechen beim nächsten report_progress() ab, ihr Ergebnis wird verworfen
+            self._cancelled_ids[self._cancel_position] = job.job_id
+            self._cancel_position = (self._cancel_position + 1) % CANCEL_SLOTS
+        else:
+            # Wartende Jobs bleiben bis zum Herausnehmen im Heap und werden dann übersprungen
+            self._jobs.pop(job.job_id, None)
+        job.state = 'cancelled'
+        self.cancelled += 1
+
+    def pending(self):
+        """Anzahl wartender und laufender Jobs"""
+        with self._lock:
+            return len(self._jobs)
+
+    # ==================== Pool ====================
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            # spawn statt fork: der Hauptprozess hat bereits UI-, Eingabe- und Scheduler-Threads.
+            # Worker importieren das Hauptmodul neu - Einstiegsskripte starten die App nur unter __main__
+            context = multiprocessing.get_context('spawn')
+            self._progress_queue = context.Queue()
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=init_worker,
+                initargs=(self._progress_queue, self._cancelled_ids, self.initializer, self.initargs)
+            )
+            self._listener = threading.Thread(
+                target=self._listen, args=(self._progress_queue,), name='JobProgress', daemon=True
+            )
+            self._listener.start()
+        return self._pool
+
+    def _dispatch(self):
+        """Freie Worker mit den wichtigsten wartenden Jobs belegen"""
+        started = []
+        with self._lock:
+            while self._running < self.workers and self._heap:
+                _, _, job = heapq.heappop(self._heap)
+                if job.state != 'queued':
+                    continue
+                try:
+                    job.pool = self._ensure_pool()
+                    job.future = job.pool.submit(_run_job, job.job_id, job.function, job.args, job.kwargs)
+                except RuntimeError as e:
+                    # Pool bereits beendet
+                    print(f"[WARNING] Job {job.name} konnte nicht gestartet werden: {e}")
+                    self._jobs.pop(job.job_id, None)
+                    continue
+                job.state = 'running'
+                self._running += 1
+                started.append(job)
+
+        for job in started:
+            self._emit(job, 'started', queued_seconds=round(time.perf_counter() - job.submitted, 3))
+            job.future.add_done_callback(functools.partial(self._on_done, job))
+
+    def _on_done(self, job, future):
+        """Läuft im Pool-Verwaltungsthread, wenn ein Job fertig ist"""
+        with self._lock:
+            self._running -= 1
+            self._jobs.pop(job.job_id, None)
+            was_cancelled = job.state == 'cancelled'
+
+        if not was_cancelled:
+            try:
+                result, seconds = future.result()
+                job.state = 'done'
+                self.completed += 1
+                self._emit(job, 'done', result=result, seconds=round(seconds, 3))
+            except JobCancelled:
+                job.state = 'cancelled'
+                self._emit(job, 'cancelled')
+            except BrokenProcessPool as e:
+                # Worker abgestürzt: alten Pool beenden, beim nächsten Job neuen starten
+                job.state = 'failed'
+                self.failed += 1
+                self._discard_pool(job.pool)
+                self._emit(job, 'failed', error=str(e))
+            except Exception as e:
+                job.state = 'failed'
+                self.failed += 1
+                print(f"[ERROR] Job {job.name} fehlgeschlagen: {e}")
+                self._emit(job, 'failed', error=str(e))
+
+        self._dispatch()
+
+    def _discard_pool(self, pool):
+        """Defekten Pool samt Fortschritts-Listener beenden (nur einmal, falls schon ersetzt nichts tun)"""
+        with self._lock:
+            if pool is None or pool is not self._pool:
+                return
+            self._pool = None
+            progress_queue, self._progress_queue = self._progress_queue, None
+            listener, self._listener = self._listener, None
+
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._stop_listener(progress_queue, listener)
+
+    def _stop_listener(self, progress_queue, listener):
+        if listener is None:
+            return
+        try:
+            progress_queue.put(None)
+        except (OSError, ValueError):
+            pass
+        if listener is not threading.current_thread():
+            listener.join(1.0)
+
+    def _listen(self, progress_queue):
+        """Fortschritt aus den Workern weiterreichen"""
+        while True:
+            item = progress_queue.get()
+            if item is None:
+                break
+            job_id, fraction, message = item
+            job = self._jobs.get(job_id)
+            if job is not None and job.state == 'running':
+                self._emit(job, 'progress', progress=fraction, message=message)
+
+    def _emit(self, job, state, **data):
+        event = {'job_id': job.job_id, 'name': job.name, 'group': job.group, 'state': state}
+        event.update(data)
+        try:
+            self.on_event(event)
+        except Exception as e:
+            print(f"[ERROR] Job-Event {state} für {job.name} fehlgeschlagen: {e}")
+
+    def shutdown(self):
+        """Wartende Jobs verwerfen und den Pool beenden, ohne auf laufende Jobs zu warten"""
+        with self._lock:
+            for job in self._jobs.values():
+                job.state = 'cancelled'
+            self._jobs.clear()
+            self._heap.clear()
+            pool, self._pool = self._pool, None
+            progress_queue, self._progress_queue = self._progress_queue, None
+            listener, self._listener = self._listener, None
+
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._stop_listener(progress_queue, listener)
@@ -0,0 +1,273 @@
+"""
+Aufnahme und Wiedergabe von Tastatur-Events für den Gaming-Modus
+Spielt Events headless (ohne webview und pynput) in GamingMode.on_global_key_press ein
+und misst Durchsatz sowie Latenz von der ersten Ziffer bis zur fertigen Suche.
+
+    python key_replay.py record keys.json              # Aufnahme (benötigt pynput, F12 beendet)
+    python key_replay.py replay keys.json [--max-speed]
+    python key_replay.py synth 1800 3600 7200 [--interval 0.05] [--repeat 100] [--max-speed]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+
+from gaming_mode import GamingMode, GLOBAL_HOTKEYS_AVAILABLE
+from rock_analyzer import RockAnalyzer
+
+
+class ReplayKey:
+    """Tasten-Ersatz mit den Attributen eines pynput-Events (name, vk, char)"""
+
+    def __init__(self, name=None, vk=None, char=None):
+        self.name = name
+        self.vk = vk
+        self.char = char
+
+    @classmethod
+    def from_pynput(cls, key):
+        """Erstelle ReplayKey aus einem pynput Key/KeyCode"""
+        name = getattr(key, 'name', None)
+        if name:
+            return cls(name=name)
+        return cls(vk=getattr(key, 'vk', None), char=getattr(key, 'char', None))
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(name=data.get('name'), vk=data.get('vk'), char=data.get('char'))
+
+    def to_dict(self):
+        return {k: v for k, v in (('name', self.name), ('vk', self.vk), ('char', self.char)) if v is not None}
+
+    def __repr__(self):
+        return f"ReplayKey({self.to_dict()})"
+
+
+class KeyRecorder:
+    """Nimmt Tastatur-Events mit relativem Zeitstempel auf"""
+
+    def __init__(self, stop_key='f12'):
+        self.events = []
+        self.stop_key = stop_key
+        self._start = None
+
+    def record(self, key):
+        """Nimm ein Event auf (pynput on_press Callback)"""
+        now = time.perf_counter()
+        if self._start is None:
+            self._start = now
+
+        replay_key = ReplayKey.from_pynput(key)
+        if self.stop_key and replay_key.name == self.stop_key:
+            return False
+
+        self.events.append((now - self._start, replay_key))
+        return None
+
+    def record_from_keyboard(self):
+        """Nimm vom echten Keyboard auf bis die Stop-Taste gedrückt wird"""
+        if not GLOBAL_HOTKEYS_AVAILABLE:
+            raise RuntimeError('pynput nicht installiert - Aufnahme nicht möglich')
+
+        from pynput import keyboard
+
+        print(f"[INFO] Aufnahme läuft - {self.stop_key.upper()} beendet")
+        with keyboard.Listener(on_press=self.record, suppress=False) as listener:
+            listener.join()
+        print(f"[INFO] {len(self.events)} Events aufgenommen")
+        return self.events
+
+    def save(self, path):
+        """Speichere Aufnahme als JSON"""
+        save_events(self.events, path)
+
+
+def save_events(events, path):
+    """Speichere Events als JSON-Liste [{'t': Sekunden, 'name'/'vk'/'char': ...}]"""
+    data = [dict(key.to_dict(), t=round(offset, 6)) for offset, key in events]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+
+
+def load_events(path):
+    """Lade Events aus einer JSON-Aufnahme"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [(float(entry.get('t', 0)), ReplayKey.from_dict(entry)) for entry in data]
+
+
+def events_from_signals(signals, interval=0.05, repeat=1):
+    """Erzeuge Tipp-Events für Signalwerte (Numpad-Ziffern + Numpad Plus)"""
+    events = []
+    offset = 0.0
+    for _ in range(repeat):
+        for signal in signals:
+            for digit in str(signal):
+                events.append((offset, ReplayKey(vk=96 + int(digit), char=digit)))
+                offset += interval
+            events.append((offset, ReplayKey(vk=107, char='+')))
+            offset += interval
+    return events
+
+
+class ReplayHarness:
+    """Spielt Key-Events headless in GamingMode ein und misst die Latenz"""
+
+    def __init__(self, system='STANTON'):
+        self.rock_analyzer = RockAnalyzer()
+        self.rock_analyzer.build_rock_database(system)
+
+        self.js_calls = 0
+        self.js_lock = threading.Lock()
+
+        self.latencies = []
+        self.completed = 0
+        self.done_condition = threading.Condition()
+
+        self.gaming = GamingMode(self._fake_js, self._search)
+        self.gaming.on_search_done = self._on_search_done
+        self.gaming.gaming_mode = True
+        self.gaming.resume_listener()
+
+    def _fake_js(self, js_code, kind=None):
+        """JS-Callback-Ersatz: zählt nur die Aufrufe"""
+        with self.js_lock:
+            self.js_calls += 1
+        return True
+
+    def _search(self, signal_value):
+        """Headless-Suche über den RockAnalyzer"""
+        signal_value = int(signal_value)
+        matches = self.rock_analyzer.analyze_signal(signal_value)
+        return {'success': True, 'signal': signal_value, 'matches': matches}
+
+    def _on_search_done(self, signal_value, entry_started, result):
+        done = time.perf_counter()
+        with self.done_condition:
+            if entry_started is not None:
+                self.latencies.append(done - entry_started)
+            self.completed += 1
+            self.done_condition.notify_all()
+
+    def replay(self, events, speed=1.0, timeout=30.0):
+        """
+        Spiele Events ein
+        speed: Faktor auf die aufgenommene Geschwindigkeit, None = maximale Geschwindigkeit
+        """
+        submits_before = self.completed
+        expected = 0
+
+        start = time.perf_counter()
+        for offset, key in events:
+            if speed:
+                delay = start + offset / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            had_input = bool(self.gaming.get_input())
+            self.gaming.on_global_key_press(key)
+            if had_input and self._is_submit(key):
+                expected += 1
+        feed_time = time.perf_counter() - start
+
+        deadline = time.perf_counter() + timeout
+        with self.done_condition:
+            while self.completed - submits_before < expected:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    print("[WARNING] Nicht alle Suchen wurden rechtzeitig abgeschlossen")
+                    break
+                self.done_condition.wait(remaining)
+        total_time = time.perf_counter() - start
+
+        return {
+            'events': len(events),
+            'feed_seconds': feed_time,
+            'total_seconds': total_time,
+            'events_per_second': len(events) / feed_time if feed_time > 0 else 0.0,
+            'searches': self.completed - submits_before,
+            'searches_per_second': (self.completed - submits_before) / total_time if total_time > 0 else 0.0,
+            'js_calls': self.js_calls,
+            'latencies': list(self.latencies)
+        }
+
+    def _is_submit(self, key):
+        """Prüfe ob die Taste laut Dispatch-Tabelle die Suche auslöst"""
+        table = self.gaming.key_table
+        for token in (key.name, f'vk:{key.vk}' if key.vk is not None else None, key.char):
+            if token and token in table:
+                return table[token][0] == self.gaming.submit
+        return False
+
+    def close(self):
+        self.gaming.cleanup()
+
+
+def print_report(stats):
+    """Gib das Ergebnis einer Wiedergabe aus"""
+    print(f"Events:            {stats['events']}")
+    print(f"Einspeisung:       {stats['feed_seconds'] * 1000:.1f} ms "
+          f"({stats['events_per_second']:.0f} Events/s)")
+    print(f"Suchen:            {stats['searches']} "
+          f"({stats['searches_per_second']:.1f} Suchen/s)")
+    print(f"JS-Aufrufe:        {stats['js_calls']}")
+
+    latencies = sorted(stats['latencies'])
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100)
+        print(f"Latenz Ziffer->Ergebnis: p50={cuts[49] * 1000:.2f} ms  "
+              f"p95={cuts[94] * 1000:.2f} ms  max={latencies[-1] * 1000:.2f} ms")
+    elif latencies:
+        print(f"Latenz Ziffer->Ergebnis: {latencies[0] * 1000:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Key-Event Aufnahme/Wiedergabe für den Gaming-Modus')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record = sub.add_parser('record', help='Events vom Keyboard aufnehmen')
+    record.add_argument('output')
+
+    replay = sub.add_parser('replay', help='Aufnahme wiedergeben')
+    replay.add_argument('input')
+
+    synth = sub.add_parser('synth', help='Tipp-Events für Signalwerte erzeugen und wiedergeben')
+    synth.add_argument('signals', nargs='+', type=int)
+    synth.add_argument('--interval', type=float, default=0.05, help='Sekunden zwischen Tasten')
+    synth.add_argument('--repeat', type=int, default=1)
+    synth.add_argument('--save', help='Erzeugte Events zusätzlich speichern')
+
+    for p in (replay, synth):
+        p.add_argument('--max-speed', action='store_true', help='Ohne Wartezeiten einspeisen')
+        p.add_argument('--speed', type=float, default=1.0, help='Faktor auf die Aufnahmegeschwindigkeit')
+        p.add_argument('--system', default='STANTON')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        recorder = KeyRecorder()
+        recorder.record_from_keyboard()
+        recorder.save(args.output)
+        return 0
+
+    if args.command == 'replay':
+        events = load_events(args.input)
+    else:
+        events = events_from_signals(args.signals, args.interval, args.repeat)
+        if args.save:
+            save_events(events, args.save)
+
+    harness = ReplayHarness(args.system)
+    try:
+        stats = harness.replay(events, speed=None if args.max_speed else args.speed)
+    finally:
+        harness.close()
+    print_report(stats)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import ipaddress
+import json
+import os
 import threading
 
 # Importiere die neuen Module
+from analysis_jobs import init_analysis_worker, loadout_job, simulate_composition_job, system_simulation_job
+from breakability import BreakabilitySolver
+from composition_simulator import CompositionSimulator
 from config_manager import ConfigManager
+from history_sync import HISTORY_FILE, HistorySyncer, SharedHistory, check_token, new_instance_id
+from job_scheduler import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, JobScheduler
+from price_table import PriceTable
+from query_server import QueryServer
+from refinery import RefineryCalculator
+from scan_events import ScanEventHub
+from signal_feed import SignalFeed
 from rock_analyzer import RockAnalyzer
+from value_engine import ValueEngine
 from overlay_manager import OverlayManager
 from gaming_mode import GamingMode, GLOBAL_HOTKEYS_AVAILABLE
+from ui_dispatcher import UIDispatcher
+from ui_scheduler import UIScheduler
+import ui_backend
 
 try:
-    import webview
+    webview = ui_backend.load_backend()
 
     WEBVIEW_AVAILABLE = True
 except ImportError:
+    webview = None
     WEBVIEW_AVAILABLE = False
     print("[ERROR] webview nicht installiert! Installiere mit: pip install pywebview")
 
+# Follow-Modus: Signale innerhalb dieses Fensters werden zu einem Update gebündelt
+FOLLOW_COALESCE_SECONDS = 0.05
+
+# Crew-Sync ohne crew_sync_host: Query-Server auf allen Schnittstellen, aber nur solange der Sync läuft
+CREW_SYNC_BIND_HOST = '0.0.0.0'
+
+
+def _is_loopback(host):
+    """Ist host nur auf diesem Rechner erreichbar?"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
 
 class MiningAPI:
     """Haupt-API für die Mining-Analyzer Anwendung"""
 
-    def __init__(self):
+    def __init__(self, ui=None, config_file="mining_analyzer_config.json"):
+        """
+        ui: UI-Backend (webview-Modul oder fake_webview), Standard ist das gewählte Backend
+        config_file: Pfad zur Konfigurationsdatei
+        """
+        self.ui = ui or webview
+
+        # Ein Scheduler-Thread für alle verzögerten UI-Aufgaben
+        self.scheduler = UIScheduler().start()
+
         # Module initialisieren
-        self.config_manager = ConfigManager()
-        self.rock_analyzer = RockAnalyzer()
-        self.overlay_manager = OverlayManager(self.config_manager)
+        self.config_manager = ConfigManager(config_file)
+        self.price_table = PriceTable()
+        self.rock_analyzer = RockAnalyzer(ValueEngine(self.price_table))
+        self.composition_simulator = CompositionSimulator(self.rock_analyzer.rocks_data, self.rock_analyzer.value_engine)
+        self.breakability = BreakabilitySolver()
+        self.refinery = RefineryCalculator(self.rock_analyzer.rocks_data, self.rock_analyzer.value_engine)
+        self.overlay_manager = OverlayManager(
+            self.config_manager, ui=self.ui, scheduler=self.scheduler, price_table=self.price_table
+        )
 
-        # Gaming-Modus mit Callback
-        self.gaming_mode = GamingMode(self.safe_evaluate_js)
+        # Alle JavaScript-Aufrufe laufen gebündelt über einen Dispatcher-Thread
+        self.ui_dispatcher = UIDispatcher(self._evaluate_js_now)
+        self.ui_dispatcher.start()
+
+        # Schwere Analysen laufen in einem Prozess-Pool (startet beim ersten Job)
+        self.jobs = JobScheduler(self._on_job_event, initializer=init_analysis_worker)
+
+        # Gaming-Modus mit Callbacks (Suche läuft direkt im Backend)
+        self.gaming_mode = GamingMode(
+            self.safe_evaluate_js,
+            self.search_signal,
+            hotkeys=self.config_manager.config.get('gaming_hotkeys'),
+            scheduler=self.scheduler
+        )
+
+        # Follow-Modus: Signale aus Datei/FIFO, Bursts werden gebündelt
+        self.signal_feed = None
+        self._followed_signals = []
+        self._follow_lock = threading.Lock()
+        # Ein Worker verarbeitet die Bursts der Reihe nach (Reihenfolge von Historie und Overlay bleibt erhalten)
+        self._follow_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='FollowWorker')
+
+        # Optionaler lokaler HTTP/JSON Query-Server, Scans werden per Event-Stream verteilt
+        self.query_server = None
+        self.scan_events = ScanEventHub()
+
+        # Crew-Historie mit Delta-Sync zu anderen Instanzen (über den Query-Server)
+        self.crew_history = None
+        self.crew_syncer = None
+        # Zustand des Query-Servers vor dem Crew-Sync (wird beim Beenden wiederhergestellt)
+        self._crew_query_server = None
 
         # Aktuelles System
         self.current_system = self.config_manager.config.get('selected_system', 'STANTON')
@@ -43,14 +122,26 @@ class MiningAPI:
             except Exception as e:
                 print(f"[WARNING] Gaming-Modus konnte nicht automatisch aktiviert werden: {e}")
 
-    def safe_evaluate_js(self, js_code):
-        """Sichere JavaScript-Evaluation"""
+        if self.config_manager.config.get('query_server_enabled', False):
+            self.start_query_server()
+        if self.config_manager.config.get('crew_sync_enabled', False):
+            self.start_crew_sync()
+
+    def safe_evaluate_js(self, js_code, kind=None):
+        """
+        Sichere JavaScript-Evaluation über den UI-Dispatcher (blockiert nie)
+        kind: Art des Updates - wartende Updates derselben Art werden ersetzt
+        """
+        return self.ui_dispatcher.post(js_code, kind)
+
+    def _evaluate_js_now(self, js_code):
+        """Führe JavaScript synchron im Hauptfenster aus (nur im Dispatcher-Thread)"""
         try:
-            if not webview.windows or len(webview.windows) == 0:
+            if not self.ui or not self.ui.windows:
                 print("[WARNING] Kein Webview-Fenster verfügbar")
                 return False
 
-            main_window = webview.windows[0]
+            main_window = self.ui.windows[0]
             if main_window is None:
                 print("[WARNING] Hauptfenster ist None")
                 return False
@@ -67,12 +158,14 @@ class MiningAPI:
         """API: Suche nach Signal"""
         try:
             signal_value = int(signal_value)
-            matches = self.rock_analyzer.find_matching_rocks(signal_value)
 
-            # Erweitere matches mit Mineralien und Stats
-            for match in matches:
-                match['minerals'] = self.rock_analyzer.generate_mineral_composition(match)
-                match['stats'] = self.rock_analyzer.calculate_rock_stats(match, signal_value)
+            # Analysen zum vorherigen Signal sind veraltet
+            self.jobs.cancel_group('signal')
+
+            matches = self.rock_analyzer.analyze_signal(signal_value)
+            self._enrich_matches(matches)
+            collision = self.rock_analyzer.check_collision(signal_value)
+            ambiguous = bool(collision and collision['ambiguous'])
 
             timestamp = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
 
@@ -82,13 +175,22 @@ class MiningAPI:
                 signal_value,
                 timestamp
             )
+            if self.crew_history:
+                self.crew_history.record(self.current_system, signal_value, timestamp)
 
             self.config_manager.save_config(self.current_system, self.gaming_mode.is_active())
 
             # Zeige Overlay wenn aktiviert
             if matches and self.config_manager.config.get('overlay_enabled', True):
                 minerals = matches[0]['minerals']
-                self.overlay_manager.show_overlay(signal_value, matches[0], minerals)
+                self.overlay_manager.show_overlay(signal_value, matches[0], minerals, collision)
+
+            # Browser-Quellen nur bedienen, wenn jemand zuhört (publish blockiert nie)
+            if matches and self.scan_events.has_subscribers():
+                event = self.overlay_manager.create_scan_event(
+                    signal_value, matches[0], matches[0]['minerals'], collision
+                )
+                self.scan_events.publish('scan', event)
 
             # Hole Timestamps für dieses Signal
             timestamps = []
@@ -101,6 +203,8 @@ class MiningAPI:
                 'success': True,
                 'signal': signal_value,
                 'matches': matches,
+                'ambiguous': ambiguous,
+                'collision': collision,
                 'history': history,
                 'timestamps': timestamps
             }
@@ -111,11 +215,8 @@ class MiningAPI:
         """API: Hole gecachte Ergebnisse ohne neuen Scan"""
         try:
             signal_value = int(signal_value)
-            matches = self.rock_analyzer.find_matching_rocks(signal_value)
-
-            for match in matches:
-                match['minerals'] = self.rock_analyzer.generate_mineral_composition(match)
-                match['stats'] = self.rock_analyzer.calculate_rock_stats(match, signal_value)
+            matches = self.rock_analyzer.analyze_signal(signal_value)
+            self._enrich_matches(matches)
 
             # Finde Timestamps
             history = self.config_manager.get_current_history(self.current_system)
@@ -125,16 +226,125 @@ class MiningAPI:
                     timestamps = entry.get('timestamps', [])
                     break
 
+            collision = self.rock_analyzer.check_collision(signal_value)
             return {
                 'success': True,
                 'signal': signal_value,
                 'matches': matches,
+                'ambiguous': bool(collision and collision['ambiguous']),
+                'collision': collision,
                 'timestamps': timestamps,
                 'cached': True
             }
         except ValueError:
             return {'success': False, 'error': 'Ungültiger Signalwert'}
 
+    def _enrich_matches(self, matches):
+        """Ergänze jede Übereinstimmung um beste Ausrüstung (gewähltes Schiff) und Raffinerie-Optionen"""
+        ship = self.config_manager.config.get('mining_ship', 'PROSPECTOR')
+        system_data = self.rock_analyzer.rocks_data.get(self.current_system, {})
+        for match in matches:
+            rock_data = system_data.get(match.get('rock_type'))
+            if rock_data is not None:
+                match['loadout'] = self.breakability.solve(self.current_system, match['rock_type'], rock_data, ship)
+                match['refinery'] = self.refinery.calculate(self.current_system, match)
+
+    def find_ore(self, ore, min_prob=0, min_med_pct=0):
+        """API: Rock-Typen und Radar-Signale im aktuellen System, die ein bestimmtes Erz enthalten"""
+        try:
+            min_prob = float(min_prob)
+            min_med_pct = float(min_med_pct)
+        except (ValueError, TypeError) as e:
+            return {'success': False, 'error': f'Ungültiger Wert: {e}'}
+
+        ore = str(ore).upper()
+        if ore not in self.rock_analyzer.ore_index:
+            return {'success': False, 'error': f'Erz {ore} kommt in {self.current_system} nicht vor'}
+        return {
+            'success': True,
+            'ore': ore,
+            'system': self.current_system,
+            'rocks': self.rock_analyzer.find_rocks_with_ore(ore, min_prob, min_med_pct)
+        }
+
+    def get_loadout(self, rock_type, ship=None):
+        """API: Beste Laser-/Modul-/Gadget-Kombination für einen Rock-Typ"""
+        ship = str(ship or self.config_manager.config.get('mining_ship', 'PROSPECTOR')).upper()
+        rock_type = str(rock_type).upper()
+        if ship not in self.breakability.ships():
+            return {'success': False, 'error': f'Unbekanntes Schiff: {ship}'}
+
+        rock_data = self.rock_analyzer.rocks_data.get(self.current_system, {}).get(rock_type)
+        if rock_data is None:
+            return {'success': False, 'error': f'Rock-Typ {rock_type} nicht in {self.current_system} gefunden'}
+        return dict(self.breakability.solve(self.current_system, rock_type, rock_data, ship), success=True)
+
+    def set_mining_ship(self, ship):
+        """API: Wähle das Mining-Schiff für die Ausrüstungsempfehlung"""
+        ship = str(ship).upper()
+        if ship not in self.breakability.ships():
+            return {'success': False, 'error': f'Unbekanntes Schiff: {ship}'}
+        self.config_manager.config['mining_ship'] = ship
+        self.config_manager.update_setting('mining_ship', ship)
+        return {'success': True, 'ship': ship}
+
+    def simulate_composition(self, rock_type, multima_factor=1):
+        """API: Perzentil-Bänder für Zusammensetzung und Wert eines Rock-Typs"""
+        try:
+            result = self.composition_simulator.simulate(self.current_system, str(rock_type).upper(), int(multima_factor))
+        except (ValueError, TypeError) as e:
+            return {'success': False, 'error': f'Ungültiger Wert: {e}'}
+
+        if result is None:
+            return {'success': False, 'error': f'Rock-Typ {rock_type} nicht in {self.current_system} gefunden'}
+        return dict(result, success=True)
+
+    # ==================== Hintergrund-Analysen ====================
+
+    def start_analysis(self, job_type, rock_type=None, multima_factor=1, ships=None):
+        """
+        API: Schwere Analyse im Prozess-Pool starten, Ergebnis kommt per onJobUpdate()
+        job_type: 'simulate' (ein Rock-Typ), 'loadout' (Schiffe für einen Rock-Typ), 'system' (alle Rock-Typen)
+        """
+        try:
+            factor = int(multima_factor)
+        except (ValueError, TypeError) as e:
+            return {'success': False, 'error': f'Ungültiger Wert: {e}'}
+
+        system = self.current_system
+        rock_type = str(rock_type).upper() if rock_type else None
+        if job_type in ('simulate', 'loadout') and rock_type not in self.rock_analyzer.rocks_data.get(system, {}):
+            return {'success': False, 'error': f'Rock-Typ {rock_type} nicht in {system} gefunden'}
+
+        if job_type == 'simulate':
+            job_id = self.jobs.submit(simulate_composition_job, system, rock_type, factor,
+                                      name='simulate', group='signal', priority=PRIORITY_HIGH)
+        elif job_type == 'loadout':
+            ships = [str(ship).upper() for ship in ships] if ships else self.breakability.ships()
+            unknown = [ship for ship in ships if ship not in self.breakability.ships()]
+            if unknown:
+                return {'success': False, 'error': f'Unbekanntes Schiff: {unknown[0]}'}
+            job_id = self.jobs.submit(loadout_job, system, rock_type, ships,
+                                      name='loadout', group='signal', priority=PRIORITY_NORMAL)
+        elif job_type == 'system':
+            job_id = self.jobs.submit(system_simulation_job, system, factor,
+                                      name='system', group='system', priority=PRIORITY_LOW)
+        else:
+            return {'success': False, 'error': f'Unbekannte Analyse: {job_type}'}
+
+        return {'success': True, 'job_id': job_id}
+
+    def cancel_analysis(self, job_id=None):
+        """API: Eine Analyse abbrechen (ohne job_id alle zum aktuellen Signal)"""
+        if job_id is None:
+            return {'success': True, 'cancelled': self.jobs.cancel_group('signal')}
+        return {'success': self.jobs.cancel(int(job_id))}
+
+    def _on_job_event(self, event):
+        """Job-Events an die UI (Fortschritt desselben Jobs wird zusammengefasst)"""
+        kind = f"job_progress_{event['job_id']}" if event['state'] == 'progress' else None
+        self.safe_evaluate_js(f"onJobUpdate({json.dumps(event)});", kind)
+
     def get_history(self):
         """API: Hole aktuelle System-Scan-Historie"""
         return self.config_manager.get_current_history(self.current_system)
@@ -241,17 +451,227 @@ class MiningAPI:
         """Speichere finale Konfiguration"""
         self.config_manager.save_config(self.current_system, self.gaming_mode.is_active())
 
+    # ==================== Follow-Modus ====================
+
+    def start_follow(self, path=None, from_start=False):
+        """API: Folge einer Datei oder FIFO mit Signalwerten (eine Zeile pro Signal)"""
+        path = path or self.config_manager.config.get('follow_path')
+        if not path:
+            return {'success': False, 'error': 'Kein Pfad für den Follow-Modus angegeben'}
+
+        self.stop_follow()
+        self.signal_feed = SignalFeed(path, self._on_followed_signals, from_start=bool(from_start))
+        self.signal_feed.start()
+
+        if self.config_manager.config.get('follow_path') != path:
+            self.config_manager.config['follow_path'] = path
+            self.config_manager.update_setting('follow_path', path)
+        return {'success': True, 'path': path, 'message': f'Folge {path}'}
+
+    def stop_follow(self):
+        """API: Follow-Modus beenden"""
+        if self.signal_feed is None:
+            return {'success': True, 'following': False}
+
+        self.signal_feed.stop()
+        self.signal_feed = None
+        self.scheduler.cancel('follow_signals')
+        with self._follow_lock:
+            self._followed_signals = []
+        print("[INFO] Follow-Modus beendet")
+        return {'success': True, 'following': False}
+
+    def _on_followed_signals(self, signals):
+        """Neue Signale aus dem Feed (Feed-Thread) - Verarbeitung gebündelt im Scheduler"""
+        with self._follow_lock:
+            self._followed_signals.extend(signals)
+        self.scheduler.call_later(FOLLOW_COALESCE_SECONDS, self._flush_followed_signals,
+                                  key='follow_signals', coalesce=True)
+
+    def _flush_followed_signals(self):
+        """Burst übernehmen (Scheduler-Thread) - Suche und Dateizugriffe laufen im Follow-Worker"""
+        with self._follow_lock:
+            signals, self._followed_signals = self._followed_signals, []
+        if not signals:
+            return
+
+        # Scheduler-Thread nicht blockieren (Auto-Hide und Eingabe-Timer laufen dort)
+        try:
+            self._follow_worker.submit(self._process_followed_signals, signals)
+        except RuntimeError:
+            # Worker wurde beim Beenden bereits gestoppt
+            pass
+
+    def _process_followed_signals(self, signals):
+        """Alle Signale eines Bursts in die Historie, nur das letzte steuert Overlay und UI (Follow-Worker)"""
+        try:
+            timestamp = datetime.now().strftime("%d.%m.%Y %H:%M:%S")
+            for signal_value in signals[:-1]:
+                self.config_manager.add_scan_to_history(self.current_system, signal_value, timestamp)
+                if self.crew_history:
+                    self.crew_history.record(self.current_system, signal_value, timestamp)
+
+            result = self.search_signal(signals[-1])
+        except Exception as e:
+            print(f"[ERROR] Follow-Suche fehlgeschlagen: {e}")
+            result = {'success': False, 'error': str(e)}
+        result['followed'] = len(signals)
+        # Noch im Worker einreihen, damit die Ergebnisse in Burst-Reihenfolge ankommen
+        self.safe_evaluate_js(f"showGamingSearchResult({json.dumps(result)});", 'follow_result')
+
+    # ==================== Query-Server ====================
+
+    def start_query_server(self, host=None, port=None):
+        """API: Starte den lokalen HTTP/JSON Query-Server"""
+        if self.query_server and self.query_server.is_running():
+            return {'success': True, 'url': f'http://{self.query_server.host}:{self.query_server.port}'}
+
+        host = host or self.config_manager.config.get('query_server_host', '127.0.0.1')
+        port = int(port if port is not None else self.config_manager.config.get('query_server_port', 8765))
+        try:
+            self.query_server = QueryServer(
+                host, port,
+                value_engine=self.rock_analyzer.value_engine,
+                event_hub=self.scan_events,
+                overlay_html=self.overlay_manager.create_browser_overlay_html()
+            ).start()
+        except (RuntimeError, OSError) as e:
+            self.query_server = None
+            return {'success': False, 'error': str(e)}
+        return {'success': True, 'url': f'http://{host}:{self.query_server.port}'}
+
+    def stop_query_server(self):
+        """API: Stoppe den Query-Server"""
+        if self.query_server:
+            self.query_server.stop()
+            self.query_server = None
+        return {'success': True}
+
+    # ==================== Crew-Historie ====================
+
+    def start_crew_sync(self, peers=None, token=None):
+        """
+        API: Scan-Historie mit anderen Instanzen im LAN teilen
+        peers: Liste von 'host:port', token: gemeinsamer Crew-Schlüssel (bei allen Instanzen gleich)
+        """
+        config = self.config_manager.config
+        if peers is not None:
+            self.config_manager.update_setting('crew_peers', list(peers))
+        if token is not None:
+            self.config_manager.update_setting('crew_token', token)
+
+        token = config.get('crew_token')
+        error = check_token(token)
+        if error:
+            print(f"[ERROR] Crew-Sync nicht gestartet: {error}")
+            return {'success': False, 'error': error}
+
+        if self.crew_history is None:
+            instance_id = config.get('instance_id')
+            if not instance_id:
+                instance_id = new_instance_id()
+                self.config_manager.update_setting('instance_id', instance_id)
+            history_file = os.path.join(os.path.dirname(self.config_manager.config_file), HISTORY_FILE)
+            self.crew_history = SharedHistory(instance_id, history_file, finder=config.get('crew_name', ''))
+
+        # Gegenstellen holen ihre Deltas über /sync des eigenen Query-Servers - der muss im LAN erreichbar sein
+        crew_host = config.get('crew_sync_host') or CREW_SYNC_BIND_HOST
+        if _is_loopback(crew_host):
+            error = f'crew_sync_host {crew_host} ist nur lokal erreichbar - LAN-Adresse oder 0.0.0.0 eintragen'
+            print(f"[ERROR] Crew-Sync nicht gestartet: {error}")
+            return {'success': False, 'error': error}
+
+        running = self.query_server is not None and self.query_server.is_running()
+        if running and _is_loopback(self.query_server.host):
+            # Lokal gebundenen Server (z.B. für Browser-Overlays) auf demselben Port im LAN neu binden
+            self._crew_query_server = ('rebound', self.query_server.host, self.query_server.port)
+            port = self.query_server.port
+            self.stop_query_server()
+            result = self.start_query_server(crew_host, port)
+        else:
+            if not running:
+                self._crew_query_server = ('started',)
+            elif self.crew_syncer is None:
+                # Server lief bereits im LAN und bleibt nach dem Crew-Sync bestehen
+                self._crew_query_server = None
+            result = self.start_query_server(crew_host)
+        if not result['success']:
+            previous, self._crew_query_server = self._crew_query_server, None
+            if previous and previous[0] == 'rebound':
+                self.start_query_server(previous[1], previous[2])
+            return result
+        self.query_server.sync_token = token
+        self.query_server.history = self.crew_history
+
+        if self.crew_syncer:
+            self.crew_syncer.stop()
+        self.crew_syncer = HistorySyncer(
+            self.crew_history, config.get('crew_peers', []), token, interval=config.get('crew_sync_interval', 5.0)
+        ).start()
+        self.config_manager.update_setting('crew_sync_enabled', True)
+
+        return {
+            'success': True,
+            'instance': self.crew_history.instance_id,
+            'peers': self.crew_syncer.peers,
+            'url': result['url']
+        }
+
+    def stop_crew_sync(self):
+        """API: Crew-Sync beenden (die bisherige Crew-Historie bleibt abrufbar)"""
+        if self.crew_syncer:
+            self.crew_syncer.stop()
+            self.crew_syncer = None
+        if self.query_server:
+            self.query_server.history = None
+            self.query_server.sync_token = None
+
+        # Query-Server wieder so wie vor dem Crew-Sync (nicht gestartet bzw. nur lokal gebunden)
+        previous, self._crew_query_server = self._crew_query_server, None
+        if previous and self.query_server:
+            self.stop_query_server()
+            if previous[0] == 'rebound':
+                self.start_query_server(previous[1], previous[2])
+
+        self.config_manager.update_setting('crew_sync_enabled', False)
+        return {'success': True}
+
+    def get_crew_history(self):
+        """API: Letzte Scans der ganzen Crew im aktuellen System"""
+        if self.crew_history is None:
+            return {'success': False, 'error': 'Crew-Sync ist nicht aktiviert'}
+        return {
+            'success': True,
+            'history': self.crew_history.recent(self.current_system),
+            'stats': self.crew_history.stats()
+        }
+
+    def shutdown(self):
+        """Beende Overlays, Listener und Hintergrund-Threads"""
+        if self.crew_syncer:
+            self.crew_syncer.stop()
+        self.stop_follow()
+        # Laufenden Burst noch abschließen, wartende verwerfen
+        self._follow_worker.shutdown(wait=True, cancel_futures=True)
+        self.stop_query_server()
+        self.jobs.shutdown()
+        self.overlay_manager.shutdown()
+        self.gaming_mode.cleanup()
+        self.ui_dispatcher.stop()
+        self.scheduler.shutdown()
+
 
 class StarCitizenMiningAnalyzer:
     """Hauptanwendung mit UI"""
 
-    def __init__(self):
-        if not WEBVIEW_AVAILABLE:
+    def __init__(self, ui=None, config_file="mining_analyzer_config.json"):
+        self.ui = ui or webview
+        if not self.ui:
             print("[ERROR] webview ist nicht installiert!")
             print("Installiere mit: pip install pywebview")
             return
 
-        self.api = MiningAPI()
+        self.api = MiningAPI(ui=self.ui, config_file=config_file)
         self.create_window()
 
     def create_window(self):
@@ -351,7 +771,7 @@ class StarCitizenMiningAnalyzer:
 </html>
         '''
 
-        webview.create_window(
+        self.ui.create_window(
             'Star Citizen Mining Analyzer',
             html=html_content,
             js_api=self.api,
@@ -374,8 +794,7 @@ def main():
     # Cleanup
     try:
         analyzer.api.save_config()
-        analyzer.api.overlay_manager.hide_overlay()
-        analyzer.api.gaming_mode.cleanup()
+        analyzer.api.shutdown()
     except Exception as e:
         print(f"[WARNING] Cleanup fehlgeschlagen: {e}")
 
@@ -3,7 +3,11 @@ Star Citizen Mining Analyzer - Modular Edition
 Aufgeteilt in 5 Module für bessere Übersicht
 """
 
-from main_app import main
+import multiprocessing
 
 if __name__ == "__main__":
+    # Prozess-Pool der Hintergrund-Analysen (gepackte Windows-Builds)
+    multiprocessing.freeze_support()
+    # Erst hier importieren: spawn-Worker laden dieses Modul neu und brauchen die App nicht
+    from main_app import main
     main()
\ No newline at end of file
@@ -1,274 +1,36 @@
+import json
 import threading
-import time
+
+import ui_backend
+from price_table import PriceTable
+from rock_analyzer import MINERAL_COLORS
+from ui_scheduler import UIScheduler
 
 try:
-    import webview
+    webview = ui_backend.load_backend()
 
     WEBVIEW_AVAILABLE = True
 except ImportError:
+    webview = None
     WEBVIEW_AVAILABLE = False
     print("[ERROR] webview nicht installiert!")
 
+# Platzhalter im Overlay-Dokument für den Scan-Inhalt
+OVERLAY_ROOT_PLACEHOLDER = '<!--overlay-root-->'
 
-class OverlayManager:
-    """Verwaltet alle Overlays (SC-Overlay und Preis-Overlay)"""
-
-    def __init__(self, config_manager):
-        self.config = config_manager
-
-        # Overlay-Status
-        self.overlay_window = None
-        self.overlay_lock = threading.Lock()
-        self.hide_timer = None
-
-        # Preis-Overlay
-        self.price_overlay_window = None
-        self.price_overlay_lock = threading.Lock()
-
-    def show_overlay(self, signal, rock, minerals):
-        """Zeige SC-ähnliches Overlay über dem Spiel"""
-        if not WEBVIEW_AVAILABLE:
-            return
-
-        try:
-            self.hide_overlay()
-
-            auto_hide_seconds = self.config.config.get('overlay_auto_hide_seconds', 10)
-
-            max_mineral_name_length = max(len(name) for name, _, _ in minerals) if minerals else 10
-            overlay_width = min(420, max(350, 350 + (max_mineral_name_length - 10) * 2))
-
-            overlay_html = self.create_overlay_html(signal, rock, minerals, auto_hide_seconds, overlay_width)
-
-            # Höhe berechnen
-            header_height = 62
-            stats_height = 165
-            mineral_header_height = 28
-            mineral_row_height = 19
-            mineral_list_height = len(minerals) * mineral_row_height
-            multima_height = 38 if rock.get('multima_factor', 1) > 1 else 0
-            bottom_padding = 18
-            border_space = 2
-
-            calculated_height = (header_height + stats_height + mineral_header_height +
-                                 mineral_list_height + multima_height + bottom_padding + border_space)
-
-            overlay_height = max(350, min(950, calculated_height))
-
-            with self.overlay_lock:
-                self.overlay_window = webview.create_window(
-                    'SC Mining Overlay',
-                    html=overlay_html,
-                    width=overlay_width,
-                    height=overlay_height,
-                    x=self.config.config.get('overlay_position', {}).get('x', 20),
-                    y=self.config.config.get('overlay_position', {}).get('y', 20),
-                    min_size=(320, 300),
-                    resizable=False,
-                    on_top=True,
-                    transparent=True,
-                    frameless=True,
-                    shadow=False
-                )
-
-            # Auto-Resize
-            def _autofit_overlay(attempt=0, last_height=0):
-                try:
-                    js = '(function(){var b=document.body, d=document.documentElement; return Math.ceil(Math.max(b.scrollHeight, d.scrollHeight));})()'
-                    h = self.overlay_window.evaluate_js(js)
-                    if h is None:
-                        h = 0
-                    try:
-                        h = int(float(h))
-                    except Exception:
-                        h = 0
-
-                    min_h = 300
-                    max_h = 1600
-                    target_h = max(min_h, min(max_h, h))
-
-                    if target_h and abs(target_h - last_height) > 2:
-                        self.overlay_window.resize(overlay_width, target_h)
-                        last_height = target_h
-
-                    if attempt < 10:
-                        threading.Timer(0.15, lambda: _autofit_overlay(attempt + 1, last_height)).start()
-                except Exception as e:
-                    print(f"[WARN] Auto-resize failed: {e}")
-
-            threading.Timer(0.2, _autofit_overlay).start()
-
-            # Auto-Hide Timer
-            if self.hide_timer:
-                self.hide_timer.cancel()
-            self.hide_timer = threading.Timer(float(auto_hide_seconds), self.hide_overlay)
-            self.hide_timer.start()
-
-        except Exception as e:
-            print(f"[ERROR] Overlay konnte nicht erstellt werden: {e}")
-
-    def hide_overlay(self):
-        """Verstecke das Overlay"""
-        with self.overlay_lock:
-            if self.overlay_window:
-                try:
-                    self.overlay_window.destroy()
-                except Exception as e:
-                    print(f"[WARNING] Overlay-Fenster konnte nicht zerstört werden: {e}")
-                finally:
-                    self.overlay_window = None
-
-        if self.hide_timer:
-            self.hide_timer.cancel()
-            self.hide_timer = None
-
-    def toggle_price_overlay(self):
-        """Zeige/Verstecke Preisliste als freistehendes Overlay"""
-        with self.price_overlay_lock:
-            if self.price_overlay_window:
-                # Speichere Position vor dem Schließen
-                self._save_price_overlay_position()
-                try:
-                    self.price_overlay_window.destroy()
-                    print("[INFO] Preis-Overlay geschlossen")
-                except Exception as e:
-                    print(f"[WARNING] Preis-Overlay konnte nicht geschlossen werden: {e}")
-                finally:
-                    self.price_overlay_window = None
-                return {'success': True, 'visible': False}
-            else:
-                # Öffne das Overlay
-                try:
-                    price_html = self.create_price_overlay_html()
-
-                    window_width = 720
-                    window_height = 380
-
-                    price_pos = self.config.config.get('price_overlay_position', None)
-
-                    if price_pos is None:
-                        # Erste Anzeige: Unten mittig
-                        try:
-                            screen = webview.screens[0]
-                            screen_width = screen.width
-                            screen_height = screen.height
-                            x = (screen_width - window_width) // 2
-                            y = screen_height - window_height - 50
-                        except:
-                            x = 400
-                            y = 600
-                    else:
-                        x = price_pos.get('x', 400)
-                        y = price_pos.get('y', 600)
-
-                    self.price_overlay_window = webview.create_window(
-                        'Mineable Ore Prices',
-                        html=price_html,
-                        width=window_width,
-                        height=window_height,
-                        x=x,
-                        y=y,
-                        min_size=(450, 400),
-                        resizable=False,
-                        on_top=True,
-                        transparent=True,
-                        frameless=True,
-                        shadow=False
-                    )
-
-                    threading.Timer(0.5, self._track_price_overlay_position).start()
-
-                    print(f"[INFO] Preis-Overlay geöffnet at x={x}, y={y}")
-                    return {'success': True, 'visible': True}
-                except Exception as e:
-                    print(f"[ERROR] Preis-Overlay konnte nicht erstellt werden: {e}")
-                    return {'success': False, 'error': str(e)}
-
-    def _save_price_overlay_position(self):
-        """Speichere Position des Preis-Overlays"""
-        if self.price_overlay_window:
-            try:
-                x = self.price_overlay_window.x
-                y = self.price_overlay_window.y
-                self.config.config['price_overlay_position'] = {'x': x, 'y': y}
-                print(f"[INFO] Preis-Overlay Position gespeichert: x={x}, y={y}")
-            except Exception as e:
-                print(f"[WARNING] Position konnte nicht gespeichert werden: {e}")
-
-    def _track_price_overlay_position(self):
-        """Tracke Position-Änderungen des Preis-Overlays"""
-        last_x, last_y = None, None
-        check_count = 0
-
-        while self.price_overlay_window is not None:
-            try:
-                current_x = self.price_overlay_window.x
-                current_y = self.price_overlay_window.y
-
-                if (last_x is not None and last_y is not None):
-                    if (current_x != last_x or current_y != last_y):
-                        self._save_price_overlay_position()
-                        print(f"[DEBUG] Position geändert: {current_x}, {current_y}")
-
-                last_x = current_x
-                last_y = current_y
-
-                check_count += 1
-                if check_count > 20:
-                    time.sleep(2)
-                else:
-                    time.sleep(0.5)
-
-            except Exception as e:
-                print(f"[DEBUG] Position-Tracking beendet: {e}")
-                break
-
-    def create_overlay_html(self, signal, rock, minerals, auto_hide_seconds, overlay_width):
-        """Erstelle HTML für SC-ähnliches Overlay"""
-
-        stats = rock.get('stats', {})
-        multima = rock.get('multima_factor', 1)
-
-        mineral_bar_width = overlay_width - 150
-
-        # Stats extrahieren
-        cluster_min = stats.get('cluster', {}).get('min', 1)
-        cluster_max = stats.get('cluster', {}).get('max', 11)
-        cluster_med = stats.get('cluster', {}).get('med', 6)
-
-        rock_mass_min = stats.get('mass', {}).get('min', '0')
-        rock_mass_max = stats.get('mass', {}).get('max', '182k')
-        rock_mass_med = stats.get('mass', {}).get('med', '8.9k')
-
-        instability_min = stats.get('instability', {}).get('min', 0)
-        instability_max = stats.get('instability', {}).get('max', 711)
-        instability_med = stats.get('instability', {}).get('med', 46)
-
-        resistance_min = stats.get('resistance', {}).get('min', '0%')
-        resistance_max = stats.get('resistance', {}).get('max', '64%')
-        resistance_med = stats.get('resistance', {}).get('med', '16%')
-
-        tier_colors = {
-            1: '#808080',
-            2: '#4169e1',
-            3: '#9932cc',
-            4: '#ffd700'
-        }
-        tier_color = tier_colors.get(rock.get('tier', 1), '#808080')
-
-        # HTML Code (gekürzt für Lesbarkeit - im echten Code ist das der komplette HTML-String)
-        html = f'''
+# Statisches Overlay-Dokument (einmal erstellt), Inhalte kommen per updateOverlay()
+OVERLAY_SHELL_HTML = '''
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <style>
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
-        body {{
+        }
+        body {
             background: rgba(15, 15, 20, 0.95);
             color: #ffffff;
             font-family: 'Segoe UI', Arial, sans-serif;
@@ -278,84 +40,83 @@ class OverlayManager:
             border-radius: 8px;
             overflow: hidden;
             backdrop-filter: blur(5px);
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(90deg, rgba(30, 30, 40, 0.9), rgba(20, 20, 30, 0.9));
             padding: 10px 15px;
             border-bottom: 1px solid rgba(255, 255, 255, 0.15);
             position: relative;
-        }}
-        .mineral-name {{
+        }
+        .mineral-name {
             font-size: 18px;
             font-weight: bold;
-            color: {tier_color};
             margin-bottom: 3px;
-        }}
-        .signal-indicator {{
+        }
+        .signal-indicator {
             display: flex;
             align-items: center;
             gap: 8px;
-        }}
-        .signal-dot {{
+        }
+        .signal-dot {
             width: 8px;
             height: 8px;
             background: #ffcc00;
             border-radius: 50%;
             box-shadow: 0 0 8px #ffcc00;
-        }}
-        .signal-value {{
+        }
+        .signal-value {
             color: #ffcc00;
             font-weight: bold;
             font-size: 16px;
-        }}
-        .stats-section {{
+        }
+        .stats-section {
             padding: 12px 15px;
             border-bottom: 1px solid rgba(255, 255, 255, 0.1);
-        }}
-        .stats-table {{
+        }
+        .stats-table {
             width: 100%;
             border-collapse: collapse;
-        }}
-        .stats-table th {{
+        }
+        .stats-table th {
             text-align: right;
             color: #cccccc;
             font-weight: normal;
             padding: 3px 8px 3px 0;
             white-space: nowrap;
-        }}
-        .stats-table td {{
+        }
+        .stats-table td {
             text-align: center;
             color: #ffffff;
             font-weight: bold;
             padding: 3px 5px;
             min-width: 45px;
-        }}
-        .stats-header {{
+        }
+        .stats-header {
             background: rgba(40, 40, 50, 0.7);
             border-bottom: 1px solid rgba(255, 255, 255, 0.2);
-        }}
-        .stats-header td {{
+        }
+        .stats-header td {
             color: #aaaaaa;
             font-size: 10px;
             padding: 5px 5px;
-        }}
-        .mineral-section {{
+        }
+        .mineral-section {
             padding: 8px 15px 10px 15px;
-        }}
-        .mineral-header {{
+        }
+        .mineral-header {
             color: #cccccc;
             font-weight: bold;
             margin-bottom: 8px;
             font-size: 11px;
-        }}
-        .close-indicator {{
+        }
+        .close-indicator {
             position: absolute;
             top: 5px;
             right: 8px;
             color: #888;
             font-size: 10px;
-        }}
-        .multima-indicator {{
+        }
+        .multima-indicator {
             background: rgba(255, 165, 0, 0.2);
             border: 1px solid #ffa500;
             border-radius: 4px;
@@ -365,130 +126,194 @@ class OverlayManager:
             color: #ffa500;
             font-size: 10px;
             font-weight: bold;
-        }}
+        }
+        body.ambiguous {
+            border-color: #ff6b6b;
+        }
+        .ambiguity-indicator {
+            background: rgba(255, 107, 107, 0.15);
+            border: 1px solid #ff6b6b;
+            border-radius: 4px;
+            margin: 6px 15px 0 15px;
+            padding: 3px 8px;
+            font-size: 10px;
+        }
+        .ambiguity-title {
+            color: #ff6b6b;
+            font-weight: bold;
+            text-align: center;
+        }
+        .ambiguity-candidate {
+            display: flex;
+            justify-content: space-between;
+            color: #cccccc;
+        }
+        .mineral-table {
+            width: 100%;
+            border-collapse: collapse;
+        }
+        .mineral-table th {
+            text-align: center;
+            padding: 5px 3px;
+            border-bottom: 2px solid rgba(0, 212, 255, 0.3);
+            color: #7fb3d3;
+            font-size: 0.7em;
+        }
+        .mineral-table td {
+            text-align: center;
+            padding: 3px 3px;
+        }
+        .mineral-table th:first-child,
+        .mineral-table td:first-child {
+            text-align: left;
+        }
+        .ore-name {
+            font-weight: bold;
+        }
     </style>
 </head>
 <body>
+    <div id="overlay-root">''' + OVERLAY_ROOT_PLACEHOLDER + '''</div>
+    <script>
+        // Gemessene Höhe nach dem Layout einmalig an Python melden
+        function reportOverlaySize() {
+            var root = document.getElementById('overlay-root');
+            var height = Math.ceil(root.getBoundingClientRect().height) + 2;
+            if (window.pywebview && window.pywebview.api && window.pywebview.api.report_overlay_size) {
+                window.pywebview.api.report_overlay_size(height);
+            }
+        }
+        function updateOverlay(data) {
+            document.getElementById('overlay-root').innerHTML = data.html;
+            document.body.classList.toggle('ambiguous', !!data.ambiguous);
+            if (data.measure) {
+                requestAnimationFrame(function() { requestAnimationFrame(reportOverlaySize); });
+            }
+        }
+        window.addEventListener('pywebviewready', function() {
+            requestAnimationFrame(reportOverlaySize);
+        });
+    </script>
+</body>
+</html>'''
+
+TIER_COLORS = {
+    1: '#808080',
+    2: '#4169e1',
+    3: '#9932cc',
+    4: '#ffd700'
+}
+
+# Overlay-Inhalt pro Scan (nur Signal, Stats und Multima-Badge ändern sich)
+OVERLAY_BODY_TEMPLATE = '''
     <div class="close-indicator">Auto-Hide {auto_hide_seconds}s</div>
     <div class="header">
-        <div class="mineral-name">{rock['name']}</div>
+        <div class="mineral-name" style="color: {tier_color};">{name}</div>
         <div class="signal-indicator">
             <div class="signal-dot"></div>
             <span class="signal-value">{signal}</span>
         </div>
     </div>
-    <div class="stats-section">
+{ambiguity_badge}    <div class="stats-section">
         <table class="stats-table">
             <tr class="stats-header">
                 <th></th>
                 <td>Min</td>
                 <td>Max</td>
-                <td>Med</td>
+                <td>Med</td>{percentile_header}
             </tr>
             <tr>
                 <th>Cluster Rocks</th>
                 <td>{cluster_min}</td>
                 <td>{cluster_max}</td>
-                <td>{cluster_med}</td>
+                <td>{cluster_med}</td>{cluster_percentiles}
             </tr>
             <tr>
                 <th>Rock Mass (t)</th>
                 <td>{rock_mass_min}</td>
                 <td>{rock_mass_max}</td>
-                <td>{rock_mass_med}</td>
+                <td>{rock_mass_med}</td>{rock_mass_percentiles}
             </tr>
             <tr>
                 <th>Instability</th>
                 <td>{instability_min}</td>
                 <td>{instability_max}</td>
-                <td>{instability_med}</td>
+                <td>{instability_med}</td>{instability_percentiles}
             </tr>
             <tr>
                 <th>Resistance</th>
                 <td>{resistance_min}</td>
                 <td>{resistance_max}</td>
-                <td>{resistance_med}</td>
+                <td>{resistance_med}</td>{resistance_percentiles}
             </tr>
         </table>
     </div>
     <div class="mineral-section">
         <div class="mineral-header">Mineral Composition</div>
-        <table style="width: 100%; border-collapse: collapse;">
-'''
+{mineral_table}
+    </div>
+{multima_badge}'''
 
-        # Mineralien als Tabelle hinzufügen
-        ores = rock.get('ores', {})
-        mineral_colors_dict = {
-            'QUANTANIUM': '#E91E63',
-            'TARANITE': '#4CAF50',
-            'BEXALITE': '#FF9800',
-            'GOLD': '#FFD700',
-            'AGRICIUM': '#8BC34A',
-            'HEPHAESTANITE': '#FF5722',
-            'TUNGSTEN': '#607D8B',
-            'TITANIUM': '#9C27B0',
-            'IRON': '#795548',
-            'QUARTZ': '#E0E0E0',
-            'CORUNDUM': '#F44336',
-            'COPPER': '#FF5722',
-            'ALUMINUM': '#9E9E9E',
-            'BERYL': '#90EE90',
-            'BORASE': '#8BC34A',
-            'LARANITE': '#45B7D1',
-            'ICE': '#87CEEB',
-            'INERTMATERIAL': '#708090',
-            'TIN': '#A9A9A9',
-            'SILICON': '#778899',
-            'RICCITE': '#FF6B6B',
-            'STILERON': '#9370DB'
-        }
+# Zusätzliche Spalte, wenn rocks.json gemessene Perzentile enthält (scan_ingest.py)
+PERCENTILE_HEADER = '''
+                <td>P10-P90</td>'''
 
-        html += '''
-            <tr>
-                <th style="text-align: left; padding: 5px 3px; border-bottom: 2px solid rgba(0, 212, 255, 0.3); color: #7fb3d3; font-size: 0.7em;">Mineral</th>
-                <th style="text-align: center; padding: 5px 3px; border-bottom: 2px solid rgba(0, 212, 255, 0.3); color: #7fb3d3; font-size: 0.7em;">Prob</th>
-                <th style="text-align: center; padding: 5px 3px; border-bottom: 2px solid rgba(0, 212, 255, 0.3); color: #7fb3d3; font-size: 0.7em;">Min</th>
-                <th style="text-align: center; padding: 5px 3px; border-bottom: 2px solid rgba(0, 212, 255, 0.3); color: #7fb3d3; font-size: 0.7em;">Max</th>
-                <th style="text-align: center; padding: 5px 3px; border-bottom: 2px solid rgba(0, 212, 255, 0.3); color: #7fb3d3; font-size: 0.7em;">Med</th>
-            </tr>
-        '''
+PERCENTILE_CELL_TEMPLATE = '''
+                <td>{p10}-{p90}</td>'''
 
-        for ore_name, ore_data in ores.items():
-            if ore_name == 'INERTMATERIAL':
-                continue
-            prob = int(round(ore_data.get('prob', 0) * 100))
-            min_pct = int(round(ore_data.get('minPct', 0) * 100))
-            max_pct = int(round(ore_data.get('maxPct', 0) * 100))
-            med_pct = int(round(ore_data.get('medPct', 0) * 100))
-            display_name = ore_name.title()
-            color = mineral_colors_dict.get(ore_name, '#ffffff')
-            html += f'''
-                <tr>
-                    <td style="padding: 3px 3px;"><span style="color: {color}; font-weight: bold;">{display_name}</span></td>
-                    <td style="text-align: center; padding: 3px 3px;">{prob}%</td>
-                    <td style="text-align: center; padding: 3px 3px;">{min_pct}%</td>
-                    <td style="text-align: center; padding: 3px 3px;">{max_pct}%</td>
-                    <td style="text-align: center; padding: 3px 3px;">{med_pct}%</td>
-                </tr>
-            '''
-
-        html += '</table></div>'
-
-        if multima > 1:
-            html += f'''
-        <div class="multima-indicator">
+# Mineral-Tabelle (pro System und Rock-Typ gecacht)
+MINERAL_TABLE_TEMPLATE = '''        <table class="mineral-table">
+            <tr><th>Mineral</th><th>Prob</th><th>Min</th><th>Max</th><th>Med</th></tr>
+{rows}        </table>'''
+
+MINERAL_ROW_TEMPLATE = (
+    '            <tr><td><span class="ore-name" style="color: {color};">{name}</span></td>'
+    '<td>{prob}%</td><td>{min_pct}%</td><td>{max_pct}%</td><td>{med_pct}%</td></tr>\n'
+)
+
+MULTIMA_BADGE_TEMPLATE = '''        <div class="multima-indicator">
             {multima}x MULTIMA FORMATION - ENHANCED YIELD
         </div>
 '''
 
-        html += '</body></html>'
-        return html
+# Mehrdeutiges Signal: konkurrierende Kandidaten mit Score (siehe signal_collisions.py)
+AMBIGUITY_BADGE_TEMPLATE = '''    <div class="ambiguity-indicator">
+        <div class="ambiguity-title">AMBIGUOUS SIGNAL - {count} CANDIDATES</div>
+{rows}    </div>
+'''
 
-    def create_price_overlay_html(self):
-        """Erstelle HTML für Preisliste-Overlay"""
-        # Hier würde der vollständige HTML-Code für die Preisliste stehen
-        # Ich kürze es hier ab, da es sehr lang ist
-        return '''<!DOCTYPE html>
+AMBIGUITY_ROW_TEMPLATE = (
+    '        <div class="ambiguity-candidate"><span>{name} @{signal}</span><span>{score}%</span></div>\n'
+)
+
+# Höchstzahl angezeigter Kandidaten im Overlay, Kandidaten unter dem Mindest-Score werden weggelassen
+MAX_AMBIGUITY_CANDIDATES = 3
+MIN_CANDIDATE_SCORE = 0.01
+
+# Browser-Quelle (z.B. OBS): gleiches Overlay-Dokument, Scans kommen per Server-Sent Events
+BROWSER_OVERLAY_SCRIPT = '''
+    <script>
+        // Bis zum ersten Scan und nach Auto-Hide unsichtbar
+        var hideTimer = null;
+        document.body.style.visibility = 'hidden';
+        new EventSource('events').addEventListener('scan', function(event) {
+            var data = JSON.parse(event.data);
+            // Kandidaten stehen im HTML, updateOverlay markiert mehrdeutige Scans (data.ambiguous) zusätzlich
+            updateOverlay(data);
+            document.body.style.visibility = 'visible';
+            clearTimeout(hideTimer);
+            hideTimer = setTimeout(function() {
+                document.body.style.visibility = 'hidden';
+            }, data.auto_hide_seconds * 1000);
+        });
+    </script>
+</body>'''
+
+# Preis-Overlay: statisches Dokument, Tabellen und Status werden eingesetzt
+PRICE_TABLES_PLACEHOLDER = '<!--price-tables-->'
+PRICE_STATUS_PLACEHOLDER = '<!--price-status-->'
+
+PRICE_OVERLAY_HTML = '''<!DOCTYPE html>
 <html>
 <head><meta charset="UTF-8">
 <style>
@@ -500,13 +325,538 @@ th { padding: 5px 3px; text-align: left; border-bottom: 2px solid rgba(0, 212, 2
 td { padding: 4px 3px; border-bottom: 1px solid rgba(255, 255, 255, 0.1); font-size: 0.75em; }
 .resource-name { font-weight: bold; }
 .price { text-align: right; color: #b0b0b0; }
+.location { text-align: right; color: #7fb3d3; font-size: 0.65em; }
+.price-status { text-align: center; margin-top: 8px; color: #7fb3d3; font-size: 0.65em; }
+.price-status.stale { color: #ff6b6b; }
+.hint { text-align: center; margin-top: 4px; color: #7fb3d3; font-size: 0.65em; }
 </style>
 </head>
 <body>
 <h2>Mineable Ore Prices</h2>
 <div class="price-tables">
-<!-- Preis-Tabellen hier -->
-</div>
-<div style="text-align: center; margin-top: 8px; color: #7fb3d3; font-size: 0.65em;">Numpad - zum Schließen | Verschiebbar mit Maus</div>
+<!--price-tables--></div>
+<!--price-status-->
+<div class="hint">Numpad - zum Schließen | Verschiebbar mit Maus</div>
 </body>
-</html>'''
\ No newline at end of file
+</html>'''
+
+PRICE_TABLE_TEMPLATE = '''<table>
+<tr><th>Ore</th><th class="price">{currency}/{unit}</th><th class="location">Refinery</th></tr>
+{rows}</table>
+'''
+
+PRICE_ROW_TEMPLATE = (
+    '<tr><td class="resource-name" style="color: {color};">{name}</td>'
+    '<td class="price">{price:,.0f}</td><td class="location">{location}</td></tr>\n'
+)
+
+# Anzahl Tabellen nebeneinander im Preis-Overlay
+PRICE_TABLE_COLUMNS = 3
+
+# Wartezeit nach der letzten Fensterbewegung bevor die Position gespeichert wird
+PRICE_OVERLAY_MOVE_DEBOUNCE = 0.5
+
+# Grenzen für die gemessene Overlay-Höhe
+OVERLAY_MIN_HEIGHT = 300
+OVERLAY_MAX_HEIGHT = 1600
+
+
+def _discard_window(window):
+    """Defektes Fenster vor dem Verwerfen noch zerstören, damit kein verwaistes Fenster offen bleibt"""
+    try:
+        window.destroy()
+    except Exception as e:
+        print(f"[WARNING] Fenster konnte nicht zerstört werden: {e}")
+
+
+class OverlayBridge:
+    """JS-API des Overlay-Fensters (JavaScript -> Python)"""
+
+    def __init__(self, on_size):
+        self._on_size = on_size
+
+    def report_overlay_size(self, height):
+        """Wird von der Overlay-Seite nach dem Layout mit der gemessenen Höhe aufgerufen"""
+        self._on_size(height)
+
+
+class OverlayManager:
+    """Verwaltet alle Overlays (SC-Overlay und Preis-Overlay)"""
+
+    def __init__(self, config_manager, ui=None, scheduler=None, price_table=None):
+        """
+        config_manager: ConfigManager mit Overlay-Einstellungen
+        ui: UI-Backend (webview-Modul oder fake_webview)
+        scheduler: Gemeinsamer UIScheduler für Auto-Hide und Positions-Tracking
+        price_table: PriceTable für das Preis-Overlay (Standard: ore_prices.json)
+        """
+        self.config = config_manager
+        self.ui = ui or webview
+        self._owns_scheduler = scheduler is None
+        self.scheduler = scheduler or UIScheduler('OverlayScheduler').start()
+
+        # Overlay-Status (das Fenster wird einmal erstellt und danach nur ein-/ausgeblendet)
+        self.overlay_window = None
+        self.overlay_visible = False
+        self.overlay_lock = threading.Lock()
+        self.overlay_bridge = OverlayBridge(self._on_overlay_size)
+
+        # Gemessene Höhen je Layout (Anzahl Mineralzeilen, Multima), erwartete Messung
+        self.layout_cache = {}
+        self._mineral_table_cache = {}
+        self._pending_layout = None
+        self._overlay_size = None
+
+        # Preis-Overlay (Fenster bleibt bestehen und wird nur ein-/ausgeblendet)
+        self.price_table = price_table or PriceTable()
+        self.price_overlay_window = None
+        self.price_overlay_visible = False
+        self.price_overlay_lock = threading.Lock()
+
+        # Gerendertes Preis-Overlay und das im Fenster geladene Dokument
+        self._price_overlay_html = None
+        self._price_overlay_cache_key = None
+        self._price_overlay_loaded_html = None
+
+    def show_overlay(self, signal, rock, minerals, collision=None):
+        """
+        Zeige SC-ähnliches Overlay über dem Spiel
+        collision: Ergebnis von RockAnalyzer.check_collision (mehrdeutige Scans werden markiert)
+        """
+        if not self.ui:
+            return
+
+        try:
+            auto_hide_seconds = self.config.config.get('overlay_auto_hide_seconds', 10)
+
+            overlay_width = self._overlay_width(minerals)
+
+            body_html = self.create_overlay_body_html(
+                signal, rock, minerals, auto_hide_seconds, overlay_width, collision
+            )
+            candidates = self._ambiguity_candidates(collision)
+
+            # Höhe berechnen
+            header_height = 62
+            stats_height = 165
+            mineral_header_height = 28
+            mineral_row_height = 19
+            mineral_list_height = len(minerals) * mineral_row_height
+            multima_height = 38 if rock.get('multima_factor', 1) > 1 else 0
+            shown = min(len(candidates), MAX_AMBIGUITY_CANDIDATES)
+            ambiguity_height = 28 + shown * 14 if candidates else 0
+            bottom_padding = 18
+            border_space = 2
+
+            calculated_height = (header_height + ambiguity_height + stats_height + mineral_header_height +
+                                 mineral_list_height + multima_height + bottom_padding + border_space)
+
+            overlay_height = max(350, min(950, calculated_height))
+
+            # Bekannte Layouts brauchen keine Messung im Fenster
+            layout_key = (self._overlay_row_count(rock), rock.get('multima_factor', 1) > 1, shown)
+            cached_height = self.layout_cache.get(layout_key)
+            if cached_height is not None:
+                overlay_height = cached_height
+
+            with self.overlay_lock:
+                self._pending_layout = None if cached_height is not None else (layout_key, overlay_width)
+
+                if self.overlay_window is not None:
+                    try:
+                        # Vorhandenes Fenster: nur neue Daten ins DOM schieben
+                        payload = json.dumps({
+                            'html': body_html, 'ambiguous': bool(candidates), 'measure': cached_height is None
+                        })
+                        self.overlay_window.evaluate_js(f"updateOverlay({payload});")
+                        if self._overlay_size != (overlay_width, overlay_height):
+                            self.overlay_window.resize(overlay_width, overlay_height)
+                            self._overlay_size = (overlay_width, overlay_height)
+                        if not self.overlay_visible:
+                            self.overlay_window.show()
+                    except Exception as e:
+                        print(f"[WARNING] Overlay-Fenster nicht mehr verfügbar, wird neu erstellt: {e}")
+                        _discard_window(self.overlay_window)
+                        self.overlay_window = None
+
+                if self.overlay_window is None:
+                    overlay_html = self.create_overlay_shell_html().replace(OVERLAY_ROOT_PLACEHOLDER, body_html)
+                    if candidates:
+                        overlay_html = overlay_html.replace('<body>', '<body class="ambiguous">', 1)
+                    self.overlay_window = self.ui.create_window(
+                        'SC Mining Overlay',
+                        html=overlay_html,
+                        js_api=self.overlay_bridge,
+                        width=overlay_width,
+                        height=overlay_height,
+                        x=self.config.config.get('overlay_position', {}).get('x', 20),
+                        y=self.config.config.get('overlay_position', {}).get('y', 20),
+                        min_size=(320, 300),
+                        resizable=False,
+                        on_top=True,
+                        transparent=True,
+                        frameless=True,
+                        shadow=False
+                    )
+                    self._overlay_size = (overlay_width, overlay_height)
+
+                self.overlay_visible = True
+
+            # Auto-Hide (ein neuer Scan verschiebt die Frist)
+            self.scheduler.call_later(float(auto_hide_seconds), self.hide_overlay, key='overlay_auto_hide')
+
+        except Exception as e:
+            print(f"[ERROR] Overlay konnte nicht erstellt werden: {e}")
+
+    def _overlay_width(self, minerals):
+        """Overlay-Breite abhängig vom längsten Mineralnamen"""
+        max_mineral_name_length = max(len(name) for name, _, _ in minerals) if minerals else 10
+        return min(420, max(350, 350 + (max_mineral_name_length - 10) * 2))
+
+    def _ambiguity_candidates(self, collision):
+        """Konkurrierende Kandidaten eines mehrdeutigen Scans (leer wenn eindeutig)"""
+        if not collision or not collision.get('ambiguous'):
+            return []
+        return [candidate for candidate in collision['candidates'] if candidate['score'] >= MIN_CANDIDATE_SCORE]
+
+    def _overlay_row_count(self, rock):
+        """Anzahl der Mineralzeilen im Overlay"""
+        return sum(1 for ore_name in rock.get('ores', {}) if ore_name != 'INERTMATERIAL')
+
+    def _on_overlay_size(self, height):
+        """Gemessene Höhe von der Overlay-Seite: einmal anpassen und cachen"""
+        try:
+            height = int(float(height))
+        except (TypeError, ValueError):
+            return
+
+        with self.overlay_lock:
+            pending = self._pending_layout
+            if pending is None or self.overlay_window is None:
+                return
+            self._pending_layout = None
+
+            layout_key, overlay_width = pending
+            target_height = max(OVERLAY_MIN_HEIGHT, min(OVERLAY_MAX_HEIGHT, height))
+            self.layout_cache[layout_key] = target_height
+
+            current = self._overlay_size
+            if current is None or current[0] != overlay_width or abs(current[1] - target_height) > 2:
+                try:
+                    self.overlay_window.resize(overlay_width, target_height)
+                    self._overlay_size = (overlay_width, target_height)
+                except Exception as e:
+                    print(f"[WARN] Auto-resize failed: {e}")
+
+    def hide_overlay(self):
+        """Verstecke das Overlay (das Fenster bleibt für den nächsten Scan bestehen)"""
+        with self.overlay_lock:
+            if self.overlay_window and self.overlay_visible:
+                try:
+                    self.overlay_window.hide()
+                except Exception as e:
+                    print(f"[WARNING] Overlay-Fenster konnte nicht versteckt werden: {e}")
+                    _discard_window(self.overlay_window)
+                    self.overlay_window = None
+            self.overlay_visible = False
+
+        self.scheduler.cancel('overlay_auto_hide')
+
+    def destroy_overlay(self):
+        """Zerstöre das Overlay-Fenster (beim Beenden)"""
+        self.scheduler.cancel('overlay_auto_hide')
+
+        with self.overlay_lock:
+            self.overlay_visible = False
+            self._pending_layout = None
+            self._overlay_size = None
+            if self.overlay_window:
+                try:
+                    self.overlay_window.destroy()
+                except Exception as e:
+                    print(f"[WARNING] Overlay-Fenster konnte nicht zerstört werden: {e}")
+                finally:
+                    self.overlay_window = None
+
+    def toggle_price_overlay(self):
+        """Zeige/Verstecke Preisliste als freistehendes Overlay"""
+        with self.price_overlay_lock:
+            if self.price_overlay_window and self.price_overlay_visible:
+                # Speichere Position vor dem Ausblenden
+                self.scheduler.cancel('price_overlay_position')
+                self._save_price_overlay_position()
+                try:
+                    self.price_overlay_window.hide()
+                    print("[INFO] Preis-Overlay geschlossen")
+                except Exception as e:
+                    print(f"[WARNING] Preis-Overlay konnte nicht ausgeblendet werden: {e}")
+                    _discard_window(self.price_overlay_window)
+                    self.price_overlay_window = None
+                finally:
+                    self.price_overlay_visible = False
+                return {'success': True, 'visible': False}
+
+            if self.price_overlay_window:
+                # Bestehendes Fenster einblenden, neu laden nur wenn sich die Preise geändert haben
+                try:
+                    price_html = self.create_price_overlay_html()
+                    if price_html is not self._price_overlay_loaded_html:
+                        self.price_overlay_window.load_html(price_html)
+                        self._price_overlay_loaded_html = price_html
+                    self.price_overlay_window.show()
+                    self.price_overlay_visible = True
+                    print("[INFO] Preis-Overlay geöffnet")
+                    return {'success': True, 'visible': True}
+                except Exception as e:
+                    print(f"[WARNING] Preis-Overlay konnte nicht eingeblendet werden, erstelle neu: {e}")
+                    _discard_window(self.price_overlay_window)
+                    self.price_overlay_window = None
+
+            # Öffne das Overlay
+            try:
+                price_html = self.create_price_overlay_html()
+
+                window_width = 720
+                window_height = 380
+
+                price_pos = self.config.config.get('price_overlay_position', None)
+
+                if price_pos is None:
+                    # Erste Anzeige: Unten mittig
+                    try:
+                        screen = self.ui.screens[0]
+                        screen_width = screen.width
+                        screen_height = screen.height
+                        x = (screen_width - window_width) // 2
+                        y = screen_height - window_height - 50
+                    except:
+                        x = 400
+                        y = 600
+                else:
+                    x = price_pos.get('x', 400)
+                    y = price_pos.get('y', 600)
+
+                self.price_overlay_window = self.ui.create_window(
+                    'Mineable Ore Prices',
+                    html=price_html,
+                    width=window_width,
+                    height=window_height,
+                    x=x,
+                    y=y,
+                    min_size=(450, 400),
+                    resizable=False,
+                    on_top=True,
+                    transparent=True,
+                    frameless=True,
+                    shadow=False
+                )
+
+                # Positionsänderungen kommen als Event vom Fenster
+                self.price_overlay_window.events.moved += self._on_price_overlay_moved
+                self._price_overlay_loaded_html = price_html
+                self.price_overlay_visible = True
+
+                print(f"[INFO] Preis-Overlay geöffnet at x={x}, y={y}")
+                return {'success': True, 'visible': True}
+            except Exception as e:
+                print(f"[ERROR] Preis-Overlay konnte nicht erstellt werden: {e}")
+                return {'success': False, 'error': str(e)}
+
+    def _on_price_overlay_moved(self, x, y):
+        """Fenster wurde verschoben - Speichern bis zum Ende der Bewegung aufschieben"""
+        self.scheduler.call_later(
+            PRICE_OVERLAY_MOVE_DEBOUNCE,
+            self._persist_price_overlay_position, x, y,
+            key='price_overlay_position'
+        )
+
+    def _save_price_overlay_position(self):
+        """Speichere Position des Preis-Overlays"""
+        if self.price_overlay_window:
+            try:
+                self._persist_price_overlay_position(self.price_overlay_window.x, self.price_overlay_window.y)
+            except Exception as e:
+                print(f"[WARNING] Position konnte nicht gespeichert werden: {e}")
+
+    def _persist_price_overlay_position(self, x, y):
+        """Schreibe die Position des Preis-Overlays in die Konfigurationsdatei"""
+        position = {'x': x, 'y': y}
+        if self.config.config.get('price_overlay_position') == position:
+            return
+        if self.config.update_setting('price_overlay_position', position):
+            print(f"[INFO] Preis-Overlay Position gespeichert: x={x}, y={y}")
+
+    def shutdown(self):
+        """Schließe alle Overlays und beende geplante Aufgaben"""
+        self.destroy_overlay()
+        self.scheduler.cancel('price_overlay_position')
+        with self.price_overlay_lock:
+            if self.price_overlay_window:
+                try:
+                    self.price_overlay_window.destroy()
+                except Exception as e:
+                    print(f"[WARNING] Preis-Overlay konnte nicht geschlossen werden: {e}")
+                finally:
+                    self.price_overlay_window = None
+                    self.price_overlay_visible = False
+                    self._price_overlay_loaded_html = None
+        if self._owns_scheduler:
+            self.scheduler.shutdown()
+
+    def create_overlay_html(self, signal, rock, minerals, auto_hide_seconds, overlay_width, collision=None):
+        """Erstelle HTML für SC-ähnliches Overlay (komplettes Dokument)"""
+        body_html = self.create_overlay_body_html(signal, rock, minerals, auto_hide_seconds, overlay_width, collision)
+        overlay_html = self.create_overlay_shell_html().replace(OVERLAY_ROOT_PLACEHOLDER, body_html)
+        if self._ambiguity_candidates(collision):
+            overlay_html = overlay_html.replace('<body>', '<body class="ambiguous">', 1)
+        return overlay_html
+
+    def create_overlay_shell_html(self):
+        """Hole das statische Overlay-Dokument, Inhalte kommen per updateOverlay()"""
+        return OVERLAY_SHELL_HTML
+
+    def create_browser_overlay_html(self):
+        """Overlay-Seite für Browser-Quellen, Scans kommen über /events"""
+        return self.create_overlay_shell_html().replace('</body>', BROWSER_OVERLAY_SCRIPT, 1)
+
+    def create_scan_event(self, signal, rock, minerals, collision=None):
+        """Kompaktes Scan-Event für Browser-Quellen (gleicher Inhalt wie das Overlay-Fenster)"""
+        auto_hide_seconds = self.config.config.get('overlay_auto_hide_seconds', 10)
+        candidates = self._ambiguity_candidates(collision)
+        return {
+            'signal': signal,
+            'name': rock['name'],
+            'rock_type': rock.get('rock_type'),
+            'multima_factor': rock.get('multima_factor', 1),
+            'auto_hide_seconds': auto_hide_seconds,
+            'ambiguous': bool(candidates),
+            'candidates': candidates,
+            'html': self.create_overlay_body_html(
+                signal, rock, minerals, auto_hide_seconds, self._overlay_width(minerals), collision
+            )
+        }
+
+    def create_overlay_body_html(self, signal, rock, minerals, auto_hide_seconds, overlay_width, collision=None):
+        """Erstelle den Overlay-Inhalt für einen Scan"""
+        stats = rock.get('stats', {})
+        multima = rock.get('multima_factor', 1)
+
+        cluster = stats.get('cluster', {})
+        mass = stats.get('mass', {})
+        instability = stats.get('instability', {})
+        resistance = stats.get('resistance', {})
+
+        multima_html = MULTIMA_BADGE_TEMPLATE.format(multima=multima) if multima > 1 else ''
+
+        candidates = self._ambiguity_candidates(collision)
+        ambiguity_html = ''
+        if candidates:
+            ambiguity_html = AMBIGUITY_BADGE_TEMPLATE.format(
+                count=len(candidates),
+                rows=''.join(
+                    AMBIGUITY_ROW_TEMPLATE.format(
+                        name=candidate['name'], signal=candidate['signal'], score=int(round(candidate['score'] * 100))
+                    )
+                    for candidate in candidates[:MAX_AMBIGUITY_CANDIDATES]
+                )
+            )
+
+        # Perzentil-Spalte nur, wenn mindestens eine Kennzahl p10/p90 hat
+        has_percentiles = any('p90' in values for values in (cluster, mass, instability, resistance))
+
+        def percentile_cell(values):
+            if not has_percentiles:
+                return ''
+            return PERCENTILE_CELL_TEMPLATE.format(p10=values.get('p10', '-'), p90=values.get('p90', '-'))
+
+        return OVERLAY_BODY_TEMPLATE.format(
+            auto_hide_seconds=auto_hide_seconds,
+            tier_color=TIER_COLORS.get(rock.get('tier', 1), '#808080'),
+            name=rock['name'],
+            signal=signal,
+            ambiguity_badge=ambiguity_html,
+            cluster_min=cluster.get('min', 1),
+            cluster_max=cluster.get('max', 11),
+            cluster_med=cluster.get('med', 6),
+            rock_mass_min=mass.get('min', '0'),
+            rock_mass_max=mass.get('max', '182k'),
+            rock_mass_med=mass.get('med', '8.9k'),
+            instability_min=instability.get('min', 0),
+            instability_max=instability.get('max', 711),
+            instability_med=instability.get('med', 46),
+            resistance_min=resistance.get('min', '0%'),
+            resistance_max=resistance.get('max', '64%'),
+            resistance_med=resistance.get('med', '16%'),
+            percentile_header=PERCENTILE_HEADER if has_percentiles else '',
+            cluster_percentiles=percentile_cell(cluster),
+            rock_mass_percentiles=percentile_cell(mass),
+            instability_percentiles=percentile_cell(instability),
+            resistance_percentiles=percentile_cell(resistance),
+            mineral_table=self._get_mineral_table_html(rock),
+            multima_badge=multima_html
+        )
+
+    def _get_mineral_table_html(self, rock):
+        """Mineral-Tabelle hängt nur von (System, Rock-Typ) ab und wird gecacht"""
+        cache_key = (rock.get('system'), rock.get('rock_type'))
+        if cache_key[1] is not None:
+            cached = self._mineral_table_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        rows = []
+        for ore_name, ore_data in rock.get('ores', {}).items():
+            if ore_name == 'INERTMATERIAL':
+                continue
+            rows.append(MINERAL_ROW_TEMPLATE.format(
+                color=MINERAL_COLORS.get(ore_name, '#ffffff'),
+                name=ore_name.title(),
+                prob=int(round(ore_data.get('prob', 0) * 100)),
+                min_pct=int(round(ore_data.get('minPct', 0) * 100)),
+                max_pct=int(round(ore_data.get('maxPct', 0) * 100)),
+                med_pct=int(round(ore_data.get('medPct', 0) * 100))
+            ))
+
+        table_html = MINERAL_TABLE_TEMPLATE.format(rows=''.join(rows))
+        if cache_key[1] is not None:
+            self._mineral_table_cache[cache_key] = table_html
+        return table_html
+
+    def create_price_overlay_html(self):
+        """Erstelle HTML für Preisliste-Overlay (gecacht bis sich die Preisdatei ändert)"""
+        price_table = self.price_table
+        price_table.reload_if_changed()
+
+        cache_key = (price_table.version, price_table.age_days())
+        if cache_key == self._price_overlay_cache_key:
+            return self._price_overlay_html
+
+        ranked = price_table.ores_by_value()
+        per_column = -(-len(ranked) // PRICE_TABLE_COLUMNS) if ranked else 0
+
+        tables = []
+        for column in range(PRICE_TABLE_COLUMNS if ranked else 0):
+            rows = ''.join(
+                PRICE_ROW_TEMPLATE.format(
+                    color=MINERAL_COLORS.get(ore_name, '#ffffff'),
+                    name=ore_name.title(),
+                    price=price,
+                    location=location
+                )
+                for ore_name, price, location in ranked[column * per_column:(column + 1) * per_column]
+            )
+            tables.append(PRICE_TABLE_TEMPLATE.format(currency=price_table.currency, unit=price_table.unit, rows=rows))
+
+        age = cache_key[1]
+        if price_table.updated is None:
+            status = '<div class="price-status stale">Keine Preisdaten gefunden</div>'
+        elif price_table.is_stale():
+            status = f'<div class="price-status stale">Preise veraltet - Stand {price_table.updated.isoformat()} ({age} Tage)</div>'
+        else:
+            status = f'<div class="price-status">Stand {price_table.updated.isoformat()} ({age} Tage)</div>'
+
+        self._price_overlay_html = (PRICE_OVERLAY_HTML
+                                    .replace(PRICE_TABLES_PLACEHOLDER, ''.join(tables))
+                                    .replace(PRICE_STATUS_PLACEHOLDER, status))
+        self._price_overlay_cache_key = cache_key
+        return self._price_overlay_html
\ No newline at end of file
@@ -0,0 +1,151 @@
+import datetime
+import json
+import math
+import os
+import threading
+
+# Lokale Preisdatei (raffinierte Erze, Preis pro SCU je Raffinerie-Standort)
+PRICE_FILE = 'ore_prices.json'
+
+# Preise älter als diese Anzahl Tage gelten als veraltet
+PRICE_STALE_DAYS = 14
+
+
+class PriceTable:
+    """Lokale Preistabelle, einmal geladen und nach Erz und Standort indiziert"""
+
+    def __init__(self, price_file=PRICE_FILE):
+        self.price_file = price_file
+
+        # Erz -> [(Preis, Standort)] absteigend nach Preis
+        self.by_ore = {}
+        # Standort -> {Erz: Preis}
+        self.by_location = {}
+        # Standort -> System
+        self.locations = {}
+
+        self.updated = None
+        self.currency = 'aUEC'
+        self.unit = 'SCU'
+
+        # Wird bei jedem Neuladen erhöht (für Render-Caches)
+        self.version = 0
+
+        self._file_state = None
+        self._lock = threading.Lock()
+
+        if not self.reload_if_changed():
+            print(f"[WARNING] Preisdatei {price_file} nicht gefunden - Preisliste bleibt leer")
+
+    def reload_if_changed(self):
+        """Lade die Preisdatei neu wenn sie sich geändert hat (True = neu geladen)"""
+        try:
+            stat = os.stat(self.price_file)
+            file_state = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return False
+
+        with self._lock:
+            if file_state == self._file_state:
+                return False
+            self._file_state = file_state
+
+            data = self._load_file()
+            if data is None:
+                return False
+            self._build_index(data)
+            self.version += 1
+
+        print(f"[INFO] Preisliste geladen: {len(self.by_ore)} Erze, {len(self.by_location)} Standorte")
+        return True
+
+    def _load_file(self):
+        """Lade die Preisdatei (None bei Fehler, der alte Index bleibt dann erhalten)"""
+        try:
+            with open(self.price_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"[ERROR] Fehler beim Laden von {self.price_file}: {e}")
+            return None
+
+        if not isinstance(data, dict) or not isinstance(data.get('prices', {}), dict) \
+                or not isinstance(data.get('locations', {}), dict):
+            print(f"[ERROR] Fehler beim Laden von {self.price_file}: prices und locations müssen Objekte sein")
+            return None
+        return data
+
+    def _build_index(self, data):
+        """Erstelle die Indizes nach Erz und Standort (ungültige Einträge werden übersprungen)"""
+        by_ore = {}
+        by_location = {}
+        skipped = 0
+
+        for ore_name, location_prices in data.get('prices', {}).items():
+            if not isinstance(location_prices, dict):
+                skipped += 1
+                continue
+            ore_name = ore_name.upper()
+            entries = []
+            for location, price in location_prices.items():
+                if not price:
+                    continue
+                try:
+                    price = float(price)
+                except (TypeError, ValueError):
+                    price = math.nan
+                if not math.isfinite(price):
+                    skipped += 1
+                    continue
+                entries.append((price, location))
+            entries.sort(reverse=True)
+            by_ore[ore_name] = entries
+            for price, location in entries:
+                by_location.setdefault(location, {})[ore_name] = price
+
+        if skipped:
+            print(f"[WARNING] {skipped} ungültige Preiseinträge in {self.price_file} übersprungen")
+
+        try:
+            updated = datetime.date.fromisoformat(str(data.get('updated', '')))
+        except ValueError:
+            updated = None
+
+        self.by_ore = by_ore
+        self.by_location = by_location
+        self.locations = dict(data.get('locations', {}))
+        self.updated = updated
+        self.currency = data.get('currency', 'aUEC')
+        self.unit = data.get('unit', 'SCU')
+
+    def best_price(self, ore_name, system=None):
+        """Höchster Preis für ein Erz als (Preis, Standort) oder None"""
+        for price, location in self.by_ore.get(ore_name.upper(), ()):
+            if system is None or self.locations.get(location) == system:
+                return price, location
+        return None
+
+    def price_at(self, ore_name, location):
+        """Preis für ein Erz an einem Standort oder None"""
+        return self.by_location.get(location, {}).get(ore_name.upper())
+
+    def ores_by_value(self, system=None):
+        """Alle Erze mit bestem Preis, absteigend sortiert: [(Erz, Preis, Standort)]"""
+        ranked = []
+        for ore_name in self.by_ore:
+            best = self.best_price(ore_name, system)
+            if best:
+                ranked.append((ore_name, best[0], best[1]))
+        ranked.sort(key=lambda entry: entry[1], reverse=True)
+        return ranked
+
+    def age_days(self, today=None):
+        """Alter der Preisdaten in Tagen (None wenn unbekannt)"""
+        if self.updated is None:
+            return None
+        today = today or datetime.date.today()
+        return max(0, (today - self.updated).days)
+
+    def is_stale(self, today=None):
+        """Prüfe ob die Preisdaten veraltet sind"""
+        age = self.age_days(today)
+        return age is None or age > PRICE_STALE_DAYS
@@ -0,0 +1,302 @@
+"""
+Mergebare Quantil-Sketches für Gesteins-Kennzahlen
+Logarithmische Buckets mit fester relativer Genauigkeit (DDSketch-Prinzip): jedes Quantil liegt
+höchstens RELATIVE_ACCURACY vom echten Wert entfernt, zwei Sketches werden durch Addieren der
+Bucket-Zähler zusammengeführt. Der Speicher hängt nur vom Wertebereich ab, nicht von der Anzahl.
+
+scan_ingest.py schreibt pro Rock-Typ und Kennzahl einen Sketch in SKETCH_FILE und die daraus
+berechneten Perzentile (PERCENTILES) direkt in rocks.json. Sketch-Dateien verschiedener Quellen
+lassen sich zusammenführen:
+
+    python quantile_sketch.py quelle_a.json quelle_b.json -o rock_sketches.json --rocks rocks.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+
+# Sketches pro System, Rock-Typ und Kennzahl
+SKETCH_FILE = 'rock_sketches.json'
+
+# Relative Genauigkeit der Quantile (1%)
+RELATIVE_ACCURACY = 0.01
+
+# Höchstzahl Buckets pro Vorzeichen - darüber werden die kleinsten Beträge zusammengelegt
+MAX_BUCKETS = 2048
+
+# Perzentile in rocks.json (Schlüssel -> Quantil), p50 steht dort als 'med'
+PERCENTILES = {'p10': 0.1, 'med': 0.5, 'p90': 0.9}
+
+# Beträge darunter zählen als 0
+MIN_VALUE = 1e-9
+
+
+class QuantileSketch:
+    """Quantil-Sketch mit logarithmischen Buckets (mergebar, relative Genauigkeit)"""
+
+    __slots__ = ('alpha', 'gamma', '_log_gamma', 'positive', 'negative', 'zero', 'count', 'minimum', 'maximum')
+
+    def __init__(self, alpha=RELATIVE_ACCURACY):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        # Bucket-Index -> Anzahl (getrennt nach Vorzeichen)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+
+    def _index(self, magnitude):
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, index):
+        """Repräsentant eines Buckets (relativer Fehler höchstens alpha)"""
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value, weight=1):
+        self.count += weight
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+        if value > MIN_VALUE:
+            index = self._index(value)
+            self.positive[index] = self.positive.get(index, 0) + weight
+            if len(self.positive) > MAX_BUCKETS:
+                self._collapse(self.positive)
+        elif value < -MIN_VALUE:
+            index = self._index(-value)
+            self.negative[index] = self.negative.get(index, 0) + weight
+            if len(self.negative) > MAX_BUCKETS:
+                self._collapse(self.negative)
+        else:
+            self.zero += weight
+
+    def _collapse(self, buckets):
+        """Kleinste Beträge in einen Bucket zusammenlegen (große Werte bleiben genau)"""
+        indexes = sorted(buckets)
+        excess = indexes[:len(indexes) - MAX_BUCKETS]
+        target = indexes[len(excess)]
+        buckets[target] += sum(buckets.pop(index) for index in excess)
+
+    def merge(self, other):
+        """Anderen Sketch hinzufügen (gleiche Genauigkeit vorausgesetzt)"""
+        if other.alpha != self.alpha:
+            raise ValueError(f'Sketches mit unterschiedlicher Genauigkeit ({self.alpha} / {other.alpha})')
+        if not other.count:
+            return self
+        for own, buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in buckets.items():
+                own[index] = own.get(index, 0) + count
+            if len(own) > MAX_BUCKETS:
+                self._collapse(own)
+        self.zero += other.zero
+        self.count += other.count
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        return self
+
+    def quantiles(self, qs):
+        """Mehrere Quantile (0..1) in einem Durchlauf über die Buckets"""
+        if not self.count:
+            return [None] * len(qs)
+
+        # Buckets aufsteigend nach Wert: negative (größter Betrag zuerst), 0, positive
+        ordered = [(-self._value(index), self.negative[index]) for index in sorted(self.negative, reverse=True)]
+        if self.zero:
+            ordered.append((0.0, self.zero))
+        ordered.extend((self._value(index), self.positive[index]) for index in sorted(self.positive))
+
+        results = {}
+        position = 0
+        seen = 0
+        for q in sorted(set(qs)):
+            rank = q * (self.count - 1)
+            while position < len(ordered) - 1 and seen + ordered[position][1] <= rank:
+                seen += ordered[position][1]
+                position += 1
+            # Auf den exakten Wertebereich begrenzen (min/max sind genau)
+            results[q] = min(self.maximum, max(self.minimum, ordered[position][0]))
+        return [results[q] for q in qs]
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def summary(self, digits=None):
+        """{'min', 'max', 'p10', 'med', 'p90'} wie in rocks.json"""
+        if not self.count:
+            return {'min': 0, 'max': 0, 'med': 0, 'p10': 0, 'p90': 0}
+        values = dict(zip(PERCENTILES, self.quantiles(list(PERCENTILES.values()))))
+        values['min'] = self.minimum
+        values['max'] = self.maximum
+        if digits is not None:
+            values = {key: int(round(value)) if digits == 0 else round(value, digits) for key, value in values.items()}
+        return {key: values[key] for key in ('min', 'max', 'med', 'p10', 'p90')}
+
+    def to_state(self):
+        """Kompakte JSON-Form: Buckets als [erster Index, Zähler...]"""
+        return {
+            'alpha': self.alpha,
+            'count': self.count,
+            'min': self.minimum,
+            'max': self.maximum,
+            'zero': self.zero,
+            'pos': _dense(self.positive),
+            'neg': _dense(self.negative)
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state.get('alpha', RELATIVE_ACCURACY))
+        sketch.count = state['count']
+        sketch.minimum = state['min']
+        sketch.maximum = state['max']
+        sketch.zero = state.get('zero', 0)
+        sketch.positive = _sparse(state.get('pos', []))
+        sketch.negative = _sparse(state.get('neg', []))
+        return sketch
+
+
+def _dense(buckets):
+    if not buckets:
+        return []
+    low, high = min(buckets), max(buckets)
+    return [low] + [buckets.get(index, 0) for index in range(low, high + 1)]
+
+
+def _sparse(dense):
+    if not dense:
+        return {}
+    low = dense[0]
+    return {low + offset: count for offset, count in enumerate(dense[1:]) if count}
+
+
+# ==================== Sketch-Dateien ====================
+# Aufbau: {System: {Rock-Typ: {Kennzahl: Sketch, 'ores': {Erz: Sketch}}}}
+
+def load_sketches(sketch_file=SKETCH_FILE):
+    """Lade Sketches aus einer Sketch-Datei"""
+    try:
+        if os.path.exists(sketch_file):
+            with open(sketch_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {
+                system: {
+                    rock_type: _map_sketches(entry, QuantileSketch.from_state)
+                    for rock_type, entry in rocks.items()
+                }
+                for system, rocks in data.items()
+            }
+        return {}
+    except (IOError, json.JSONDecodeError, KeyError, TypeError) as e:
+        print(f"[ERROR] Fehler beim Laden von {sketch_file}: {e}")
+        return {}
+
+
+def save_sketches(sketches, sketch_file=SKETCH_FILE):
+    """Sketches atomar speichern"""
+    data = {
+        system: {rock_type: _map_sketches(entry, QuantileSketch.to_state) for rock_type, entry in rocks.items()}
+        for system, rocks in sketches.items()
+    }
+    tmp_file = sketch_file + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8', newline='\n') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_file, sketch_file)
+
+
+def _map_sketches(entry, function):
+    mapped = {key: function(value) for key, value in entry.items() if key != 'ores'}
+    mapped['ores'] = {ore: function(value) for ore, value in entry.get('ores', {}).items()}
+    return mapped
+
+
+def merge_sketch_sets(target, source):
+    """Sketches einer Quelle in target übernehmen (pro System, Rock-Typ und Kennzahl addiert)"""
+    for system, rocks in source.items():
+        for rock_type, entry in rocks.items():
+            own = target.setdefault(system, {}).setdefault(rock_type, {'ores': {}})
+            for key, sketch in entry.items():
+                if key == 'ores':
+                    continue
+                if key in own:
+                    own[key].merge(sketch)
+                else:
+                    own[key] = sketch
+            for ore, sketch in entry.get('ores', {}).items():
+                if ore in own['ores']:
+                    own['ores'][ore].merge(sketch)
+                else:
+                    own['ores'][ore] = sketch
+    return target
+
+
+def apply_percentiles(rocks_data, sketches, digits):
+    """
+    Perzentile der Sketches in rocks.json-Daten eintragen
+    digits: Kennzahl -> Nachkommastellen (Erzanteile unter 'ores')
+    """
+    for system, rocks in sketches.items():
+        for rock_type, entry in rocks.items():
+            rock_data = rocks_data.get(system, {}).get(rock_type)
+            if rock_data is None:
+                continue
+            for key, sketch in entry.items():
+                if key != 'ores' and sketch.count:
+                    rock_data[key] = sketch.summary(digits.get(key))
+            for ore, sketch in entry.get('ores', {}).items():
+                ore_data = rock_data.get('ores', {}).get(ore)
+                if ore_data is None or not sketch.count:
+                    continue
+                summary = sketch.summary(digits.get('ores'))
+                ore_data.update({
+                    'minPct': summary['min'],
+                    'maxPct': summary['max'],
+                    'medPct': summary['med'],
+                    'p10Pct': summary['p10'],
+                    'p90Pct': summary['p90']
+                })
+    return rocks_data
+
+
+def main(argv=None):
+    from scan_ingest import STAT_FIELDS, ORE_DIGITS, format_rocks_json
+
+    parser = argparse.ArgumentParser(description='Sketch-Dateien mehrerer Quellen zusammenführen')
+    parser.add_argument('inputs', nargs='+', help='Sketch-Dateien')
+    parser.add_argument('-o', '--output', default=SKETCH_FILE, help='Zusammengeführte Sketch-Datei')
+    parser.add_argument('--rocks', help='rocks.json, deren Perzentile aus den Sketches neu berechnet werden')
+    args = parser.parse_args(argv)
+
+    merged = {}
+    for path in args.inputs:
+        merge_sketch_sets(merged, load_sketches(path))
+    save_sketches(merged, args.output)
+    total = sum(len(rocks) for rocks in merged.values())
+    print(f"[INFO] {len(args.inputs)} Dateien zusammengeführt: {total} Rock-Typen -> {args.output}")
+
+    if args.rocks:
+        try:
+            with open(args.rocks, 'r', encoding='utf-8') as f:
+                rocks_data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"[ERROR] Fehler beim Laden von {args.rocks}: {e}")
+            return 1
+        digits = {key: stat_digits for key, (_, stat_digits) in STAT_FIELDS.items()}
+        digits['ores'] = ORE_DIGITS
+        apply_percentiles(rocks_data, merged, digits)
+        tmp_file = args.rocks + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(format_rocks_json(rocks_data))
+        os.replace(tmp_file, args.rocks)
+        print(f"[INFO] Perzentile in {args.rocks} aktualisiert")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Lasttest für den Query-Server
+Öffnet mehrere Keep-Alive-Verbindungen und misst Anfragen pro Sekunde und Latenz-Perzentile.
+
+    python query_loadtest.py --local                       # startet eine lokale Instanz im Prozess
+    python query_loadtest.py --port 8765 --connections 32 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from query_server import DEFAULT_HOST, DEFAULT_PORT, QueryServer
+
+# Typische Signalwerte für Suchanfragen
+SIGNALS = [1700, 1720, 1750, 1800, 1850, 1870, 1900, 1920, 3400, 3600, 3700, 5550, 7200, 34200]
+
+
+def _search_request(rng):
+    return 'GET', f'/search?signal={rng.choice(SIGNALS) + rng.choice((0, 0, 0, 10, -20))}', b''
+
+
+def _catalog_request(rng):
+    return 'GET', rng.choice(('/catalog', '/catalog/QTYPE', '/catalog?system=PYRO')), b''
+
+
+def _batch_request(rng):
+    body = json.dumps({'signals': [rng.randint(1500, 40000) for _ in range(100)]}).encode('utf-8')
+    return 'POST', '/batch', body
+
+
+# Anfrage-Mix: (Anteil, Fabrik für Methode/Pfad/Body)
+REQUEST_MIX = [(0.8, _search_request), (0.15, _catalog_request), (0.05, _batch_request)]
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def _client(host, port, deadline, max_requests, latencies, errors, seed):
+    """Eine Keep-Alive-Verbindung, die bis zur Frist Anfragen sendet"""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = 0
+    try:
+        while time.perf_counter() < deadline and (max_requests is None or sent < max_requests):
+            sent += 1
+            roll = rng.random()
+            for share, factory in REQUEST_MIX:
+                roll -= share
+                if roll <= 0:
+                    break
+            method, path, body = factory(rng)
+
+            request = (
+                f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Length: {len(body)}\r\nContent-Type: application/json\r\n\r\n"
+            ).encode('latin-1') + body
+
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+
+            if not status_line.startswith(b'HTTP/1.1 200'):
+                errors.append(status_line.decode('latin-1').strip())
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, connections, duration, total_requests=None):
+    """Lasttest ausführen - liefert (Latenzen, Fehler, Sekunden)"""
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    per_client = None if total_requests is None else max(1, total_requests // connections)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, deadline, per_client, latencies, errors, seed)
+        for seed in range(connections)
+    ))
+    return latencies, errors, time.perf_counter() - start
+
+
+def print_report(latencies, errors, elapsed, connections):
+    values = sorted(latencies)
+    rate = len(values) / elapsed if elapsed > 0 else 0.0
+    print(f"Verbindungen:      {connections}")
+    print(f"Anfragen:          {len(values)} in {elapsed:.2f}s ({rate:,.0f} Anfragen/s)")
+    print(f"Fehler:            {len(errors)}")
+    if values:
+        print(f"Latenz:            p50={_percentile(values, 50) * 1000:.2f} ms  "
+              f"p95={_percentile(values, 95) * 1000:.2f} ms  "
+              f"p99={_percentile(values, 99) * 1000:.2f} ms  max={values[-1] * 1000:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Lasttest für den Query-Server')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--local', action='store_true', help='Lokale Instanz im Prozess starten (freier Port)')
+    parser.add_argument('--connections', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0, help='Sekunden')
+    parser.add_argument('--requests', type=int, help='Gesamtanzahl Anfragen statt Dauer')
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.local:
+        server = QueryServer(args.host, 0).start()
+        args.port = server.port
+
+    duration = args.duration if args.requests is None else float('inf')
+    try:
+        latencies, errors, elapsed = asyncio.run(
+            run_load(args.host, args.port, args.connections, duration, args.requests)
+        )
+    except OSError as e:
+        print(f"[ERROR] Verbindung zu {args.host}:{args.port} fehlgeschlagen: {e}")
+        return 1
+    finally:
+        if server:
+            server.stop()
+
+    print_report(latencies, errors, elapsed, args.connections)
+    if server:
+        print(f"Cache-Treffer:     {server.cache_hits} von {server.requests}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,456 @@
+"""
+Lokaler HTTP/JSON-Server für Abfragen mehrerer Clients (asyncio, ohne webview und pynput)
+Läuft in einem eigenen Thread mit eigener Event-Loop und blockiert die GUI nicht.
+
+    GET  /health
+    GET  /search?signal=3600[&system=PYRO]
+    POST /batch            {"signals": [1800, 3600], "system": "STANTON"}
+    GET  /catalog[?system=PYRO]
+    GET  /catalog/<ROCK_TYPE>[?system=PYRO]
+    GET  /events           Server-Sent Events der Scans (nur mit Event-Hub)
+    GET  /overlay          Overlay-Seite für Browser-Quellen (z.B. OBS)
+    POST /sync             Delta-Sync der Crew-Historie (nur mit SharedHistory und Crew-Schlüssel)
+
+    python query_server.py --host 0.0.0.0 --port 8765
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from history_sync import handle_sync_request
+from rock_analyzer import ROCKS_FILE, RockAnalyzer
+from scan_events import HEARTBEAT_EVENT, HEARTBEAT_SECONDS
+from value_engine import ValueEngine
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Maximale Anzahl gecachter GET-Antworten
+RESPONSE_CACHE_SIZE = 4096
+
+# Obergrenzen für Anfragen
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_SIGNALS = 10000
+
+# Verbindungen ohne Anfrage werden nach dieser Zeit geschlossen (Sekunden)
+KEEP_ALIVE_TIMEOUT = 15
+
+SYSTEMS = ('STANTON', 'PYRO')
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    403: 'Forbidden',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+
+class QueryError(Exception):
+    """Fehler mit HTTP-Status für die Antwort"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class QueryServer:
+    """Asyncio HTTP/JSON-Server über RockAnalyzer mit Antwort-Cache"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, rocks_file=ROCKS_FILE, value_engine=None,
+                 cache_size=RESPONSE_CACHE_SIZE, event_hub=None, overlay_html=None, history=None,
+                 sync_token=None):
+        """
+        event_hub: ScanEventHub für /events (ohne Hub gibt es keinen Event-Stream)
+        overlay_html: Overlay-Seite für /overlay
+        history: SharedHistory für /sync (kann auch später gesetzt werden)
+        sync_token: Crew-Schlüssel, den jede /sync-Anfrage mitbringen muss (ohne Schlüssel kein Sync)
+        """
+        self.host = host
+        self.port = port
+        self.cache_size = cache_size
+        self.event_hub = event_hub
+        self.overlay_html = overlay_html.encode('utf-8') if overlay_html else None
+        self.history = history
+        self.sync_token = sync_token
+
+        # Ein Analyzer pro System, gemeinsame Preise/Erwartungswerte
+        self.value_engine = value_engine or ValueEngine()
+        self.analyzers = {}
+        for system in SYSTEMS:
+            analyzer = RockAnalyzer(self.value_engine, rocks_file=rocks_file)
+            if system in analyzer.rocks_data:
+                analyzer.build_rock_database(system)
+                self.analyzers[system] = analyzer
+
+        self.routes = {
+            ('GET', '/health'): self.handle_health,
+            ('GET', '/search'): self.handle_search,
+            ('POST', '/batch'): self.handle_batch,
+            ('GET', '/catalog'): self.handle_catalog,
+            ('POST', '/sync'): self.handle_sync
+        }
+        # GET-Routen, deren Antworten nur von rocks.json und den Preisen abhängen (/health nie cachen)
+        self.cacheable_routes = {'/search', '/catalog'}
+
+        self._cache = collections.OrderedDict()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+        # Statistik
+        self.requests = 0
+        self.cache_hits = 0
+
+    # ==================== Lebenszyklus ====================
+
+    def start(self, timeout=5.0):
+        """Starte den Server in einem eigenen Thread"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name='QueryServer', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout) or self._server is None:
+            raise RuntimeError(f"Query-Server konnte nicht auf {self.host}:{self.port} starten")
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stoppe Server und Event-Loop"""
+        loop = self._loop
+        if loop and loop.is_running():
+            loop.call_soon_threadsafe(loop.stop)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port)
+            )
+            # Bei Port 0 den tatsächlich gewählten Port übernehmen
+            self.port = self._server.sockets[0].getsockname()[1]
+            print(f"[INFO] Query-Server läuft auf http://{self.host}:{self.port}")
+        except OSError as e:
+            print(f"[ERROR] Query-Server konnte nicht starten: {e}")
+            self._server = None
+            self._ready.set()
+            loop.close()
+            return
+
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            # Keine neuen Verbindungen annehmen, offene (z.B. /events) abbrechen und abwarten -
+            # erst danach kehrt wait_closed zurück (ab Python 3.12.1 wartet es auf alle Verbindungen)
+            self._server.close()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(self._server.wait_closed())
+            loop.close()
+            self._loop = None
+            print("[INFO] Query-Server beendet")
+
+    # ==================== HTTP ====================
+
+    async def _handle_client(self, reader, writer):
+        """Eine Verbindung (HTTP/1.1 mit Keep-Alive)"""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    await self._write_response(writer, 400, {'success': False, 'error': 'Ungültige Anfrage'}, False)
+                    break
+                method, target, version = parts
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                length = int(headers.get('content-length', 0) or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._write_response(writer, 413, {'success': False, 'error': 'Anfrage zu groß'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                # Event-Stream und Overlay-Seite laufen am JSON-Dispatch vorbei
+                path = urlsplit(target).path.rstrip('/')
+                if method == 'GET' and path == '/events' and self.event_hub is not None:
+                    self.requests += 1
+                    await self._stream_events(writer)
+                    break
+                if method == 'GET' and path == '/overlay' and self.overlay_html is not None:
+                    self.requests += 1
+                    await self._write_response(writer, 200, self.overlay_html, keep_alive, 'text/html; charset=utf-8')
+                    if not keep_alive:
+                        break
+                    continue
+
+                status, payload = await self.dispatch(method, target, body)
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Verbindung abgebrochen oder fehlerhafte Header/Zeilen
+            pass
+        except asyncio.CancelledError:
+            # Server wird beendet: regulär enden, Python 3.11 meldet abgebrochene Verbindungs-Tasks sonst als Fehler
+            pass
+        finally:
+            writer.close()
+
+    async def _write_response(self, writer, status, payload, keep_alive, content_type='application/json; charset=utf-8'):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _stream_events(self, writer):
+        """Server-Sent Events: wartende Scans gebündelt schreiben, bis der Client trennt"""
+        head = (
+            "HTTP/1.1 200 OK\r\n"
+            "Content-Type: text/event-stream; charset=utf-8\r\n"
+            "Cache-Control: no-cache\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + b'retry: 1000\n\n')
+        await writer.drain()
+
+        wakeup = asyncio.Event()
+        subscriber = self.event_hub.subscribe(asyncio.get_running_loop(), wakeup)
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Heartbeat erkennt auch getrennte Clients
+                    writer.write(HEARTBEAT_EVENT)
+                    await writer.drain()
+                    continue
+                wakeup.clear()
+
+                # Langsame Clients blockieren nur hier, ihr Puffer verwirft derweil alte Events
+                events = self.event_hub.take(subscriber)
+                if events:
+                    writer.write(events)
+                    await writer.drain()
+        finally:
+            self.event_hub.unsubscribe(subscriber)
+
+    async def dispatch(self, method, target, body):
+        """Anfrage an die Route weiterleiten, Antworten cachebarer GET-Routen werden gecacht"""
+        self.requests += 1
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+
+        # /catalog/<ROCK_TYPE>
+        route_path, _, resource = path.partition('/catalog/')
+        if resource:
+            route_path = '/catalog'
+        route = self.routes.get((method, route_path))
+        if route is None:
+            if any(route_path == known_path for _, known_path in self.routes):
+                return 405, {'success': False, 'error': f'Methode {method} nicht erlaubt'}
+            return 404, {'success': False, 'error': f'Unbekannter Pfad: {path}'}
+
+        cache_key = None
+        if method == 'GET' and route_path in self.cacheable_routes:
+            cache_key = (target, self.value_engine.price_table.version)
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+                self.cache_hits += 1
+                return 200, cached
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if method == 'POST':
+                # Batches können groß sein und /sync hängt an die Crew-Historie an (Dateizugriff) -
+                # POST-Routen laufen deshalb außerhalb der Event-Loop
+                payload = await asyncio.get_running_loop().run_in_executor(None, route, query, body, resource)
+            else:
+                payload = route(query, body, resource)
+        except QueryError as e:
+            return e.status, {'success': False, 'error': str(e)}
+        except Exception as e:
+            print(f"[ERROR] Query-Server Anfrage {method} {target} fehlgeschlagen: {e}")
+            return 500, {'success': False, 'error': str(e)}
+
+        encoded = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        if cache_key is not None:
+            self._cache[cache_key] = encoded
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return 200, encoded
+
+    # ==================== Routen ====================
+
+    def _analyzer(self, query):
+        system = query.get('system', 'STANTON').upper()
+        analyzer = self.analyzers.get(system)
+        if analyzer is None:
+            raise QueryError(400, f'Ungültiges System: {system}')
+        return system, analyzer
+
+    def _parse_signal(self, value):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise QueryError(400, f'Ungültiger Signalwert: {value}')
+
+    def handle_health(self, query, body, resource):
+        return {
+            'success': True,
+            'systems': list(self.analyzers),
+            'requests': self.requests,
+            'cache_hits': self.cache_hits,
+            'cached_responses': len(self._cache),
+            'event_subscribers': self.event_hub.subscriber_count() if self.event_hub else 0
+        }
+
+    def handle_search(self, query, body, resource):
+        system, analyzer = self._analyzer(query)
+        signal_value = self._parse_signal(query.get('signal'))
+        collision = analyzer.check_collision(signal_value)
+        return {
+            'success': True,
+            'system': system,
+            'signal': signal_value,
+            'matches': analyzer.analyze_signal(signal_value),
+            'ambiguous': bool(collision and collision['ambiguous']),
+            'collision': collision
+        }
+
+    def handle_batch(self, query, body, resource):
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            raise QueryError(400, 'Body ist kein gültiges JSON')
+        if not isinstance(data, dict):
+            raise QueryError(400, 'Body muss ein JSON-Objekt sein')
+
+        system, analyzer = self._analyzer({'system': data.get('system', query.get('system', 'STANTON'))})
+        signals = data.get('signals', [])
+        if not isinstance(signals, list) or len(signals) > MAX_BATCH_SIGNALS:
+            raise QueryError(400, f'signals muss eine Liste mit höchstens {MAX_BATCH_SIGNALS} Werten sein')
+
+        results = {}
+        for value in signals:
+            signal_value = self._parse_signal(value)
+            if signal_value in results:
+                continue
+            matches = analyzer.find_matching_rocks(signal_value)
+            best = matches[0] if matches else None
+            results[signal_value] = {
+                'signal': signal_value,
+                'match': best['name'] if best else None,
+                'rock_type': best.get('rock_type') if best else None,
+                'multima_factor': best.get('multima_factor', 1) if best else None,
+                'accuracy': best.get('accuracy', 0) if best else 0,
+                'expected_value': best.get('expected_value', 0) if best else 0,
+                'matches': len(matches)
+            }
+
+        return {'success': True, 'system': system, 'results': [results[self._parse_signal(v)] for v in signals]}
+
+    def handle_catalog(self, query, body, resource):
+        system, analyzer = self._analyzer(query)
+        rocks = analyzer.rank_by_value([dict(rock, multima_factor=1) for rock in analyzer.rock_database])
+
+        if resource:
+            rock_type = resource.upper()
+            for rock in rocks:
+                if rock['rock_type'] == rock_type:
+                    return {'success': True, 'system': system, 'rock': rock}
+            raise QueryError(404, f'Rock-Typ {rock_type} nicht in {system} gefunden')
+
+        catalog = [
+            {key: rock.get(key) for key in ('name', 'rock_type', 'signal', 'tier', 'type', 'rarity',
+                                            'expected_value', 'expected_scu', 'best_ore')}
+            for rock in rocks
+        ]
+        catalog.sort(key=lambda rock: rock['signal'])
+        return {'success': True, 'system': system, 'rocks': catalog}
+
+
+    def handle_sync(self, query, body, resource):
+        history = self.history
+        if history is None:
+            raise QueryError(404, 'Crew-Sync ist nicht aktiviert')
+        try:
+            data = json.loads(body or b'{}')
+        except ValueError:
+            raise QueryError(400, 'Body ist kein gültiges JSON')
+        if not isinstance(data, dict):
+            raise QueryError(400, 'Body muss ein JSON-Objekt sein')
+
+        try:
+            return handle_sync_request(history, data, self.sync_token)
+        except PermissionError as e:
+            raise QueryError(403, str(e))
+        except ValueError as e:
+            raise QueryError(400, str(e))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Lokaler HTTP/JSON Query-Server für den Mining Analyzer')
+    parser.add_argument('--host', default=DEFAULT_HOST, help='127.0.0.1 = nur lokal, 0.0.0.0 = im LAN erreichbar')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--rocks', default=ROCKS_FILE, help='Pfad zu rocks.json')
+    args = parser.parse_args(argv)
+
+    server = QueryServer(args.host, args.port, rocks_file=args.rocks)
+    try:
+        server.start()
+        while server.is_running():
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
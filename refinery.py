@@ -0,0 +1,155 @@
+import json
+import os
+
+from value_engine import MASS_PER_SCU
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Lokale Raffinerie-Daten (Methoden, Erz-Erträge, Stationen)
+REFINERY_FILE = 'refinery_data.json'
+
+# Anzahl ausgegebener Raffinerie-Optionen pro Treffer
+REFINERY_OPTIONS = 5
+
+
+class RefineryCalculator:
+    """Raffinerie-Ertrag, Dauer und Kosten über alle Methoden und Stationen eines Systems"""
+
+    def __init__(self, rocks_data, value_engine, data_file=REFINERY_FILE):
+        """
+        rocks_data: Inhalt von rocks.json
+        value_engine: ValueEngine für die Erzpreise je System
+        """
+        self.rocks_data = rocks_data
+        self.value_engine = value_engine
+        self.data = self.load_data(data_file)
+
+        # System -> (Preis-Version, vorberechnete Tabelle)
+        self._tables = {}
+        # (System, Rock-Typ, Faktor) -> (Preis-Version, Ergebnis)
+        self._cache = {}
+
+    def load_data(self, data_file):
+        """Lade Raffinerie-Daten"""
+        try:
+            if os.path.exists(data_file):
+                with open(data_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            else:
+                print(f"[ERROR] {data_file} nicht gefunden!")
+                return {}
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"[ERROR] Fehler beim Laden von {data_file}: {e}")
+            return {}
+
+    def _table(self, system):
+        """Ertrags- und Wertmatrix (Methode x Station) x Erz für ein System (einmal vorberechnet)"""
+        system_data = self.rocks_data.get(system, {})
+        prices = self.value_engine.ore_prices(system, system_data)
+        version = self.value_engine.price_table.version
+
+        cached = self._tables.get(system)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        ores = list(prices)
+        ore_yield = self.data.get('ore_yield', {})
+        stations = [
+            (name, station) for name, station in self.data.get('stations', {}).items()
+            if station.get('system') == system
+        ]
+
+        rows = []
+        yields = []
+        costs = []
+        seconds = []
+        for method_name, method in self.data.get('methods', {}).items():
+            method_yields = ore_yield.get(method_name, {})
+            for station_name, station in stations:
+                bonus = station.get('yield_bonus', {})
+                rows.append((method_name, station_name))
+                yields.append([
+                    min(1.0, method_yields.get(ore, method.get('yield', 0)) * (1 + bonus.get(ore, 0)))
+                    for ore in ores
+                ])
+                costs.append(method.get('cost_per_scu', 0) * station.get('cost_factor', 1.0))
+                seconds.append(method.get('seconds_per_scu', 0))
+
+        price_vector = [prices[ore] for ore in ores]
+        values = [[y * price for y, price in zip(row, price_vector)] for row in yields]
+
+        if NUMPY_AVAILABLE:
+            yields = np.array(yields, dtype=float).reshape(len(rows), len(ores))
+            values = np.array(values, dtype=float).reshape(len(rows), len(ores))
+
+        table = {
+            'rows': rows,
+            'ore_index': {ore: index for index, ore in enumerate(ores)},
+            'yields': yields,
+            'values': values,
+            'costs': costs,
+            'seconds': seconds
+        }
+        self._tables[system] = (version, table)
+        return table
+
+    def calculate(self, system, rock):
+        """Raffinerie-Optionen für einen Treffer (Zusammensetzung aus generate_mineral_composition)"""
+        rock_type = rock.get('rock_type')
+        factor = rock.get('multima_factor', 1)
+        rock_data = self.rocks_data.get(system, {}).get(rock_type)
+        if rock_data is None:
+            return None
+
+        table = self._table(system)
+        version = self.value_engine.price_table.version
+        cache_key = (system, rock_type, factor)
+        cached = self._cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        # Eingangsmenge je Erz in SCU (Anteile über 100% werden auf 100% skaliert)
+        minerals = rock.get('minerals', [])
+        share_scale = 100.0 / max(100.0, sum(percentage for _, percentage, _ in minerals))
+        scu_total = rock_data.get('mass', {}).get('med', 0) * factor / MASS_PER_SCU
+        ore_index = table['ore_index']
+        input_scu = [0.0] * len(ore_index)
+        for name, percentage, _ in minerals:
+            index = ore_index.get(name.upper())
+            if index is not None:
+                input_scu[index] += percentage * share_scale / 100.0 * scu_total
+        total_input = sum(input_scu)
+
+        # Ein Durchlauf über die Matrix: Ertrag und Wert aller Methoden/Stationen
+        if NUMPY_AVAILABLE and len(table['rows']):
+            vector = np.array(input_scu)
+            refined = (table['yields'] @ vector).tolist()
+            values = (table['values'] @ vector).tolist()
+        else:
+            refined = [sum(y * x for y, x in zip(row, input_scu)) for row in table['yields']]
+            values = [sum(v * x for v, x in zip(row, input_scu)) for row in table['values']]
+
+        options = []
+        for (method, station), refined_scu, value, cost_per_scu, seconds_per_scu in zip(
+                table['rows'], refined, values, table['costs'], table['seconds']):
+            cost = cost_per_scu * total_input
+            options.append({
+                'method': method,
+                'station': station,
+                'refined_scu': round(refined_scu, 1),
+                'value': int(round(value)),
+                'cost': int(round(cost)),
+                'profit': int(round(value - cost)),
+                'hours': round(seconds_per_scu * total_input / 3600, 1)
+            })
+        options.sort(key=lambda option: option['profit'], reverse=True)
+
+        result = {'input_scu': round(total_input, 1), 'options': options[:REFINERY_OPTIONS]}
+        self._cache[cache_key] = (version, result)
+        return result
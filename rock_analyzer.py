@@ -1,25 +1,69 @@
 import json
 import os
 
+from signal_collisions import SignalCollisionMap
+from value_engine import ValueEngine
+
+# Standard-Datei mit den Gesteinsdaten
+ROCKS_FILE = 'rocks.json'
+
+# Höchster Multima-Faktor (gilt für Suche und Erz-Index)
+MAX_MULTIMA_FACTOR = 30
+
+# Kennzahlen mit gemessenen Perzentilen (p10/med/p90 aus scan_ingest.py): Stats-Schlüssel -> JSON-Schlüssel
+PERCENTILE_STATS = {'cluster': 'clusterCount', 'mass': 'mass', 'instability': 'inst', 'resistance': 'res'}
+
+# Mineral-Farben (gemeinsam für Analyse und Overlays)
+MINERAL_COLORS = {
+    'QUANTANIUM': '#E91E63',
+    'TARANITE': '#4CAF50',
+    'BEXALITE': '#FF9800',
+    'GOLD': '#FFD700',
+    'AGRICIUM': '#8BC34A',
+    'HEPHAESTANITE': '#FF5722',
+    'TUNGSTEN': '#607D8B',
+    'TITANIUM': '#9C27B0',
+    'IRON': '#795548',
+    'QUARTZ': '#E0E0E0',
+    'CORUNDUM': '#F44336',
+    'COPPER': '#FF5722',
+    'ALUMINUM': '#9E9E9E',
+    'BERYL': '#90EE90',
+    'BORASE': '#8BC34A',
+    'LARANITE': '#45B7D1',
+    'ICE': '#87CEEB',
+    'INERTMATERIAL': '#708090',
+    'TIN': '#A9A9A9',
+    'SILICON': '#778899',
+    'RICCITE': '#FF6B6B',
+    'STILERON': '#9370DB'
+}
+
 
 class RockAnalyzer:
     """Analysiert Gesteine basierend auf Signal-Werten"""
 
-    def __init__(self):
+    def __init__(self, value_engine=None, rocks_file=ROCKS_FILE):
+        self.rocks_file = rocks_file
         self.rocks_data = self.load_rocks_json()
         self.rock_database = {}
+        self.value_engine = value_engine or ValueEngine()
+
+        # Erz -> Rock-Typen mit diesem Erz und mehrdeutige Signalbereiche (mit der Rock-Datenbank erstellt)
+        self.ore_index = {}
+        self.collision_map = SignalCollisionMap([])
 
     def load_rocks_json(self):
         """Lade rocks.json Datei"""
         try:
-            if os.path.exists('rocks.json'):
-                with open('rocks.json', 'r', encoding='utf-8') as f:
+            if os.path.exists(self.rocks_file):
+                with open(self.rocks_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             else:
-                print("[ERROR] rocks.json nicht gefunden!")
+                print(f"[ERROR] {self.rocks_file} nicht gefunden!")
                 return {}
         except (IOError, json.JSONDecodeError) as e:
-            print(f"[ERROR] Fehler beim Laden von rocks.json: {e}")
+            print(f"[ERROR] Fehler beim Laden von {self.rocks_file}: {e}")
             return {}
 
     def build_rock_database(self, system):
@@ -121,7 +165,11 @@ class RockAnalyzer:
                     'cluster_max': rock_data.get('clusterCount', {}).get('max', 11),
                     'mass_max': rock_data.get('mass', {}).get('max', 100),
                     'instability_max': int(rock_data.get('inst', {}).get('max', 500)),
-                    'resistance_max': int(rock_data.get('res', {}).get('max', 0.8) * 100)
+                    'resistance_max': int(rock_data.get('res', {}).get('max', 0.8) * 100),
+                    'percentiles': {
+                        key: rock_data[json_key] for key, json_key in PERCENTILE_STATS.items()
+                        if 'p90' in rock_data.get(json_key, {})
+                    }
                 }
 
                 database.append({
@@ -135,13 +183,72 @@ class RockAnalyzer:
                     'description': props['description'],
                     'stats': stats,
                     'rock_type': rock_type,
+                    'system': system,
                     'ores': rock_data.get('ores', {})
                 })
 
         print(f"[INFO] {len(database)} Rock-Typen geladen für System {system}")
         self.rock_database = database
+        self.ore_index = self.build_ore_index(database)
+        self.collision_map = SignalCollisionMap(database, MAX_MULTIMA_FACTOR)
         return database
 
+    def build_ore_index(self, database):
+        """Invertierter Index Erz -> Rock-Typen, sortiert nach erwartetem Anteil (prob x medPct)"""
+        index = {}
+        for rock in database:
+            # Signale auf dem Radar: Grundwert und alle Multima-Vielfachen (nur Tier 2+)
+            max_factor = 1 if rock.get('tier', 1) == 1 else MAX_MULTIMA_FACTOR
+            signals = [
+                {'multima_factor': factor, 'signal': rock['signal'] * factor}
+                for factor in range(1, max_factor + 1)
+            ]
+
+            for ore_name, ore_data in rock.get('ores', {}).items():
+                if ore_name == 'INERTMATERIAL':
+                    continue
+                prob = ore_data.get('prob', 0)
+                med_pct = ore_data.get('medPct', 0)
+                index.setdefault(ore_name, []).append({
+                    'rock_type': rock['rock_type'],
+                    'name': rock['name'],
+                    'system': rock['system'],
+                    'tier': rock.get('tier', 1),
+                    'prob': prob,
+                    'min_pct': ore_data.get('minPct', 0),
+                    'med_pct': med_pct,
+                    'max_pct': ore_data.get('maxPct', 0),
+                    'share': round(prob * med_pct, 4),
+                    'signals': signals
+                })
+
+        for entries in index.values():
+            entries.sort(key=lambda entry: entry['share'], reverse=True)
+        return index
+
+    def find_rocks_with_ore(self, ore, min_prob=0.0, min_med_pct=0.0):
+        """
+        Alle Rock-Typen des aktuellen Systems mit einem Erz (aus dem Erz-Index)
+        min_prob / min_med_pct: Mindestwerte als Anteil 0..1 wie in rocks.json
+        Sortiert nach erwartetem Erzanteil, danach nach Erwartungswert des Gesteins
+        """
+        entries = self.ore_index.get(str(ore).upper(), [])
+        results = [
+            dict(entry) for entry in entries
+            if entry['prob'] >= min_prob and entry['med_pct'] >= min_med_pct
+        ]
+        if not results:
+            return results
+
+        system = results[0]['system']
+        values = self.value_engine.expected_values(system, self.rocks_data.get(system, {}))
+        for result in results:
+            value = values.get(result['rock_type'])
+            result['expected_value'] = int(round(value['expected_value'])) if value else 0
+
+        results.sort(key=lambda result: (-result['share'], -result['expected_value']))
+        return results
+
     def find_matching_rocks(self, signal_value):
         """Finde passende Gesteine basierend auf Signalwert"""
         all_matches = []
@@ -154,7 +261,7 @@ class RockAnalyzer:
                 rock_copy['multima_factor'] = 1
                 all_matches.append(rock_copy)
 
-        # 2. Suche nach Multima-Werten (2x bis 30x) - nur Tier 2+
+        # 2. Suche nach Multima-Werten (2x bis MAX_MULTIMA_FACTOR) - nur Tier 2+
         for rock in self.rock_database:
             if rock.get('tier', 1) == 1:
                 continue
@@ -162,7 +269,7 @@ class RockAnalyzer:
             base_signal = rock['signal']
             if signal_value % base_signal == 0:
                 factor = signal_value // base_signal
-                if 2 <= factor <= 30:
+                if 2 <= factor <= MAX_MULTIMA_FACTOR:
                     rock_copy = rock.copy()
                     rock_copy['accuracy'] = 100
                     rock_copy['multima_factor'] = factor
@@ -173,7 +280,7 @@ class RockAnalyzer:
                     all_matches.append(rock_copy)
 
         if all_matches:
-            return all_matches
+            return self.rank_by_value(all_matches)
 
         # 3. Snapping zu nächstbesten Werten
         distances = []
@@ -187,7 +294,7 @@ class RockAnalyzer:
 
         for rock in self.rock_database:
             base_signal = rock['signal']
-            for factor in range(2, 31):
+            for factor in range(2, MAX_MULTIMA_FACTOR + 1):
                 multima_signal = base_signal * factor
                 distance = abs(multima_signal - signal_value)
 
@@ -219,7 +326,42 @@ class RockAnalyzer:
             else:
                 break
 
-        return closest_matches
+        return self.rank_by_value(closest_matches)
+
+    def check_collision(self, signal_value):
+        """Mehrdeutigkeit eines Signalwerts (None wenn eindeutig) mit Score je Kandidat"""
+        return self.collision_map.lookup(signal_value)
+
+    def rank_by_value(self, matches):
+        """Ergänze Erwartungswerte und sortiere gleich genaue Treffer nach Wert"""
+        if not matches:
+            return matches
+
+        system = matches[0].get('system')
+        values = self.value_engine.expected_values(system, self.rocks_data.get(system, {}))
+
+        for match in matches:
+            entry = values.get(match.get('rock_type'))
+            factor = match.get('multima_factor', 1)
+            if entry:
+                match['expected_value'] = int(round(entry['expected_value'] * factor))
+                match['expected_scu'] = round(entry['expected_scu'] * factor, 1)
+                match['best_ore'] = entry['best_ore']
+            else:
+                match['expected_value'] = 0
+                match['expected_scu'] = 0.0
+                match['best_ore'] = None
+
+        matches.sort(key=lambda m: (-m.get('accuracy', 0), -m['expected_value']))
+        return matches
+
+    def analyze_signal(self, signal_value):
+        """Finde passende Gesteine inklusive Mineralien und Stats"""
+        matches = self.find_matching_rocks(signal_value)
+        for match in matches:
+            match['minerals'] = self.generate_mineral_composition(match)
+            match['stats'] = self.calculate_rock_stats(match, signal_value)
+        return matches
 
     def generate_mineral_composition(self, rock):
         """Generiere realistische Mineralzusammensetzung"""
@@ -228,32 +370,6 @@ class RockAnalyzer:
         if not ores:
             return []
 
-        # Mineral-Farben
-        mineral_colors = {
-            'QUANTANIUM': '#E91E63',
-            'TARANITE': '#4CAF50',
-            'BEXALITE': '#FF9800',
-            'GOLD': '#FFD700',
-            'AGRICIUM': '#8BC34A',
-            'HEPHAESTANITE': '#FF5722',
-            'TUNGSTEN': '#607D8B',
-            'TITANIUM': '#9C27B0',
-            'IRON': '#795548',
-            'QUARTZ': '#E0E0E0',
-            'CORUNDUM': '#F44336',
-            'COPPER': '#FF5722',
-            'ALUMINUM': '#9E9E9E',
-            'BERYL': '#90EE90',
-            'BORASE': '#8BC34A',
-            'LARANITE': '#45B7D1',
-            'ICE': '#87CEEB',
-            'INERTMATERIAL': '#708090',
-            'TIN': '#A9A9A9',
-            'SILICON': '#778899',
-            'RICCITE': '#FF6B6B',
-            'STILERON': '#9370DB'
-        }
-
         # Sammle alle Mineralien mit ihren Werten
         all_minerals = []
         for ore_name, ore_data in ores.items():
@@ -268,7 +384,7 @@ class RockAnalyzer:
                 percentage = int(med_pct * 100)
                 if percentage > 0:
                     display_name = ore_name.title()
-                    color = mineral_colors.get(ore_name, '#808080')
+                    color = MINERAL_COLORS.get(ore_name, '#808080')
                     all_minerals.append((display_name, percentage, color, prob))
 
         # Sortiere nach medPct (Prozentsatz) absteigend
@@ -352,9 +468,25 @@ class RockAnalyzer:
             resistance_max = min(100, int(instability * 0.1) + 20)
             resistance_med = resistance_max // 2
 
-        return {
+        stats = {
             'cluster': {'min': cluster_min, 'max': cluster_max, 'med': cluster_med},
             'mass': {'min': 0, 'max': f"{rock_mass_max}k", 'med': f"{rock_mass_med}k"},
             'instability': {'min': 0, 'max': instability, 'med': instability_med},
             'resistance': {'min': '0%', 'max': f"{resistance_max}%", 'med': f"{resistance_med}%"}
-        }
\ No newline at end of file
+        }
+
+        # Gemessene Werte (min/max und Perzentile) ersetzen die geschätzten
+        for key, values in orig_stats.get('percentiles', {}).items():
+            stats[key].update({
+                field: self.format_stat(key, values[field])
+                for field in ('min', 'p10', 'med', 'p90', 'max') if field in values
+            })
+        return stats
+
+    def format_stat(self, key, value):
+        """Kennzahl aus rocks.json im Anzeigeformat von calculate_rock_stats"""
+        if key == 'mass':
+            return f"{value}k"
+        if key == 'resistance':
+            return f"{int(round(value * 100))}%"
+        return int(round(value))
\ No newline at end of file
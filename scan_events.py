@@ -0,0 +1,117 @@
+"""
+Verteilt Scan-Ergebnisse als Server-Sent Events an beliebig viele Abonnenten
+(z.B. OBS Browser-Quellen über den Query-Server).
+
+Jedes Event wird einmal kodiert und nur in die Puffer der Abonnenten gehängt - die Suche
+wartet nie auf langsame Clients. Volle Puffer verwerfen das älteste Event.
+"""
+
+import collections
+import json
+import threading
+
+# Maximale Anzahl wartender Events pro Abonnent (danach wird das älteste verworfen)
+SUBSCRIBER_BUFFER = 16
+
+# Kommentarzeile für Verbindungen ohne Events (hält Proxys/Browser-Quellen offen, Sekunden)
+HEARTBEAT_SECONDS = 15
+
+# SSE-Kommentar als Heartbeat
+HEARTBEAT_EVENT = b': ping\n\n'
+
+
+def encode_event(event_id, event_type, data):
+    """Kodiere ein Event im SSE-Format"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n".encode('utf-8')
+
+
+class EventSubscriber:
+    """Ein Abonnent mit eigenem Puffer, wird in seiner Event-Loop geweckt"""
+
+    def __init__(self, loop, wakeup, max_buffer):
+        """
+        loop: Event-Loop, in der der Abonnent liest
+        wakeup: asyncio.Event, das bei neuen Events gesetzt wird
+        """
+        self.loop = loop
+        self.wakeup = wakeup
+        self.buffer = collections.deque(maxlen=max_buffer)
+
+        # Statistik
+        self.dropped = 0
+
+
+class ScanEventHub:
+    """Fan-out von Scan-Events an alle Abonnenten (threadsicher, blockiert nie)"""
+
+    def __init__(self, max_buffer=SUBSCRIBER_BUFFER):
+        self.max_buffer = max_buffer
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._event_id = 0
+
+        # Letztes Event (neue Abonnenten zeigen sofort den aktuellen Scan)
+        self.last_event = None
+
+        # Statistik
+        self.published = 0
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self, loop, wakeup):
+        """Neuen Abonnenten anmelden (aus seiner Event-Loop aufrufen)"""
+        subscriber = EventSubscriber(loop, wakeup, self.max_buffer)
+        with self._lock:
+            if self.last_event is not None:
+                subscriber.buffer.append(self.last_event)
+                wakeup.set()
+            # Liste wird ersetzt statt verändert, publish() iteriert ohne Kopie
+            self._subscribers = self._subscribers + [subscriber]
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscriber]
+
+    def publish(self, event_type, data):
+        """Event an alle Abonnenten verteilen - liefert die Anzahl der Empfänger"""
+        with self._lock:
+            self._event_id += 1
+            event = encode_event(self._event_id, event_type, data)
+            self.last_event = event
+            self.published += 1
+            subscribers = self._subscribers
+
+            loops = set()
+            for subscriber in subscribers:
+                if len(subscriber.buffer) == self.max_buffer:
+                    subscriber.dropped += 1
+                subscriber.buffer.append(event)
+                loops.add(subscriber.loop)
+
+        # Ein Weckaufruf pro Event-Loop statt pro Abonnent
+        for loop in loops:
+            try:
+                loop.call_soon_threadsafe(self._wake, loop)
+            except RuntimeError:
+                # Event-Loop bereits geschlossen
+                pass
+        return len(subscribers)
+
+    def _wake(self, loop):
+        """Läuft in der Event-Loop: alle dortigen Abonnenten mit Events wecken"""
+        for subscriber in self._subscribers:
+            if subscriber.loop is loop and subscriber.buffer:
+                subscriber.wakeup.set()
+
+    def take(self, subscriber):
+        """Alle wartenden Events eines Abonnenten als ein Block"""
+        with self._lock:
+            events = b''.join(subscriber.buffer)
+            subscriber.buffer.clear()
+        return events
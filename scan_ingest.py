@@ -0,0 +1,591 @@
+"""
+Streaming-Import roher Community-Scan-Exporte in die Statistik von rocks.json
+
+Liest JSONL- oder CSV-Dateien (auch .gz) zeilenweise mit begrenztem Speicher, aggregiert pro System
+und Rock-Typ in das Schema, das build_rock_database liest, und verarbeitet mehrere Dateien parallel.
+Eine Status-Datei merkt sich pro Datei, wie weit sie gelesen wurde: erneute Läufe lesen nur neue
+Dateien und neu angehängte Zeilen.
+
+Min/Max sind exakt, Median und Perzentile (p10/p90) kommen aus mergebaren Quantil-Sketches
+(quantile_sketch.py). Die Sketches landen zusätzlich in einer eigenen Datei, damit sich die Daten
+mehrerer Quellen später ohne Rohdaten zusammenführen lassen.
+
+Eine Zeile pro gescanntem Gestein (JSONL: ein Objekt pro Zeile, CSV: Kopfzeile mit Spaltennamen):
+    system, rock_type, user, cluster, cluster_count, mass, instability, resistance
+    ores: JSONL {"QUANTANIUM": 0.27, ...} bzw. CSV-Spalten ore_QUANTANIUM, ore_IRON, ...
+Anteile und Widerstand als 0..1 oder in Prozent: die Einheit gilt pro Datei getrennt für Widerstand
+und Erzanteile und wird an den ersten UNIT_SAMPLE_ROWS Zeilen erkannt oder mit --units vorgegeben.
+
+    python scan_ingest.py dumps/*.jsonl dumps/*.csv.gz
+    python scan_ingest.py dumps/export_prozent.csv --units percent
+    python scan_ingest.py dumps/* --rebuild --output rocks_new.json --workers 4
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import sys
+import time
+import zlib
+
+from quantile_sketch import SKETCH_FILE, QuantileSketch, save_sketches
+from rock_analyzer import ROCKS_FILE
+
+# Status der bisherigen Läufe (gelesene Dateien und Zwischenstände)
+STATE_FILE = 'scan_ingest_state.json'
+
+# Anzahl kleinster Hashes für die Schätzung verschiedener Nutzer/Cluster (exakt bis zu dieser Anzahl)
+DISTINCT_SKETCH_SIZE = 1024
+
+# Bytes vom Dateianfang, an denen eine Datei wiedererkannt wird (höchstens der bereits gelesene Teil)
+HEAD_BYTES = 4096
+
+# Kennzahlen eines Gesteins: Schlüssel in rocks.json -> (Feldnamen im Export, Nachkommastellen)
+STAT_FIELDS = {
+    'clusterCount': (('cluster_count', 'clusterCount', 'cluster_size'), 0),
+    'mass': (('mass',), 0),
+    'inst': (('instability', 'inst'), 0),
+    'res': (('resistance', 'res'), 2)
+}
+
+# Nachkommastellen für Wahrscheinlichkeit und Anteile der Erze
+ORE_DIGITS = 2
+
+# Einheiten der Anteil-Spalten (Widerstand, Erzanteile)
+UNIT_FRACTION = 'fraction'
+UNIT_PERCENT = 'percent'
+
+# Zeilen am Dateianfang, an denen die Einheit erkannt wird (ein Wert über 1 = Prozent)
+UNIT_SAMPLE_ROWS = 1000
+
+
+class UnitMismatch(ValueError):
+    """Anteil über 1 in einer Spalte, die als 0..1 erkannt wurde"""
+
+
+def _as_fraction(value, unit):
+    """Anteil als 0..1 in der für die Datei festgelegten Einheit"""
+    value = float(value)
+    if unit == UNIT_PERCENT:
+        return value / 100.0
+    if value > 1:
+        raise UnitMismatch(value)
+    return value
+
+
+class DistinctCounter:
+    """Anzahl verschiedener Werte über die k kleinsten Hashes (K-Minimum-Values, mergebar)"""
+
+    __slots__ = ('hashes', '_heap')
+
+    def __init__(self, hashes=()):
+        # Menge der k kleinsten Hashes und Max-Heap (negiert) zum Verdrängen des größten
+        self.hashes = set(hashes)
+        self._heap = [-h for h in self.hashes]
+        heapq.heapify(self._heap)
+
+    def add(self, value):
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        self._add_hash(int.from_bytes(digest, 'big'))
+
+    def _add_hash(self, value):
+        if value in self.hashes:
+            return
+        if len(self.hashes) < DISTINCT_SKETCH_SIZE:
+            self.hashes.add(value)
+            heapq.heappush(self._heap, -value)
+        elif value < -self._heap[0]:
+            self.hashes.discard(-heapq.heapreplace(self._heap, -value))
+            self.hashes.add(value)
+
+    def merge(self, other):
+        for value in other.hashes:
+            self._add_hash(value)
+
+    def estimate(self):
+        if len(self.hashes) < DISTINCT_SKETCH_SIZE:
+            return len(self.hashes)
+        return int(round((DISTINCT_SKETCH_SIZE - 1) * 2 ** 64 / -self._heap[0]))
+
+    def to_state(self):
+        return sorted(self.hashes)
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state)
+
+
+class RockAggregate:
+    """Zwischenstand eines Rock-Typs in einem System"""
+
+    def __init__(self):
+        self.scans = 0
+        self.users = DistinctCounter()
+        self.clusters = DistinctCounter()
+        self.stats = {key: QuantileSketch() for key in STAT_FIELDS}
+        # Erz -> [Anzahl Scans mit dem Erz, Sketch der Anteile]
+        self.ores = {}
+
+    def add(self, row):
+        self.scans += 1
+        if row['user'] is not None:
+            self.users.add(row['user'])
+        if row['cluster'] is not None:
+            self.clusters.add(row['cluster'])
+        for key, value in row['stats'].items():
+            self.stats[key].add(value)
+        for ore, share in row['ores'].items():
+            entry = self.ores.get(ore)
+            if entry is None:
+                entry = self.ores[ore] = [0, QuantileSketch()]
+            entry[0] += 1
+            entry[1].add(share)
+
+    def merge(self, other):
+        self.scans += other.scans
+        self.users.merge(other.users)
+        self.clusters.merge(other.clusters)
+        for key, sketch in other.stats.items():
+            self.stats[key].merge(sketch)
+        for ore, (present, sketch) in other.ores.items():
+            entry = self.ores.get(ore)
+            if entry is None:
+                entry = self.ores[ore] = [0, QuantileSketch()]
+            entry[0] += present
+            entry[1].merge(sketch)
+
+    def to_entry(self):
+        """Eintrag im Schema von rocks.json"""
+        entry = {
+            'users': self.users.estimate(),
+            'scans': self.scans,
+            'clusters': self.clusters.estimate()
+        }
+        for key, (_, digits) in STAT_FIELDS.items():
+            entry[key] = self.stats[key].summary(digits)
+
+        ores = {}
+        for ore, (present, sketch) in sorted(self.ores.items(), key=lambda item: -item[1][0]):
+            summary = sketch.summary(ORE_DIGITS)
+            ores[ore] = {
+                'prob': round(present / self.scans, ORE_DIGITS) if self.scans else 0,
+                'minPct': summary['min'],
+                'maxPct': summary['max'],
+                'medPct': summary['med'],
+                'p10Pct': summary['p10'],
+                'p90Pct': summary['p90']
+            }
+        entry['ores'] = ores
+        return entry
+
+    def to_state(self):
+        return {
+            'scans': self.scans,
+            'users': self.users.to_state(),
+            'clusters': self.clusters.to_state(),
+            'stats': {key: sketch.to_state() for key, sketch in self.stats.items()},
+            'ores': {ore: [present, sketch.to_state()] for ore, (present, sketch) in self.ores.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        aggregate = cls()
+        aggregate.scans = state['scans']
+        aggregate.users = DistinctCounter.from_state(state['users'])
+        aggregate.clusters = DistinctCounter.from_state(state['clusters'])
+        for key, sketch in state['stats'].items():
+            aggregate.stats[key] = QuantileSketch.from_state(sketch)
+        for ore, (present, sketch) in state['ores'].items():
+            aggregate.ores[ore] = [present, QuantileSketch.from_state(sketch)]
+        return aggregate
+
+    def sketches(self):
+        """Sketches im Aufbau der Sketch-Datei (siehe quantile_sketch.py)"""
+        sketches = dict(self.stats)
+        sketches['ores'] = {ore: sketch for ore, (_, sketch) in self.ores.items()}
+        return sketches
+
+
+def merge_aggregates(target, source):
+    """(System, Rock-Typ) -> RockAggregate zusammenführen"""
+    for key, aggregate in source.items():
+        if key in target:
+            target[key].merge(aggregate)
+        else:
+            target[key] = aggregate
+    return target
+
+
+# ==================== Einlesen ====================
+
+def _raw_resistance(raw):
+    for name in STAT_FIELDS['res'][0]:
+        value = raw.get(name)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _raw_ores(raw):
+    """(Erz, Rohwert) - JSONL-Objekt 'ores' oder CSV-Spalten ore_<ERZ>"""
+    raw_ores = raw.get('ores')
+    if isinstance(raw_ores, dict):
+        items = raw_ores.items()
+    else:
+        items = ((name[4:], value) for name, value in raw.items() if name.lower().startswith('ore_'))
+    return [(name, value) for name, value in items if value not in (None, '')]
+
+
+def detect_units(records):
+    """Einheit von Widerstand und Erzanteilen aus Beispielzeilen (Prozent, sobald ein Wert über 1 liegt)"""
+    units = {'res': UNIT_FRACTION, 'ores': UNIT_FRACTION}
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        try:
+            resistance = _raw_resistance(record)
+            if resistance is not None and float(resistance) > 1:
+                units['res'] = UNIT_PERCENT
+            if any(float(value) > 1 for _, value in _raw_ores(record)):
+                units['ores'] = UNIT_PERCENT
+        except (TypeError, ValueError):
+            continue
+    return units
+
+
+def normalize_row(raw, units):
+    """
+    Exportzeile (dict) in (System, Rock-Typ, Werte) - None bei unbrauchbaren Zeilen
+    units: Einheit je Anteil-Gruppe ('res', 'ores'), siehe detect_units
+    """
+    system = str(raw.get('system') or '').strip().upper()
+    rock_type = str(raw.get('rock_type') or raw.get('rockType') or '').strip().upper()
+    rock_type = rock_type.replace('-', '').replace(' ', '')
+    if not system or not rock_type:
+        return None
+
+    stats = {}
+    for key, (names, _) in STAT_FIELDS.items():
+        for name in names:
+            value = raw.get(name)
+            if value not in (None, ''):
+                stats[key] = _as_fraction(value, units['res']) if key == 'res' else float(value)
+                break
+
+    ores = {}
+    for name, value in _raw_ores(raw):
+        share = _as_fraction(value, units['ores'])
+        if share > 0:
+            ores[name.upper()] = share
+
+    return system, rock_type, {
+        'user': raw.get('user') or None,
+        'cluster': raw.get('cluster') or None,
+        'stats': stats,
+        'ores': ores
+    }
+
+
+def _file_identity(path, head_bytes=HEAD_BYTES):
+    """(Größe, Prüfsumme der ersten head_bytes Bytes) zum Wiedererkennen einer Datei"""
+    with open(path, 'rb') as f:
+        head = f.read(head_bytes)
+    return os.path.getsize(path), zlib.crc32(head)
+
+
+def _lines(handle, offset):
+    """Vollständige Zeilen ab offset - liefert (Zeile, Offset nach der Zeile)"""
+    for line in handle:
+        if not line.endswith(b'\n'):
+            # Unvollständige letzte Zeile: beim nächsten Lauf erneut lesen
+            return
+        offset += len(line)
+        yield line.decode('utf-8', errors='replace'), offset
+
+
+def ingest_file(path, offset=0, header=None, units=None):
+    """
+    Eine Datei ab offset einlesen (läuft im Worker)
+    units: Einheiten aus einem früheren Lauf oder vorgegeben, None = an den ersten Zeilen erkennen
+    Liefert (Aggregate, neuer Offset, CSV-Kopfzeile, Einheiten, Zeilen, fehlerhafte Zeilen)
+    """
+    aggregates = {}
+    rows = 0
+    errors = 0
+    mismatches = 0
+    is_csv = '.csv' in os.path.basename(path).lower()
+    compressed = path.lower().endswith('.gz')
+
+    raw_handle = handle = open(path, 'rb')
+    if compressed:
+        # Komprimierte Dateien werden immer vollständig gelesen
+        handle = gzip.GzipFile(fileobj=raw_handle)
+        offset = 0
+        header = None
+    elif offset:
+        handle.seek(offset)
+
+    try:
+        lines = _lines(handle, offset)
+        if is_csv:
+            if header is None:
+                first = next(lines, None)
+                if first is None:
+                    return aggregates, offset, header, units, rows, errors
+                header, offset = next(csv.reader([first[0]])), first[1]
+            records = ((dict(zip(header, values)), line_offset)
+                       for values, line_offset in _csv_rows(lines))
+        else:
+            records = _json_rows(lines)
+
+        if units is None:
+            sample = list(itertools.islice(records, UNIT_SAMPLE_ROWS))
+            units = detect_units(record for record, _ in sample)
+            records = itertools.chain(sample, records)
+
+        for record, line_offset in records:
+            offset = line_offset
+            if record is None:
+                errors += 1
+                continue
+            try:
+                normalized = normalize_row(record, units)
+            except UnitMismatch:
+                mismatches += 1
+                normalized = None
+            except (TypeError, ValueError):
+                normalized = None
+            if normalized is None:
+                errors += 1
+                continue
+
+            system, rock_type, row = normalized
+            aggregate = aggregates.get((system, rock_type))
+            if aggregate is None:
+                aggregate = aggregates[(system, rock_type)] = RockAggregate()
+            aggregate.add(row)
+            rows += 1
+    finally:
+        handle.close()
+        raw_handle.close()
+
+    if mismatches:
+        print(f"[WARNING] {path}: {mismatches} Zeilen mit Anteilen über 1, obwohl die Datei 0..1 verwendet "
+              f"({units}) - übersprungen, ggf. mit --units percent neu einlesen")
+    return aggregates, offset, header, units, rows, errors
+
+
+def _json_rows(lines):
+    for line, offset in lines:
+        line = line.strip()
+        if not line:
+            yield {}, offset
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield (record if isinstance(record, dict) else None), offset
+
+
+def _csv_rows(lines):
+    for line, offset in lines:
+        if not line.strip():
+            continue
+        for values in csv.reader([line]):
+            yield values, offset
+
+
+# ==================== Status und Ausgabe ====================
+
+def load_state(state_file):
+    """Lade den Status der bisherigen Läufe"""
+    empty = {'files': {}, 'aggregates': {}}
+    try:
+        if os.path.exists(state_file):
+            with open(state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            aggregates = {}
+            for key, aggregate in state.get('aggregates', {}).items():
+                system, _, rock_type = key.partition('/')
+                aggregates[(system, rock_type)] = RockAggregate.from_state(aggregate)
+            return {'files': state.get('files', {}), 'aggregates': aggregates}
+        return empty
+    except (IOError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        print(f"[ERROR] Fehler beim Laden von {state_file}: {e}")
+        return empty
+
+
+def _write_atomic(path, text):
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8', newline='\n') as f:
+        f.write(text)
+    os.replace(tmp_file, path)
+
+
+def save_state(state_file, state):
+    data = {
+        'files': state['files'],
+        'aggregates': {
+            f'{system}/{rock_type}': aggregate.to_state()
+            for (system, rock_type), aggregate in sorted(state['aggregates'].items())
+        }
+    }
+    _write_atomic(state_file, json.dumps(data, separators=(',', ':')))
+
+
+def format_rocks_json(data, level=0):
+    """JSON im Layout von rocks.json (verschachtelt eingerückt, innerste Objekte einzeilig)"""
+    if isinstance(data, dict) and any(isinstance(value, dict) for value in data.values()):
+        pad = '  ' * (level + 1)
+        items = [
+            f"{pad}{json.dumps(key, ensure_ascii=False)}: {format_rocks_json(value, level + 1)}"
+            for key, value in data.items()
+        ]
+        return '{\n' + ',\n'.join(items) + '\n' + '  ' * level + '}'
+    return json.dumps(data, ensure_ascii=False)
+
+
+def write_rocks(output, aggregates, base_file):
+    """Aggregierte Rock-Typen in rocks.json übernehmen (übrige Einträge bleiben erhalten)"""
+    data = {}
+    if base_file and os.path.exists(base_file):
+        try:
+            with open(base_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"[WARNING] {base_file} konnte nicht gelesen werden, schreibe nur neue Daten: {e}")
+
+    for (system, rock_type), aggregate in sorted(aggregates.items()):
+        if aggregate.scans:
+            data.setdefault(system, {})[rock_type] = aggregate.to_entry()
+
+    _write_atomic(output, format_rocks_json(data))
+
+
+# ==================== Ablauf ====================
+
+def plan_files(paths, files_state, rebuild, units=None):
+    """
+    Welche Dateien ab welchem Offset gelesen werden - liefert [(Pfad, Offset, Kopfzeile, Einheiten)]
+    units: Vorgegebene Einheiten für neue Dateien (None = erkennen), fortgesetzte behalten ihre
+    """
+    tasks = []
+    for path in paths:
+        key = os.path.abspath(path)
+        try:
+            size, head = _file_identity(path)
+        except OSError as e:
+            print(f"[WARNING] {path} übersprungen: {e}")
+            continue
+
+        known = None if rebuild else files_state.get(key)
+        if known is None:
+            tasks.append((path, 0, None, units))
+            continue
+
+        # Nur den beim letzten Lauf gelesenen Anfang vergleichen (angehängte Zeilen ändern ihn nicht)
+        head_bytes = known.get('head_bytes', HEAD_BYTES)
+        if head_bytes != HEAD_BYTES:
+            _, head = _file_identity(path, head_bytes)
+
+        if known['head'] != head or size < known['size']:
+            print(f"[WARNING] {path} wurde verändert (nicht nur ergänzt) - mit --rebuild neu einlesen")
+        elif size > known['size'] and path.lower().endswith('.gz'):
+            print(f"[WARNING] {path} ist gewachsen, komprimierte Dateien werden nicht fortgesetzt - "
+                  f"mit --rebuild neu einlesen")
+        elif size > known['size']:
+            tasks.append((path, known['offset'], known.get('header'), known.get('units', units)))
+    return tasks
+
+
+def run(paths, output=ROCKS_FILE, state_file=STATE_FILE, base_file=ROCKS_FILE, workers=None, rebuild=False,
+        sketch_file=SKETCH_FILE, unit=None):
+    """
+    Neue Daten einlesen, Status, rocks.json und Sketches schreiben - liefert (Dateien, Zeilen, Fehler)
+    unit: UNIT_FRACTION oder UNIT_PERCENT für alle Anteil-Spalten, None = pro Datei erkennen
+    """
+    state = {'files': {}, 'aggregates': {}} if rebuild else load_state(state_file)
+    units = {'res': unit, 'ores': unit} if unit else None
+    tasks = plan_files(paths, state['files'], rebuild, units)
+    if not tasks:
+        print("[INFO] Keine neuen Daten")
+        return 0, 0, 0
+
+    total_rows = 0
+    total_errors = 0
+
+    def collect(task, result):
+        nonlocal total_rows, total_errors
+        path = task[0]
+        aggregates, offset, header, units, rows, errors = result
+        merge_aggregates(state['aggregates'], aggregates)
+        # Bei komprimierten Dateien gilt die ganze Datei als gelesen
+        read_bytes = os.path.getsize(path) if path.lower().endswith('.gz') else offset
+        head_bytes = min(HEAD_BYTES, read_bytes)
+        size, head = _file_identity(path, head_bytes)
+        state['files'][os.path.abspath(path)] = {
+            'size': size if path.lower().endswith('.gz') else offset,
+            'head': head,
+            'head_bytes': head_bytes,
+            'offset': offset,
+            'header': header,
+            'units': units
+        }
+        total_rows += rows
+        total_errors += errors
+        print(f"[INFO] {path}: {rows} Zeilen, {errors} fehlerhaft")
+
+    if workers == 0 or len(tasks) == 1:
+        for task in tasks:
+            collect(task, ingest_file(*task))
+    else:
+        workers = min(len(tasks), workers or os.cpu_count() or 1)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            # Ergebnisse in Eingabereihenfolge zusammenführen (reproduzierbar)
+            for task, result in zip(tasks, pool.map(ingest_file, *zip(*tasks))):
+                collect(task, result)
+
+    save_state(state_file, state)
+    write_rocks(output, state['aggregates'], base_file)
+    if sketch_file:
+        sketches = {}
+        for (system, rock_type), aggregate in sorted(state['aggregates'].items()):
+            sketches.setdefault(system, {})[rock_type] = aggregate.sketches()
+        save_sketches(sketches, sketch_file)
+    return len(tasks), total_rows, total_errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Community-Scan-Exporte in rocks.json einlesen')
+    parser.add_argument('inputs', nargs='+', help='JSONL- oder CSV-Dateien (auch .gz)')
+    parser.add_argument('-o', '--output', default=ROCKS_FILE, help='Ausgabedatei (Standard: rocks.json)')
+    parser.add_argument('--base', default=None, help='Bestehende rocks.json für nicht importierte Rock-Typen '
+                                                     '(Standard: die Ausgabedatei)')
+    parser.add_argument('--state', default=STATE_FILE, help='Status-Datei für inkrementelle Läufe')
+    parser.add_argument('--sketches', default=SKETCH_FILE, help='Ausgabedatei der Quantil-Sketches')
+    parser.add_argument('--workers', type=int, help='Anzahl Prozesse (0 = ohne Pool, Standard: CPU-Anzahl)')
+    parser.add_argument('--rebuild', action='store_true', help='Status verwerfen und alle Dateien neu einlesen')
+    parser.add_argument('--units', choices=['auto', UNIT_FRACTION, UNIT_PERCENT], default='auto',
+                        help='Einheit von Widerstand und Erzanteilen in neuen Dateien (Standard: pro Datei erkennen)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    files, rows, errors = run(args.inputs, args.output, args.state, args.base or args.output,
+                              args.workers, args.rebuild, args.sketches,
+                              None if args.units == 'auto' else args.units)
+    elapsed = time.perf_counter() - start
+
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"[INFO] {files} Dateien, {rows} Zeilen ({errors} fehlerhaft) in {elapsed:.2f}s ({rate:,.0f} Zeilen/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
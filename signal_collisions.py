@@ -0,0 +1,225 @@
+"""
+Kollisionskarte für mehrdeutige Signalwerte
+Verschiedene Rock-Typen und Multima-Faktoren liefern gleiche oder fast gleiche Signale. Die Karte
+wird pro System einmal per Sweep über alle Toleranzfenster erstellt und listet jeden Signalbereich,
+in dem sich mindestens zwei Kandidaten überschneiden. Die exakten Signale der Kandidaten trennen
+Bereiche, die Tabelle nennt je Kandidat den kleinsten und größten Score im Bereich. Abfragen
+laufen per bisect in O(log n).
+
+    python signal_collisions.py --system PYRO
+    python signal_collisions.py --format csv -o collisions.csv
+"""
+
+import argparse
+import bisect
+import contextlib
+import csv
+import sys
+
+# Toleranz um den Grundwert und um Multima-Vielfache (wie beim Snapping in find_matching_rocks)
+BASE_TOLERANCE = 50
+MULTIMA_TOLERANCE = 100
+
+# Höhere Multima-Faktoren sind seltener: Gewicht 1 / Faktor ** FACTOR_PRIOR_EXPONENT
+FACTOR_PRIOR_EXPONENT = 1.0
+
+# Nähe-Gewicht (1 - Abstand / Toleranz) ** CLOSENESS_EXPONENT - exakte Treffer dominieren
+CLOSENESS_EXPONENT = 8
+
+# Unter diesem Score des besten Kandidaten gilt ein Scan als mehrdeutig
+AMBIGUITY_THRESHOLD = 0.75
+
+
+def _candidates(rock_database, max_factor):
+    """Alle (Kandidat, Toleranz) - Grundwerte und Multima-Vielfache (nur Tier 2+)"""
+    candidates = []
+    for rock in rock_database:
+        factors = 1 if rock.get('tier', 1) == 1 else max_factor
+        for factor in range(1, factors + 1):
+            candidates.append({
+                'name': rock['name'] if factor == 1 else f"{rock['name']} {factor}x Multima",
+                'rock_type': rock['rock_type'],
+                'multima_factor': factor,
+                'signal': rock['signal'] * factor,
+                'tolerance': BASE_TOLERANCE if factor == 1 else MULTIMA_TOLERANCE
+            })
+    return candidates
+
+
+def score_candidates(candidates, signal_value):
+    """
+    Disambiguierungs-Score je Kandidat für einen Signalwert (Summe 1)
+    Nähe zum exakten Signal relativ zur Toleranz, gewichtet mit der Seltenheit des Multima-Faktors
+    """
+    weights = []
+    for candidate in candidates:
+        closeness = max(0.0, 1.0 - abs(candidate['signal'] - signal_value) / (candidate['tolerance'] + 1.0))
+        weights.append(closeness ** CLOSENESS_EXPONENT / candidate['multima_factor'] ** FACTOR_PRIOR_EXPONENT)
+
+    total = sum(weights)
+    scored = []
+    for candidate, weight in zip(candidates, weights):
+        score = weight / total if total > 0 else 1.0 / len(candidates)
+        scored.append({
+            'name': candidate['name'],
+            'rock_type': candidate['rock_type'],
+            'multima_factor': candidate['multima_factor'],
+            'signal': candidate['signal'],
+            'score': round(score, 3)
+        })
+    scored.sort(key=lambda candidate: candidate['score'], reverse=True)
+    return scored
+
+
+def _score_range(candidates, low, high):
+    """Kleinster und größter Score je Kandidat über alle Signalwerte low..high (bester Kandidat zuerst)"""
+    limits = {}
+    for signal_value in range(low, high + 1):
+        for scored in score_candidates(candidates, signal_value):
+            key = (scored['name'], scored['signal'])
+            if key not in limits:
+                limits[key] = dict(scored, min_score=scored['score'], max_score=scored['score'])
+            else:
+                limit = limits[key]
+                limit['min_score'] = min(limit['min_score'], scored['score'])
+                limit['max_score'] = max(limit['max_score'], scored['score'])
+
+    ranked = []
+    for limit in limits.values():
+        del limit['score']
+        ranked.append(limit)
+    ranked.sort(key=lambda candidate: (candidate['max_score'], candidate['min_score']), reverse=True)
+    return ranked
+
+
+class SignalCollisionMap:
+    """Vorberechnete Signalbereiche mit mehreren Kandidaten für ein System"""
+
+    def __init__(self, rock_database, max_factor=30):
+        """
+        rock_database: Einträge aus RockAnalyzer.build_rock_database
+        max_factor: Höchster Multima-Faktor
+        """
+        self.ranges = self._sweep(_candidates(rock_database, max_factor))
+        self._starts = [collision['low'] for collision in self.ranges]
+
+    def _sweep(self, candidates):
+        """
+        Sweep über Anfang/Ende aller Toleranzfenster - Bereiche mit mindestens zwei Kandidaten
+        Das exakte Signal jedes Kandidaten beginnt einen neuen Bereich, damit exakte Treffer am Rand liegen
+        """
+        events = []
+        for index, candidate in enumerate(candidates):
+            events.append((candidate['signal'] - candidate['tolerance'], 1, index))
+            events.append((candidate['signal'], 0, index))
+            events.append((candidate['signal'] + candidate['tolerance'] + 1, -1, index))
+        events.sort()
+
+        ranges = []
+        active = set()
+        position = 0
+        while position < len(events):
+            signal_value = events[position][0]
+            # Alle Ereignisse an derselben Stelle gemeinsam anwenden
+            while position < len(events) and events[position][0] == signal_value:
+                _, delta, index = events[position]
+                if delta > 0:
+                    active.add(index)
+                elif delta < 0:
+                    active.discard(index)
+                position += 1
+
+            if len(active) >= 2 and position < len(events):
+                members = [candidates[index] for index in sorted(active)]
+                low, high = signal_value, events[position][0] - 1
+                ranges.append({'low': low, 'high': high, '_members': members})
+        return ranges
+
+    def lookup(self, signal_value):
+        """
+        Überschneidung für einen Signalwert (None wenn nur ein Kandidat in Toleranz), Scores für genau
+        diesen Wert; ambiguous ist gesetzt, wenn der beste Kandidat unter AMBIGUITY_THRESHOLD liegt
+        """
+        index = bisect.bisect_right(self._starts, signal_value) - 1
+        if index < 0:
+            return None
+        collision = self.ranges[index]
+        if signal_value > collision['high']:
+            return None
+
+        candidates = score_candidates(collision['_members'], signal_value)
+        return {
+            'low': collision['low'],
+            'high': collision['high'],
+            'ambiguous': candidates[0]['score'] < AMBIGUITY_THRESHOLD,
+            'candidates': candidates
+        }
+
+    def table(self):
+        """Alle Kollisionsbereiche (je Kandidat kleinster und größter Score im Bereich, wird erst hier berechnet)"""
+        return [
+            {
+                'low': collision['low'],
+                'high': collision['high'],
+                'candidates': _score_range(collision['_members'], collision['low'], collision['high'])
+            }
+            for collision in self.ranges
+        ]
+
+
+def _format_scores(low, high):
+    return f"{low:.0%}" if round(low, 2) == round(high, 2) else f"{low:.0%}-{high:.0%}"
+
+
+def main(argv=None):
+    from rock_analyzer import ROCKS_FILE, RockAnalyzer
+
+    parser = argparse.ArgumentParser(description='Kollisionstabelle mehrdeutiger Signalwerte ausgeben')
+    parser.add_argument('--system', choices=['STANTON', 'PYRO'], help='Nur ein System (Standard: alle)')
+    parser.add_argument('--format', choices=['text', 'csv'], default='text')
+    parser.add_argument('-o', '--output', help='Ausgabedatei (Standard: stdout)')
+    parser.add_argument('--rocks', default=ROCKS_FILE, help='Pfad zu rocks.json')
+    args = parser.parse_args(argv)
+
+    # Log-Ausgaben dürfen die Tabelle auf stdout nicht vermischen
+    with contextlib.redirect_stdout(sys.stderr):
+        analyzer = RockAnalyzer(rocks_file=args.rocks)
+    systems = [args.system] if args.system else [system for system in ('STANTON', 'PYRO') if system in analyzer.rocks_data]
+
+    stream = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        writer = csv.writer(stream, lineterminator='\n') if args.format == 'csv' else None
+        if writer:
+            writer.writerow(['system', 'low', 'high', 'name', 'rock_type', 'multima_factor', 'signal',
+                             'min_score', 'max_score'])
+
+        for system in systems:
+            with contextlib.redirect_stdout(sys.stderr):
+                analyzer.build_rock_database(system)
+            table = analyzer.collision_map.table()
+
+            if writer:
+                for collision in table:
+                    for candidate in collision['candidates']:
+                        writer.writerow([system, collision['low'], collision['high'], candidate['name'],
+                                         candidate['rock_type'], candidate['multima_factor'],
+                                         candidate['signal'], candidate['min_score'], candidate['max_score']])
+                continue
+
+            covered = sum(collision['high'] - collision['low'] + 1 for collision in table)
+            stream.write(f"\n{system}: {len(table)} Bereiche mit Überschneidungen, {covered} Signalwerte\n")
+            for collision in table:
+                candidates = ', '.join(
+                    f"{candidate['name']} @{candidate['signal']} "
+                    f"({_format_scores(candidate['min_score'], candidate['max_score'])})"
+                    for candidate in collision['candidates']
+                )
+                stream.write(f"  {collision['low']:>6}-{collision['high']:<6} {candidates}\n")
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Folgt einer Textdatei oder Named Pipe (FIFO) mit Signalwerten, ähnlich wie tail -F
+Neue Zeilen werden gebündelt an einen Callback gemeldet. Kürzen, Überschreiben und Rotieren
+der Datei wird erkannt; im Leerlauf wird mit wachsendem Intervall gepollt (FIFOs warten per select).
+"""
+
+import os
+import re
+import select
+import stat
+import threading
+
+# select() funktioniert unter Windows nur für Sockets
+SELECT_AVAILABLE = os.name != 'nt'
+
+# Poll-Intervall direkt nach neuen Daten und maximales Intervall im Leerlauf (Sekunden)
+FOLLOW_POLL_MIN = 0.02
+FOLLOW_POLL_MAX = 0.5
+
+# Maximale Bytes pro Lesevorgang
+READ_SIZE = 65536
+
+# Zuletzt gelesene Bytes, die nach einer Pause noch unverändert sein müssen (sonst überschrieben)
+OVERWRITE_CHECK_BYTES = 64
+
+# Ganze Zahlen in einer Zeile (die letzte gilt als Signalwert)
+_NUMBER = re.compile(rb'\d+')
+
+
+def parse_signal_line(line):
+    """Signalwert aus einer Zeile (letzte ganze Zahl, None wenn keine vorhanden)"""
+    line = line.strip()
+    if not line or line.startswith(b'#'):
+        return None
+    numbers = _NUMBER.findall(line)
+    return int(numbers[-1]) if numbers else None
+
+
+class SignalFeed:
+    """Liest neue Zeilen aus einer Datei oder FIFO in einem eigenen Thread"""
+
+    def __init__(self, path, on_signals, from_start=False, poll_min=FOLLOW_POLL_MIN, poll_max=FOLLOW_POLL_MAX):
+        """
+        path: Datei oder FIFO
+        on_signals: Callback mit der Liste der Signalwerte eines Lesevorgangs
+        from_start: Bei Dateien auch bereits vorhandene Zeilen lesen
+        """
+        self.path = path
+        self.on_signals = on_signals
+        self.from_start = from_start
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._partial = b''
+
+        # Statistik
+        self.lines = 0
+        self.reopens = 0
+
+    def start(self):
+        """Starte den Follow-Thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='SignalFeed', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stoppe den Follow-Thread"""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        try:
+            is_fifo = stat.S_ISFIFO(os.stat(self.path).st_mode)
+        except OSError:
+            is_fifo = False
+
+        try:
+            if is_fifo and SELECT_AVAILABLE:
+                self._follow_fifo()
+            else:
+                self._follow_file()
+        except Exception as e:
+            print(f"[ERROR] Signal-Feed {self.path} abgebrochen: {e}")
+
+    def _emit(self, data):
+        """Zerlege gelesene Bytes in Zeilen und melde die Signalwerte"""
+        data = self._partial + data
+        lines = data.split(b'\n')
+        self._partial = lines.pop()
+
+        signals = []
+        for line in lines:
+            signal = parse_signal_line(line)
+            if signal is not None:
+                signals.append(signal)
+        self.lines += len(lines)
+
+        if signals:
+            try:
+                self.on_signals(signals)
+            except Exception as e:
+                print(f"[ERROR] Signal-Feed Callback fehlgeschlagen: {e}")
+
+    def _follow_fifo(self):
+        """FIFO: Lesen und Schreiben öffnen, damit select ohne Schreiber nicht dauernd meldet"""
+        fd = os.open(self.path, os.O_RDWR | os.O_NONBLOCK)
+        print(f"[INFO] Folge FIFO {self.path}")
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd], [], [], self.poll_max)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(fd, READ_SIZE)
+                except BlockingIOError:
+                    continue
+                if data:
+                    self._emit(data)
+        finally:
+            os.close(fd)
+
+    def _follow_file(self):
+        """Datei: ab Dateiende lesen, Kürzen, Überschreiben und Rotieren erkennen, Backoff im Leerlauf"""
+        handle = None
+        identity = None
+        # (st_mtime_ns, Position) bei der letzten Prüfung ohne neue Daten
+        idle_state = None
+        # Zuletzt gelesene Bytes und ob sie vor dem nächsten Lesen geprüft werden
+        tail = b''
+        check_tail = False
+        delay = self.poll_min
+        first_open = True
+
+        try:
+            while not self._stop.is_set():
+                if handle is None:
+                    handle, identity = self._open_file(seek_end=first_open and not self.from_start)
+                    if handle is None:
+                        self._stop.wait(self.poll_max)
+                        continue
+                    first_open = False
+                    position = handle.tell()
+                    tail = _bytes_before(handle, position, min(position, OVERWRITE_CHECK_BYTES))
+
+                position = handle.tell()
+                data = handle.read(READ_SIZE)
+                if data:
+                    if check_tail and _bytes_before(handle, position, len(tail)) != tail:
+                        # Mit längerem Inhalt überschrieben: von vorne lesen
+                        handle.seek(0)
+                        tail = b''
+                        check_tail = False
+                        idle_state = None
+                        self._partial = b''
+                        self.reopens += 1
+                        continue
+                    check_tail = False
+                    tail = (tail + data)[-OVERWRITE_CHECK_BYTES:]
+                    self._emit(data)
+                    delay = self.poll_min
+                    continue
+
+                # Keine neuen Daten: auf Kürzen/Rotation prüfen
+                try:
+                    current = os.stat(self.path)
+                except OSError:
+                    current = None
+
+                if current is None or (current.st_dev, current.st_ino) != identity:
+                    # Rotiert oder gelöscht: neue Datei von vorne lesen
+                    handle.close()
+                    handle = None
+                    idle_state = None
+                    check_tail = False
+                    self._partial = b''
+                    self.reopens += 1
+                    continue
+
+                # Überschrieben: Datei geändert, aber nicht länger geworden (keine neuen Daten)
+                position = handle.tell()
+                overwritten = (idle_state is not None and idle_state[1] == position
+                               and current.st_size <= position and current.st_mtime_ns != idle_state[0])
+                if current.st_size < position or overwritten:
+                    # Gekürzt oder überschrieben: von vorne lesen
+                    handle.seek(0)
+                    tail = b''
+                    idle_state = None
+                    self._partial = b''
+                    self.reopens += 1
+                    continue
+                idle_state = (current.st_mtime_ns, position)
+                check_tail = bool(tail)
+
+                self._stop.wait(delay)
+                delay = min(self.poll_max, delay * 2)
+        finally:
+            if handle:
+                handle.close()
+
+    def _open_file(self, seek_end):
+        try:
+            handle = open(self.path, 'rb')
+        except OSError:
+            return None, None
+
+        info = os.fstat(handle.fileno())
+        if seek_end:
+            handle.seek(0, os.SEEK_END)
+        print(f"[INFO] Folge Datei {self.path}")
+        return handle, (info.st_dev, info.st_ino)
+
+
+def _bytes_before(handle, end, size):
+    """size Bytes vor der Position end lesen (Dateiposition bleibt unverändert)"""
+    if size <= 0:
+        return b''
+    position = handle.tell()
+    handle.seek(end - size)
+    data = handle.read(size)
+    handle.seek(position)
+    return data
@@ -0,0 +1,26 @@
+"""
+Auswahl des UI-Backends
+'webview' = echtes pywebview, 'fake' = headless Ersatz (fake_webview) für Tests und Benchmarks.
+Die Auswahl erfolgt über die Umgebungsvariable MINING_ANALYZER_UI.
+"""
+
+import importlib
+import os
+
+UI_BACKEND_ENV = 'MINING_ANALYZER_UI'
+
+BACKENDS = {
+    'webview': 'webview',
+    'fake': 'fake_webview'
+}
+
+
+def load_backend(name=None):
+    """Lade das UI-Backend-Modul (ImportError wenn nicht installiert)"""
+    name = name or os.environ.get(UI_BACKEND_ENV, 'webview')
+
+    module_name = BACKENDS.get(name)
+    if module_name is None:
+        raise ImportError(f"Unbekanntes UI-Backend: {name} (verfügbar: {', '.join(BACKENDS)})")
+
+    return importlib.import_module(module_name)
@@ -0,0 +1,109 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Maximale Anzahl Auswertungen pro Sekunde im Hauptfenster
+UI_FRAME_RATE = 60
+
+# Maximale Anzahl wartender Snippets, danach werden die ältesten ersetzbaren (mit kind) verworfen
+MAX_PENDING = 256
+
+
+class UIDispatcher:
+    """Bündelt JavaScript-Aufrufe an das Hauptfenster in einem eigenen Thread"""
+
+    def __init__(self, evaluate, frame_rate=UI_FRAME_RATE, max_pending=MAX_PENDING):
+        """
+        evaluate: Funktion die ein Skript synchron im Fenster ausführt
+        frame_rate: Maximale Anzahl Auswertungen pro Sekunde
+        max_pending: Obergrenze wartender Snippets (Backpressure, Snippets ohne kind werden nie verworfen)
+        """
+        self.evaluate = evaluate
+        self.frame_interval = 1.0 / frame_rate
+        self.max_pending = max_pending
+
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._sequence = 0
+        self._running = False
+        self._thread = None
+
+        # Statistik
+        self.posted = 0
+        self.superseded = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def start(self):
+        """Starte den Dispatcher-Thread"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='UIDispatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        """Stoppe den Dispatcher, wartende Snippets werden noch ausgeführt"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def post(self, js_code, kind=None):
+        """
+        Reiche ein Snippet ein - blockiert nie
+        kind: Art des Updates; ein neueres Snippet derselben Art ersetzt ein wartendes
+        """
+        with self._condition:
+            self.posted += 1
+            if kind is not None:
+                key = kind
+                if self._pending.pop(key, None) is not None:
+                    self.superseded += 1
+            else:
+                self._sequence += 1
+                key = ('js', self._sequence)
+
+            if len(self._pending) >= self.max_pending:
+                # Nur Zwischenstände (mit kind) verwerfen - einmalige Meldungen wie Job-Ende gehen nie verloren
+                oldest = next((pending for pending in self._pending if not isinstance(pending, tuple)), None)
+                if oldest is not None:
+                    del self._pending[oldest]
+                    self.dropped += 1
+
+            self._pending[key] = js_code
+            self._condition.notify()
+        return True
+
+    def _run(self):
+        """Dispatcher-Schleife: höchstens eine Auswertung pro Frame"""
+        next_frame = 0.0
+
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._pending:
+                    break
+
+                # Bis zum nächsten Frame warten und dabei weitere Snippets sammeln
+                while self._running:
+                    delay = next_frame - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+
+                batch = list(self._pending.values())
+                self._pending.clear()
+
+            script = '\n'.join(f"try {{ {code} }} catch (e) {{ console.error(e); }}" for code in batch)
+            try:
+                self.evaluate(script)
+            except Exception as e:
+                print(f"[ERROR] UI-Dispatcher konnte Skript nicht ausführen: {e}")
+
+            self.batches += 1
+            next_frame = time.monotonic() + self.frame_interval
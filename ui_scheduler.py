@@ -0,0 +1,165 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class ScheduledTask:
+    """Eine geplante Aufgabe im UIScheduler"""
+
+    def __init__(self, scheduler, deadline, fn, args, interval=None, key=None):
+        self.scheduler = scheduler
+        self.deadline = deadline
+        self.fn = fn
+        self.args = args
+        self.interval = interval
+        self.key = key
+        self.cancelled = False
+
+    def cancel(self):
+        """Aufgabe abbrechen"""
+        self.scheduler.cancel(self)
+
+    def __repr__(self):
+        state = 'cancelled' if self.cancelled else f'in {self.deadline - time.monotonic():.3f}s'
+        return f"ScheduledTask({self.key or self.fn.__name__}, {state})"
+
+
+class UIScheduler:
+    """Ein Thread für alle verzögerten und periodischen UI-Aufgaben (Heap-basiert)"""
+
+    def __init__(self, name='UIScheduler'):
+        self.name = name
+        self._heap = []
+        self._counter = itertools.count()
+        self._tasks_by_key = {}
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Starte den Scheduler-Thread"""
+        with self._condition:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self, timeout=1.0):
+        """Stoppe den Scheduler, offene Aufgaben werden verworfen"""
+        with self._condition:
+            self._running = False
+            for _, _, task in self._heap:
+                task.cancelled = True
+            self._heap.clear()
+            self._tasks_by_key.clear()
+            self._condition.notify_all()
+
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self):
+        return self._running
+
+    def call_later(self, delay, fn, *args, key=None, coalesce=False):
+        """
+        Führe fn(*args) nach delay Sekunden aus
+        key: Aufgaben mit gleichem key ersetzen sich (neue Frist)
+        coalesce: bei bestehender Aufgabe mit gleichem key diese unverändert behalten
+        """
+        return self._schedule(delay, fn, args, None, key, coalesce)
+
+    def call_every(self, interval, fn, *args, key=None, initial_delay=None):
+        """Führe fn(*args) periodisch alle interval Sekunden aus"""
+        delay = interval if initial_delay is None else initial_delay
+        return self._schedule(delay, fn, args, interval, key, False)
+
+    def reschedule(self, task_or_key, delay):
+        """Verschiebe eine Aufgabe auf jetzt + delay"""
+        with self._condition:
+            task = self._resolve(task_or_key)
+            if task is None:
+                return None
+            task.cancelled = True
+            new_task = ScheduledTask(self, time.monotonic() + delay, task.fn, task.args, task.interval, task.key)
+            self._push(new_task)
+            return new_task
+
+    def cancel(self, task_or_key):
+        """Breche eine Aufgabe (oder die Aufgabe zu einem key) ab"""
+        with self._condition:
+            task = self._resolve(task_or_key)
+            if task is None:
+                return False
+            task.cancelled = True
+            if task.key is not None and self._tasks_by_key.get(task.key) is task:
+                del self._tasks_by_key[task.key]
+            return True
+
+    def pending(self, key):
+        """Prüfe ob eine Aufgabe mit diesem key geplant ist"""
+        with self._condition:
+            return key in self._tasks_by_key
+
+    def _resolve(self, task_or_key):
+        if isinstance(task_or_key, ScheduledTask):
+            return None if task_or_key.cancelled else task_or_key
+        return self._tasks_by_key.get(task_or_key)
+
+    def _schedule(self, delay, fn, args, interval, key, coalesce):
+        with self._condition:
+            if key is not None:
+                existing = self._tasks_by_key.get(key)
+                if existing is not None:
+                    if coalesce:
+                        return existing
+                    existing.cancelled = True
+
+            task = ScheduledTask(self, time.monotonic() + max(0.0, delay), fn, args, interval, key)
+            self._push(task)
+            return task
+
+    def _push(self, task):
+        """Aufgabe in den Heap legen (Lock muss gehalten werden)"""
+        if task.key is not None:
+            self._tasks_by_key[task.key] = task
+        heapq.heappush(self._heap, (task.deadline, next(self._counter), task))
+        self._condition.notify()
+
+    def _run(self):
+        """Scheduler-Schleife: wartet bis zur nächsten Frist und führt fällige Aufgaben aus"""
+        while True:
+            with self._condition:
+                task = None
+                while self._running:
+                    # Abgebrochene Aufgaben verwerfen
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+
+                    _, _, task = heapq.heappop(self._heap)
+                    if task.interval is not None:
+                        task.deadline = max(task.deadline + task.interval, time.monotonic())
+                        heapq.heappush(self._heap, (task.deadline, next(self._counter), task))
+                    elif task.key is not None and self._tasks_by_key.get(task.key) is task:
+                        del self._tasks_by_key[task.key]
+                    break
+
+                if not self._running:
+                    return
+
+            try:
+                task.fn(*task.args)
+            except Exception as e:
+                print(f"[ERROR] Geplante Aufgabe {task!r} fehlgeschlagen: {e}")
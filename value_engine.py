@@ -0,0 +1,73 @@
+from price_table import PriceTable
+
+# Grobe Näherung: Gesteinsmasse pro SCU raffiniertem Erz
+MASS_PER_SCU = 100.0
+
+
+class ValueEngine:
+    """Erwartungswert pro Gestein aus Erz-Statistik, Gesteinsmasse und Preistabelle"""
+
+    def __init__(self, price_table=None):
+        self.price_table = price_table or PriceTable()
+
+        # System -> (Preis-Version, {Rock-Typ: Erwartungswert-Eintrag})
+        self._system_values = {}
+
+    def expected_values(self, system, system_data):
+        """Erwartungswerte aller Rock-Typen eines Systems (gecacht bis sich die Preise ändern)"""
+        self.price_table.reload_if_changed()
+        version = self.price_table.version
+
+        cached = self._system_values.get(system)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        prices = self.ore_prices(system, system_data)
+        values = {
+            rock_type: self._rock_value(rock_data, prices)
+            for rock_type, rock_data in system_data.items()
+        }
+        self._system_values[system] = (version, values)
+        return values
+
+    def ore_prices(self, system, system_data):
+        """Bester Preis je Erz im System (Fallback: bester Preis überhaupt)"""
+        prices = {}
+        for rock_data in system_data.values():
+            for ore_name in rock_data.get('ores', {}):
+                if ore_name in prices or ore_name == 'INERTMATERIAL':
+                    continue
+                best = self.price_table.best_price(ore_name, system) or self.price_table.best_price(ore_name)
+                prices[ore_name] = best[0] if best else 0.0
+        return prices
+
+    def _rock_value(self, rock_data, prices):
+        """Erwartungswert eines einzelnen Gesteins (ohne Multima-Faktor)"""
+        mass = rock_data.get('mass', {}).get('med', 0)
+        scu_total = mass / MASS_PER_SCU
+
+        expected_value = 0.0
+        expected_scu = 0.0
+        best_ore = None
+        best_ore_value = 0.0
+
+        for ore_name, ore_data in rock_data.get('ores', {}).items():
+            price = prices.get(ore_name)
+            if not price:
+                continue
+
+            # Anteil als Mittel der Dreiecksverteilung (min, med, max), gewichtet mit der Vorkommenswahrscheinlichkeit
+            share = (ore_data.get('minPct', 0) + ore_data.get('medPct', 0) + ore_data.get('maxPct', 0)) / 3
+            scu = min(1.0, ore_data.get('prob', 0)) * share * scu_total
+            value = scu * price
+
+            expected_scu += scu
+            expected_value += value
+            if value > best_ore_value:
+                best_ore, best_ore_value = ore_name, value
+
+        return {
+            'expected_value': expected_value,
+            'expected_scu': expected_scu,
+            'best_ore': best_ore
+        }